@@ -1,19 +1,25 @@
 from django.contrib import admin
 from .models import Institution
 from .models import Student
-from .models import CourseTopic
-from .models import CourseContent
-from .models import CourseTopic1
-from .models import CourseContent1
-from .models import CourseTopic2
-from .models import CourseContent2
+from .models import Course
+from .models import Topic
+from .models import Content
+from .models import TaskMeta
+from .models import Invoice
+from .models import InvoiceItem
+from .models import ReturnTotals
+from .models import TrnCase
+from .models import PracticeAccount
 
 
 admin.site.register(Institution)
 admin.site.register(Student)
-admin.site.register(CourseTopic)
-admin.site.register(CourseContent)
-admin.site.register(CourseTopic1)
-admin.site.register(CourseContent1)
-admin.site.register(CourseTopic2)
-admin.site.register(CourseContent2)
+admin.site.register(Course)
+admin.site.register(Topic)
+admin.site.register(Content)
+admin.site.register(TaskMeta)
+admin.site.register(Invoice)
+admin.site.register(InvoiceItem)
+admin.site.register(ReturnTotals)
+admin.site.register(TrnCase)
+admin.site.register(PracticeAccount)
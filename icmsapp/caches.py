@@ -0,0 +1,219 @@
+"""
+In-process lookup structures built from the course tables.
+
+Each one is loaded lazily on first use and dropped by the receivers in
+signals.py whenever a row it depends on is saved or deleted. Those
+receivers only reach the process that saved the row, so each structure
+also carries a SharedVersion that tells the other workers to rebuild.
+"""
+import time
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Course, Topic, Content, GST_TASK_COURSE
+
+# how often a worker looks at the shared counters (seconds of staleness allowed)
+VERSION_CHECK_INTERVAL = 2.0
+
+
+class SharedVersion:
+    """
+    Generation counter kept in the shared Django cache (Redis or the file
+    cache, see settings.CACHES). bump() after a change; stale() is True once
+    in each process after someone else bumped it. The cache is read at most
+    every VERSION_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, name):
+        self.key = f"icms:version:{name}"
+        self._seen = None
+        self._checked = 0.0
+
+    def bump(self):
+        try:
+            self._seen = cache.incr(self.key)
+        except ValueError:
+            # unset or evicted: restart from a value no process has seen
+            self._seen = time.time_ns()
+            cache.set(self.key, self._seen, None)
+
+    def _observe(self, current) -> bool:
+        if current == self._seen:
+            return False
+        self._seen = current
+        return True
+
+    def _due(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < VERSION_CHECK_INTERVAL:
+            return False
+        self._checked = now
+        return True
+
+    def stale(self) -> bool:
+        return self._due() and self._observe(cache.get(self.key))
+
+    async def astale(self) -> bool:
+        return self._due() and self._observe(await cache.aget(self.key))
+
+
+class ContentIdIndex:
+    """
+    Sorted content numbers of one course (plus number -> pk), so task-id
+    resolution is a bisect instead of a round of existence queries.
+    """
+
+    def __init__(self, course_slug):
+        self.course_slug = course_slug
+        self._ids = None
+        self._pks = None
+        self._version = SharedVersion(f"content-ids:{course_slug}")
+
+    def invalidate(self, **kwargs):
+        # again on commit, so nothing reloaded from uncommitted rows is kept
+        self._ids = None
+        transaction.on_commit(self._committed)
+
+    def _committed(self):
+        self._ids = None
+        self._version.bump()
+
+    def ids(self) -> list:
+        stale = self._version.stale()
+        ids = self._ids
+        if ids is None or stale:
+            rows = (Content.objects.filter(course__slug=self.course_slug)
+                    .order_by("number").values_list("number", "pk"))
+            self._pks = dict(rows)
+            ids = self._ids = list(self._pks)
+        return ids
+
+    async def aids(self) -> list:
+        """ids() for async views: the first load uses the async ORM."""
+        stale = await self._version.astale()
+        ids = self._ids
+        if ids is None or stale:
+            rows = (Content.objects.filter(course__slug=self.course_slug)
+                    .order_by("number").values_list("number", "pk"))
+            self._pks = {number: pk async for number, pk in rows}
+            ids = self._ids = list(self._pks)
+        return ids
+
+    def __contains__(self, number) -> bool:
+        ids = self.ids()
+        i = bisect_left(ids, number)
+        return i < len(ids) and ids[i] == number
+
+    def pk_for(self, number):
+        self.ids()
+        return self._pks.get(number)
+
+    def first_from(self, number):
+        """Smallest id >= number, or None."""
+        ids = self.ids()
+        i = bisect_left(ids, number)
+        return ids[i] if i < len(ids) else None
+
+    def first(self):
+        ids = self.ids()
+        return ids[0] if ids else None
+
+
+content1_ids = ContentIdIndex(GST_TASK_COURSE)
+
+
+_COURSE_NAV_VERSION = "course-nav"
+
+
+class CourseNav:
+    """
+    Ordered topic list for one course plus the lookups a topic page needs:
+    topic number -> position, previous/next and the first content id of
+    each topic. Built with three queries and reused until a course, topic
+    or content row changes.
+    """
+
+    def __init__(self, slug):
+        self.slug = slug
+        self.course = None
+        self._topics = None
+        self._position = None
+        self._first_content = None
+        self._version = SharedVersion(_COURSE_NAV_VERSION)
+
+    def invalidate(self, **kwargs):
+        self._topics = None
+
+    def _build(self):
+        self.course = Course.objects.filter(slug=self.slug).first()
+        topics = list(Topic.objects.filter(course=self.course).order_by("order"))
+        first_content = {}
+        for topic_id, content_id in (Content.objects.filter(course=self.course)
+                                     .order_by("id").values_list("topic_id", "id")):
+            first_content.setdefault(topic_id, content_id)
+        self._position = {t.number: i for i, t in enumerate(topics)}
+        self._first_content = first_content
+        self._topics = topics
+        return topics
+
+    def topics(self) -> list:
+        stale = self._version.stale()
+        topics = self._topics
+        if topics is None or stale:
+            topics = self._build()
+        return topics
+
+    def page(self, topic_number=None):
+        """
+        Context for a topic page (first topic when topic_number is None), or
+        None if the course or topic does not exist. Costs at most one query,
+        for the content.
+        """
+        topics = self.topics()
+        if self.course is None:
+            return None
+        position, first_content = self._position, self._first_content
+        if topic_number is None:
+            i = 0 if topics else None
+        else:
+            i = position.get(topic_number)
+            if i is None:
+                return None
+
+        selected_topic = previous_topic = next_topic = content = None
+        if i is not None:
+            selected_topic = topics[i]
+            previous_topic = topics[i - 1] if i > 0 else None
+            next_topic = topics[i + 1] if i < len(topics) - 1 else None
+            content_id = first_content.get(selected_topic.id)
+            if content_id is not None:
+                content = Content.objects.filter(pk=content_id).first()
+
+        return {
+            'course': self.course,
+            'topics': topics, 'selected_topic': selected_topic, 'content': content,
+            'previous_topic': previous_topic, 'next_topic': next_topic,
+        }
+
+
+course_navs = {}
+
+def course_nav(slug) -> CourseNav:
+    nav = course_navs.get(slug)
+    if nav is None:
+        nav = course_navs[slug] = CourseNav(slug)
+    return nav
+
+def _clear_course_navs():
+    for nav in list(course_navs.values()):
+        nav.invalidate()
+
+def _course_navs_committed():
+    _clear_course_navs()
+    SharedVersion(_COURSE_NAV_VERSION).bump()
+
+def invalidate_course_navs(**kwargs):
+    _clear_course_navs()
+    transaction.on_commit(_course_navs_committed)
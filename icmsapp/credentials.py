@@ -0,0 +1,70 @@
+"""
+Login lookups for students and institutions.
+
+Student emails are only unique per institution, so a login fetches every
+row for the email (through the email index) and verifies the password
+against each. The rows for an email are cached; the receivers in signals.py
+drop the entry whenever a student (or its institution) is saved or deleted.
+"""
+import hashlib
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Institution, Student
+
+LOGIN_CACHE_TIMEOUT = 300
+
+StudentLogin = namedtuple("StudentLogin", "pk email name institution_name")
+
+
+def _student_key(email):
+    return "icms:login:student:" + hashlib.sha1(email.encode()).hexdigest()
+
+
+def invalidate_student_login(email):
+    if email:
+        invalidate_student_logins([email])
+
+
+def invalidate_student_logins(emails):
+    # dropped now and again on commit, so rows cached by a concurrent login
+    # before this transaction commits do not outlive it
+    keys = [_student_key(email) for email in set(emails) if email]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _student_rows(email):
+    key = _student_key(email)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(
+            Student.objects.filter(email=email)
+            .order_by("pk")
+            .values_list("pk", "password", "name", "institution__name")
+        )
+        cache.set(key, rows, LOGIN_CACHE_TIMEOUT)
+    return rows
+
+
+def authenticate_student(email, raw_password):
+    """StudentLogin for the first student with this email and password, or None."""
+    if not email or not raw_password:
+        return None
+    for pk, stored, name, institution_name in _student_rows(email):
+        # check_password() re-hashes legacy / outdated passwords and saves them
+        if Student(pk=pk, email=email, password=stored).check_password(raw_password):
+            return StudentLogin(pk, email, name, institution_name)
+    return None
+
+
+def authenticate_institution(email, raw_password):
+    if not email or not raw_password:
+        return None
+    institution = Institution.objects.filter(email=email).first()
+    if institution is not None and institution.check_password(raw_password):
+        return institution
+    return None
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.crypto import constant_time_compare
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 whose work factor comes from settings.ICMS_PBKDF2_ITERATIONS.
+    Hashes made with a different count still verify, and are re-hashed at
+    the configured cost on the next successful login.
+    """
+    iterations = getattr(settings, "ICMS_PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
+
+
+class ImportPBKDF2PasswordHasher(TunablePBKDF2PasswordHasher):
+    """
+    Cheaper PBKDF2 for passwords set by bulk import
+    (settings.ICMS_IMPORT_PBKDF2_ITERATIONS). Same algorithm name, so the
+    hashes verify normally. Once the import commits they are wrapped in
+    WrappedImportPBKDF2PasswordHasher in the background (imports.py).
+    """
+    iterations = getattr(settings, "ICMS_IMPORT_PBKDF2_ITERATIONS", 1000)
+
+    @classmethod
+    def is_import_cost(cls, encoded) -> bool:
+        """True for a pbkdf2_sha256 hash made at (or below) the import cost."""
+        algorithm, _, rest = (encoded or "").partition("$")
+        iterations = rest.partition("$")[0]
+        return algorithm == cls.algorithm and iterations.isdecimal() and int(iterations) <= cls.iterations
+
+
+class WrappedImportPBKDF2PasswordHasher(TunablePBKDF2PasswordHasher):
+    """
+    An import-cost pbkdf2_sha256 hash fed through PBKDF2 again at the full
+    cost, so imported passwords can be hardened without knowing them. Stored as algorithm$iterations$salt$inner iterations$hash; replaced
+    by a plain hash on the next successful login.
+    """
+    algorithm = "pbkdf2_wrapped_sha256"
+
+    def wrap(self, encoded, iterations=None):
+        _, inner_iterations, salt, inner = encoded.split("$", 3)
+        algorithm, iterations, salt, outer = super().encode(inner, salt, iterations).split("$", 3)
+        return "%s$%s$%s$%s$%s" % (algorithm, iterations, salt, inner_iterations, outer)
+
+    def encode(self, password, salt, iterations=None, inner_iterations=None):
+        inner = ImportPBKDF2PasswordHasher().encode(password, salt, inner_iterations)
+        return self.wrap(inner, iterations)
+
+    def decode(self, encoded):
+        algorithm, iterations, salt, inner_iterations, hash = encoded.split("$", 4)
+        assert algorithm == self.algorithm
+        return {
+            "algorithm": algorithm,
+            "hash": hash,
+            "iterations": int(iterations),
+            "inner_iterations": int(inner_iterations),
+            "salt": salt,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(password, decoded["salt"], decoded["iterations"], decoded["inner_iterations"])
+        return constant_time_compare(encoded, encoded_2)
+
+    def must_update(self, encoded):
+        return True
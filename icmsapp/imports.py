@@ -0,0 +1,305 @@
+"""
+Bulk student import from CSV or XLSX (name, email, student_id, password).
+
+Rows are streamed and handled in chunks. Per chunk: field validation in
+Python, one set-based query for email / student_id clashes with existing
+students, a seat check against student_limit, then bulk_create. Every
+rejected row is reported with its line number; valid rows are imported.
+
+Passwords are hashed at the cheaper import cost so the upload returns
+quickly. Once each chunk commits, a background thread wraps those hashes
+at the full cost (harden_import_hashes, see hashers.py); `manage.py
+hash_passwords` does the same for anything a restart interrupted.
+"""
+import csv
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+
+from .credentials import invalidate_student_logins
+from .hashers import ImportPBKDF2PasswordHasher, WrappedImportPBKDF2PasswordHasher
+from .models import Institution, Student
+from .stats import invalidate_admin_stats
+
+COLUMNS = ("name", "email", "student_id", "password")
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 500
+
+# hashlib.pbkdf2_hmac releases the GIL, so hashing a chunk spreads over cores
+_HASH_WORKERS = os.cpu_count() or 1
+HARDEN_CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def _normalise_header(header):
+    return [str(h or "").strip().lower().replace(" ", "_") for h in header]
+
+
+def _check_header(header, columns):
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise ImportFormatError("Missing column(s): " + ", ".join(missing))
+
+
+def _csv_records(reader):
+    """Rows of a csv.reader, with decoding and syntax errors raised as ImportFormatError."""
+    while True:
+        try:
+            row = next(reader, None)
+        except UnicodeDecodeError:
+            # the text layer decodes in blocks, so the line is approximate
+            raise ImportFormatError(
+                f"The file is not UTF-8 text (near line {reader.line_num + 1}). "
+                "Save it as \"CSV UTF-8\" and upload it again."
+            )
+        except csv.Error as e:
+            raise ImportFormatError(f"Line {reader.line_num}: {e}")
+        if row is None:
+            return
+        yield row
+
+
+def read_csv(fileobj, columns=COLUMNS):
+    """Yield (line number, row dict) from a binary or text CSV file object."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="") if "b" in getattr(fileobj, "mode", "b") else fileobj
+    reader = csv.reader(text)
+    records = _csv_records(reader)
+    header = _normalise_header(next(records, []))
+    _check_header(header, columns)
+    for row in records:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, dict(zip(header, row))
+
+
+def read_xlsx(fileobj, columns=COLUMNS):
+    """Yield (line number, row dict) from the first sheet of an XLSX file (needs openpyxl)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import needs the openpyxl package; upload a CSV instead.")
+    sheet = load_workbook(fileobj, read_only=True, data_only=True).worksheets[0]
+    rows = sheet.iter_rows(values_only=True)
+    header = _normalise_header(next(rows, []))
+    _check_header(header, columns)
+    for line, row in enumerate(rows, start=2):
+        if not any(cell not in (None, "") for cell in row):
+            continue
+        yield line, {k: "" if v is None else str(v) for k, v in zip(header, row)}
+
+
+def read_rows(fileobj, filename, columns=COLUMNS):
+    """Rows of a CSV or XLSX upload; ``columns`` are the required header cells."""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return read_xlsx(fileobj, columns)
+    return read_csv(fileobj, columns)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.rejected = 0
+        self.errors = []          # [(line, message)], capped at MAX_REPORTED_ERRORS
+
+    def error(self, line, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "rejected": self.rejected,
+            "errors": [{"line": line, "error": message} for line, message in self.errors],
+        }
+
+
+def _validate(line, row, seen_emails, seen_ids, report):
+    values = {c: (row.get(c) or "").strip() for c in COLUMNS}
+    missing = [c for c in COLUMNS if not values[c]]
+    if missing:
+        report.error(line, "Missing " + ", ".join(missing))
+        return None
+    try:
+        validate_email(values["email"])
+    except ValidationError:
+        report.error(line, f"Invalid email: {values['email']}")
+        return None
+    if values["email"] in seen_emails:
+        report.error(line, f"Duplicate email in file: {values['email']}")
+        return None
+    if values["student_id"] in seen_ids:
+        report.error(line, f"Duplicate student ID in file: {values['student_id']}")
+        return None
+    seen_emails.add(values["email"])
+    seen_ids.add(values["student_id"])
+    return values
+
+
+def _hash_slice(passwords):
+    hasher = ImportPBKDF2PasswordHasher()
+    return [make_password(raw, hasher=hasher) for raw in passwords]
+
+
+def _hash_passwords(passwords, hash_pool):
+    # one task per worker rather than per password: submit() overhead is not free
+    step = -(-len(passwords) // _HASH_WORKERS)
+    slices = [passwords[i:i + step] for i in range(0, len(passwords), step)]
+    return [hashed for part in hash_pool.map(_hash_slice, slices) for hashed in part]
+
+
+def _unclaimed(institution, chunk, report):
+    """The rows of the chunk whose email and student_id are still free (one query)."""
+    emails = [v["email"] for _, v in chunk]
+    ids = [v["student_id"] for _, v in chunk]
+    taken = Student.objects.filter(
+        Q(email__in=emails) | Q(student_id__in=ids), institution=institution
+    ).values_list("email", "student_id")
+    taken_emails = {e for e, _ in taken}
+    taken_ids = {s for _, s in taken}
+
+    fresh = []
+    for line, v in chunk:
+        if v["email"] in taken_emails:
+            report.error(line, f"Email already exists: {v['email']}")
+        elif v["student_id"] in taken_ids:
+            report.error(line, f"Student ID already exists: {v['student_id']}")
+        else:
+            fresh.append((line, v))
+    return fresh
+
+
+def _insert_one_by_one(rows, report):
+    """Fallback when the bulk insert hits a clash: insert each row, reporting the ones that fail."""
+    created = []
+    for line, student in rows:
+        try:
+            with transaction.atomic():
+                student.save(force_insert=True)
+        except IntegrityError:
+            report.error(line, f"Email or student ID already exists: {student.email} / {student.student_id}")
+        else:
+            created.append(student)
+    return created
+
+
+def harden_import_hashes(pks=None, workers=1) -> int:
+    """
+    Wrap import-cost student hashes (all of them, or those of ``pks``) at the
+    full PBKDF2 cost. Rows whose password changed meanwhile (login upgrade,
+    reset) are left alone. Returns the number wrapped.
+    """
+    hasher = WrappedImportPBKDF2PasswordHasher()
+    students = Student.objects.filter(password__startswith="pbkdf2_sha256$")
+    if pks is not None:
+        students = students.filter(pk__in=pks)
+    rows = [row for row in students.values_list("pk", "email", "password")
+            if ImportPBKDF2PasswordHasher.is_import_cost(row[2])]
+    wrapped = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(rows), HARDEN_CHUNK_SIZE):
+            chunk = rows[start:start + HARDEN_CHUNK_SIZE]
+            hashes = pool.map(hasher.wrap, [password for _, _, password in chunk])
+            with transaction.atomic():
+                for (pk, email, password), new in zip(chunk, hashes):
+                    if Student.objects.filter(pk=pk, password=password).update(password=new):
+                        invalidate_student_logins([email])
+                        wrapped += 1
+    return wrapped
+
+
+# one thread, so hardening never takes more than a core from the web workers
+_hardening_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="icms-harden")
+
+
+def _harden(pks):
+    try:
+        harden_import_hashes(pks)
+    except Exception:
+        logger.exception("Hardening %d imported password hash(es) failed; run manage.py hash_passwords", len(pks))
+    finally:
+        connection.close()   # this thread's own connection
+
+
+def _harden_in_background(pks):
+    _hardening_pool.submit(_harden, pks)
+
+
+def _harden_after_commit(pks):
+    if pks:
+        transaction.on_commit(lambda: _harden_in_background(pks))
+
+
+def _import_chunk(institution, chunk, report, hash_pool):
+    with transaction.atomic():
+        # lock the institution row (on backends that support it) while seats are
+        # taken; the clash check runs under the same lock
+        seats = (Institution.objects.select_for_update()
+                 .values_list("student_limit", "student_count").get(pk=institution.pk))
+        fresh = _unclaimed(institution, chunk, report)
+        free = max(seats[0] - seats[1], 0)
+        for line, v in fresh[free:]:
+            report.error(line, "Student limit reached.")
+        fresh = fresh[:free]
+        if not fresh:
+            return
+
+        hashes = _hash_passwords([v["password"] for _, v in fresh], hash_pool)
+        rows = [
+            (line, Student(institution=institution, name=v["name"], email=v["email"],
+                           student_id=v["student_id"], password=hashed))
+            for (line, v), hashed in zip(fresh, hashes)
+        ]
+        for _, student in rows:
+            student._counted = True   # seats are counted below, not by the post_save receiver
+        try:
+            # a student added outside enrol() / the import (admin, shell) skips the lock
+            with transaction.atomic():
+                created = Student.objects.bulk_create([student for _, student in rows], batch_size=500)
+        except IntegrityError:
+            for _, student in rows:
+                student.pk = None
+            created = _insert_one_by_one(rows, report)
+        # bulk_create sends no post_save: count the seats here
+        Institution.objects.filter(pk=institution.pk).update(student_count=F("student_count") + len(created))
+        _harden_after_commit([student.pk for student in created])
+    invalidate_student_logins(student.email for student in created)
+    invalidate_admin_stats()
+    report.created += len(created)
+
+
+def import_students(institution, rows, chunk_size=CHUNK_SIZE) -> ImportReport:
+    """
+    Import (line, row dict) pairs into the institution. Rows that fail
+    validation, clash with existing students or exceed student_limit are
+    reported and skipped.
+    """
+    report = ImportReport()
+    seen_emails, seen_ids = set(), set()
+    rows = iter(rows)
+    with ThreadPoolExecutor(max_workers=_HASH_WORKERS) as hash_pool:
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            chunk = []
+            for line, row in batch:
+                values = _validate(line, row, seen_emails, seen_ids, report)
+                if values is not None:
+                    chunk.append((line, values))
+            if chunk:
+                _import_chunk(institution, chunk, report, hash_pool)
+    return report
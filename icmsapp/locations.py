@@ -0,0 +1,235 @@
+"""
+State / UT -> district lists for the registration forms, and the
+location index behind the autocomplete API.
+
+The map never changes at runtime, so it is serialised once per process
+(DISTRICTS_JSON, plus a gzipped copy) and versioned by content hash. The
+build_districts_asset command writes the same bytes as a fingerprinted
+static file (states_districts.<hash>.json, with .gz / .br siblings for
+servers that serve precompressed files), which step1 fetches once and
+then looks districts up in the browser. get_districts serves the same
+JSON as a cacheable GET for clients without the static file.
+
+Names are cleaned once at import (trimmed, single-spaced, all-lowercase
+entries capitalised). LocationIndex keys them by casefolded form: exact
+lookups are a dict hit, prefix queries walk a trie whose nodes hold their
+ranked matches, and a trigram pass catches typos when no prefix matches.
+"""
+import gzip
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+
+STATES_DISTRICTS = {
+    'Andhra Pradesh':['Anantapur', 'Chittoor' , 'East Godavari' , 'Krishna' , 'kurnool' , 'Nellore' , 'Prakasam' , 'Srikakulam' , 'Viskhapattanam' , 'Vizianagaram' , 'West Godavari' , 'YSR Kadapa'] ,
+    'Arunachal Pradesh':['Tawng' ,'West Kameng' ,' East Kameng' , 'Papum Pare' ,'Kurung Kumey','Kra Daadi' , 'Lower Subansiri', 'Upper Subansiri' , 'West Siang' , 'East Siang' , 'Siang' , 'Upper Sing' , 'Lower Sing' ,'Dibing Valley' , 'Anjaw' , 'Lohit' ,'Namasai', 'Changlang' , 'Tirap' , 'Longding' ],
+    'Assam':['Baksa' , 'Barpeta' , 'Biswanath' , 'Bongaigaon' , 'Cachar' , 'Charaideo' , 'Chirang' , 'Darrang' , 'Dhemaji' , 'Dhubri' , 'Dibrugarh' , 'Dima Hasao (formerly North Cachar Hills)' , 'Goalpara' , 'Golaghat' , 'Hailakandi' , 'Hojai' , 'Jorhat' , 'Kamrup' , 'Kamrup Metropolitan' , 'Karbi Anglong' , 'Karimganj' , 'Kokrajhar' , 'Lakhimpur' , 'Majuli ' , 'Morigaon' , 'Nagaon' , 'Nalbari' , 'Sivasagar' , 'Sonitpur' , 'South Salmara-Mankachar' , 'Tinsukia' , 'Udalguri' , 'West Karbi Anglong' , 'Tamulpur' , 'Bajali'],
+    'Bihar':['Patna' , 'Nalanda' , 'Bhojpur' , 'Buxar' , 'Rohtas' , 'Muzaffarpur' , 'Vaishali' , 'Sitamarhi' , 'Sheohar' , 'East Champaran (Motihari)' , 'West Champaran (Bettiah)' , 'Darbhanga' , 'Madhubani' , 'Samastipur' , 'Saharsa' , 'Supaul' , 'Madhepura' , 'Purnia' , 'Araria' , 'Kishanganj' , 'Katihar' ,'Bhagalpur' , 'Banka' , 'Munger' , 'Jamui' , 'Lakhisarai' , 'Sheikhpura' , 'Gaya', 'Nawada' , 'Aurangabad' ,'Jehanabad', 'Arwal', 'Saran (Chhapra)', 'Siwan' , 'Gopalganj'],
+    'Chhattisgarh':['Balod','Baloda Bazar','Balrampur','Bastar','Bemetara','Bijapur','Bilaspur','Dantewada (South Bastar)','Dhamtari','Durg','Gariaband','Gaurela-Pendra-Marwahi','Janjgir-Champa','Jashpur','Kabirdham (Kawardha)','Kanker (North Bastar)','Kondagaon','Korba','Koriya','Mahasamund','Mungeli','Narayanpur','Raigarh','Raipur','Rajnandgaon','Sukma','Surajpur','Surguja','Sarangarh-Bilaigarh','Khairagarh-Chhuikhadan-Gandai','Manendragarh-Chirmiri-Bharatpur','Mohla-Manpur-Ambagarh Chowki'],
+    'Goa':['North Goa','South Goa'],
+    'Gujarat':['Ahmedabad','Amreli','Anand','Aravalli','Banaskantha (Palanpur)','Bharuch','Bhavnagar','Botad','Chhota Udaipur', 'Dahod','Dang (Ahwa)','Devbhoomi Dwarka','Gandhinagar','Gir Somnath', 'Jamnagar','Junagadh','Kheda (Nadiad)','Kutch (Bhuj)','Mahisagar','Mehsana','Morbi','Narmada (Rajpipla)','Navsari','Panchmahal (Godhra)','Patan','Porbandar','Rajkot','Sabarkantha (Himmatnagar)','Surat','Surendranagar','Tapi (Vyara)','Vadodara','Valsad'],	
+    'Haryana':['Ambala','Bhiwani','Charkhi Dadri','Faridabad','Fatehabad','Gurugram','Hisar','Jhajjar','Jind','Kaithal','Karnal','Kurukshetra','Mahendragarh','Nuh','Palwal','Panchkula','Panipat','Rewari','Rohtak','Sirsa','Sonipat','Yamunanagar'],	
+    'Himachal Pradesh':['Bilaspur','Chamba','Hamirpur','Kangra','Kinnaur','Kullu','Lahaul and Spiti','Mandi','Shimla','Sirmaur','Solan','Una'],	
+    'Jharkhand':['Bokaro','Chatra','Deoghar','Dhanbad', 'Dumka','East Singhbhum','Garhwa','Giridih','Godda','Gumla','Hazaribagh','Jamtara','Khunti','Koderma','Latehar','Lohardaga', 'Pakur','Palamu','Ramgarh','Ranchi','Sahebganj','Seraikela Kharsawan','Simdega','West Singhbhum'],
+    'Karnataka': [ 'Bagalkot','Ballari','Belagavi','Bengaluru Rural','Bengaluru Urban','Bidar','Chamarajanagar','Chikballapur','Chikkamagaluru','Chitradurga','Dakshina Kannada','Davanagere','Dharwad','Gadag', 'Hassan','Haveri','Kalaburagi','Kodagu','Kolar','Koppal','Mandya','Mysuru','Raichur','Ramanagara','Shivamogga','Tumakuru', 'Udupi','Uttara Kannada','Vijayapura','Yadgir','Vijayanagara'],
+    'Kerala': ['Alappuzha','Ernakulam','Idukki','Kannur','Kasaragod','Kollam','Kottayam','Kozhikode','Malappuram','Palakkad','Pathanamthitta','Thiruvananthapuram','Thrissur','Wayanad'],
+    'Madhya Pradesh':['Agar Malwa','Alirajpur','Anuppur','Ashoknagar','Balaghat','Barwani','Betul','Bhind','Bhopal','Burhanpur','Chhatarpur','Chhindwara','Damoh','Datia','Dewas','Dhar','Dindori','Guna','Gwalior','Harda','Hoshangabad','Indore','Jabalpur','Jhabua','Katni','Khandwa','Khargone','Mandla','Mandsaur','Morena','Narsinghpur','Neemuch','Niwari','Panna','Raisen','Rajgarh','Ratlam','Rewa','Sagar','Satna','Sehore','Seoni','Shahdol','Shajapur','Sheopur','Shivpuri','Sidhi','Singrauli','Tikamgarh','Ujjain','Umaria','Vidisha'],
+    'Maharashtra': ['Ahmednagar','Akola','Amravati','Aurangabad','Beed','Bhandara','Buldhana','Chandrapur','Dhule','Gadchiroli','Gondia','Hingoli','Jalgaon','Jalna','Kolhapur','Latur','Mumbai City','Mumbai Suburban','Nagpur','Nanded','Nandurbar','Nashik','Osmanabad','Palghar','Parbhani','Pune','Raigad','Ratnagiri','Sangli','Satara','Sindhudurg','Solapur','Thane','Wardha','Washim','Yavatmal'],
+    'Manipur':['Bishnupur','Chandel','Churachandpur','Imphal East','Imphal West', 'Jiribam','Kakching','Kamjong','Kangpokpi','Noney', 'Pherzawl', 'Senapati','Tamenglong','Tengnoupal','Thoubal','Ukhrul'],	
+    'Meghalaya':['East Garo Hills','East Jaintia Hills','East Khasi Hills','North Garo Hills','Ri Bhoi','South Garo Hills','South West Garo Hills','South West Khasi Hills','West Garo Hills','West Jaintia Hills','West Khasi Hills','South West Khasi Hills'],
+    'Mizoram':['Aizawl','Champhai','Kolasib', 'Lawngtlai','Lunglei', 'Mamit','Saiha','Serchhip','Hnahthial','Saitual','Khawzawl'],	
+    'Nagaland':[ 'Dimapur','Kiphire','Kohima','Longleng','Mokokchung','Mon','Peren','Phek','Tuensang','Wokha', 'Zunheboto','Noklak'],	
+    'Odisha':['Angul','Balangir','Balasore','Bargarh','Bhadrak','Boudh','Cuttack','Deogarh','Dhenkanal','Gajapati','Ganjam', 'Jagatsinghpur', 'Jajpur', 'Jharsuguda', 'Kalahandi','Kandhamal','Kendrapara', 'Kendujhar (Keonjhar)','Khordha','Koraput','Malkangiri', 'Mayurbhanj', 'Nabarangpur',  'Nayagarh', 'Nuapada', 'Puri','Rayagada', 'Sambalpur', 'Sonepur','Sundergarh'],	
+    'Punjab':['Amritsar','Barnala', 'Bathinda','Faridkot', 'Fatehgarh Sahib', 'Fazilka', 'Ferozepur', 'Gurdaspur','Hoshiarpur',  'Jalandhar', 'Kapurthala', 'Ludhiana','Mansa','Moga','Muktsar','Nawanshahr (Shahid Bhagat Singh Nagar)','Pathankot','Patiala','Rupnagar','Sangrur','SAS Nagar (Mohali)','Tarn Taran'],	
+    'Rajasthan':['Ajmer', 'Alwar', 'Banswara', 'Baran', 'Barmer', 'Bharatpur', 'Bhilwara', 'Bikaner', 'Bundi', 'Chittorgarh', 'Churu', 'Dausa', 'Dholpur','Dungarpur','Hanumangarh','Jaipur','Jaisalmer','Jalore','Jhalawar','Jhunjhunu','Jodhpur', 'Karauli','Kota','Nagaur','Pali','Pratapgarh','Rajsamand','Sawai Madhopur', 'Sikar','Sirohi','Tonk','Udaipur'],
+    'Sikkim':['East Sikkim','North Sikkim','South Sikkim','West Sikkim'],	
+    'Tamil Nadu':['Ariyalur','Chennai','Coimbatore', 'Cuddalore', 'Dharmapuri', 'Dindigul', 'Erode', 'Kanchipuram', 'Kanyakumari', 'Karur',  'Krishnagiri',  'Madurai', 'Nagapattinam', 'Namakkal', 'Perambalur', 'Pudukkottai','Ramanathapuram', 'Salem',  'Sivaganga',  'Tenkasi', 'Thanjavur','The Nilgiris', 'Theni',  'Thoothukudi (Tuticorin)', 'Tiruchirappalli', 'Tirunelveli','Tirupur','Tiruvallur', 'Tiruvannamalai','Tiruvarur','Vellore', 'Viluppuram','Virudhunagar'],	
+    'Telangana':['Adilabad','Bhadradri Kothagudem','Hyderabad','Jagtial','Jangaon','Jayashankar Bhoopalpally','Jogulamba Gadwal','Kamareddy','Karimnagar','Khammam','Komaram Bheem Asifabad','Mahabubabad','Mahbubnagar','Mancherial','Medak', 'Medchal-Malkajgiri', 'Mulugu','Nagarkurnool', 'Nalgonda','Narayanpet', 'Nirmal', 'Nizamabad','Peddapalli','Rajanna Sircilla', 'Rangareddy','Sangareddy','Siddipet','Suryapet','Vikarabad','Wanaparthy','Warangal Rural','Warangal Urban','Yadadri Bhuvanagiri'],
+    'Tripura':['Dhalai', 'Gomati','Khowai', 'North Tripura', 'Sepahijala', 'South Tripura','Unakoti','West Tripura'],	
+    'Uttar Pradesh':[ 'Agra','Aligarh','Ambedkar Nagar','Amethi','Amroha','Auraiya','Ayodhya','Azamgarh','Baghpat','Bahraich','Ballia','Balrampur','Banda','Barabanki','Bareilly','Basti','Bhadohi','Bijnor','Budaun','Bulandshahr','Chandauli','Chitrakoot','Deoria','Etah','Etawah','Farrukhabad','Fatehpur','Firozabad','Gautam Buddha Nagar','Ghaziabad', 'Ghazipur', 'Gonda', 'Gorakhpur','Hamirpur','Hapur','Hardoi','Hathras','Jalaun','Jaunpur','Jhansi','Kannauj','Kanpur Dehat','Kanpur Nagar','Kasganj','Kaushambi','Kushinagar','Lakhimpur Kheri','Lalitpur','Lucknow','Maharajganj', 'Mahoba','Mainpuri','Mathura','Mau','Meerut','Mirzapur', 'Moradabad','Muzaffarnagar','Pilibhit','Pratapgarh','Raebareli', 'Rampur', 'Saharanpur', 'Sambhal','Sant Kabir Nagar','Shahjahanpur', 'Shamli', 'Shravasti','Siddharthnagar', 'Sitapur', 'Sonbhadra', 'Sultanpur', 'Unnao','Varanasi'],	
+    'Uttarakhand':['Almora','Bageshwar','Chamoli','Champawat','Dehradun', 'Haridwar','Nainital','Pauri Garhwal', 'Pithoragarh','Rudraprayag','Tehri Garhwal','Udham Singh Nagar','Uttarkashi'],	
+    'West Bengal':[ 'Alipurduar', 'Bankura', 'Birbhum','Cooch Behar','Dakshin Dinajpur', 'Darjeeling', 'Hooghly','Howrah','Jalpaiguri', 'Jhargram', 'Kalimpong', 'Kolkata', 'Malda', 'Murshidabad', 'Nadia', 'North 24 Parganas','Paschim Bardhaman','Paschim Medinipur','Purba Bardhaman','Purba Medinipur', 'Purulia',  'South 24 Parganas','Uttar Dinajpur'],
+}
+
+
+def normalize(name) -> str:
+    """Lookup key: casefolded, trimmed, inner whitespace collapsed."""
+    return " ".join(str(name or "").split()).casefold()
+
+
+def _canonical(name) -> str:
+    name = " ".join(name.split())
+    return name.title() if name.islower() else name
+
+
+def _clean(states_districts):
+    cleaned = {}
+    for state, districts in states_districts.items():
+        names = cleaned.setdefault(_canonical(state), [])
+        for district in map(_canonical, districts):
+            if district not in names:
+                names.append(district)
+    return cleaned
+
+
+STATES_DISTRICTS = _clean(STATES_DISTRICTS)
+STATES = list(STATES_DISTRICTS)
+
+DISTRICTS_JSON = json.dumps(STATES_DISTRICTS, separators=(",", ":"), ensure_ascii=False).encode()
+DISTRICTS_GZIP = gzip.compress(DISTRICTS_JSON, compresslevel=9, mtime=0)
+DISTRICTS_VERSION = hashlib.sha256(DISTRICTS_JSON).hexdigest()[:12]
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+ASSET_PREFIX = "data/states_districts."
+DISTRICTS_ASSET = f"{ASSET_PREFIX}{DISTRICTS_VERSION}.json"
+
+
+def asset_built() -> bool:
+    """Is the fingerprinted file for the current map in the app's static dir?"""
+    return (STATIC_DIR / DISTRICTS_ASSET).is_file()
+
+
+# ---------------------------------------------------------------- index
+
+def _trigrams(key) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Trie:
+    """
+    Prefix trie over normalised names. Every node keeps the ids of the
+    entries below it, already ranked (whole-name prefix before word
+    prefix, then alphabetical), so a query is one walk plus a slice.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key, rank):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault(None, []).append(rank)
+
+    def freeze(self, names):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            ranks = node.pop(None, None)
+            if ranks is not None:
+                ids = []
+                for _, entry in sorted(set(ranks), key=lambda r: (r[0], names[r[1]])):
+                    if entry not in ids:
+                        ids.append(entry)
+                node[None] = tuple(ids)
+            stack.extend(child for char, child in node.items() if char is not None)
+
+    def search(self, key) -> tuple:
+        node = self.root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return ()
+        return node.get(None, ())
+
+
+class _Scope:
+    """Trie + exact map + trigram postings over one list of entries."""
+
+    def __init__(self, entries, names):
+        self.entries = entries
+        self.exact = {}
+        self.trie = _Trie()
+        self.trigrams = defaultdict(list)
+        self.gram_counts = {}
+        for entry in entries:
+            key = normalize(names[entry])
+            self.exact.setdefault(key, entry)
+            self.trie.insert(key, (0, entry))
+            words = key.split()
+            for i in range(1, len(words)):
+                self.trie.insert(" ".join(words[i:]), (1, entry))
+            grams = _trigrams(key)
+            self.gram_counts[entry] = len(grams)
+            for gram in grams:
+                self.trigrams[gram].append(entry)
+        self.trie.freeze(names)
+
+    def fuzzy(self, key, names, limit, threshold=0.35):
+        """Entries by trigram (Jaccard) similarity to ``key``, best first."""
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for entry in self.trigrams.get(gram, ()):
+                shared[entry] += 1
+        scored = []
+        for entry, common in shared.items():
+            score = common / (len(grams) + self.gram_counts[entry] - common)
+            if score >= threshold:
+                scored.append((-score, names[entry], entry))
+        return [entry for _, _, entry in sorted(scored)[:limit]]
+
+
+class LocationIndex:
+    """
+    States and districts with canonical names. ``search`` answers the
+    autocomplete API; ``state`` / ``district`` map user input to the
+    canonical spelling (or None).
+    """
+
+    def __init__(self, states_districts):
+        # entry id -> (kind, canonical name, state)
+        self.entries = []
+        state_ids, district_ids = [], []
+        by_state = defaultdict(list)
+        for state, districts in states_districts.items():
+            state_ids.append(len(self.entries))
+            self.entries.append(("state", state, state))
+            for district in districts:
+                by_state[state].append(len(self.entries))
+                district_ids.append(len(self.entries))
+                self.entries.append(("district", district, state))
+
+        names = [name for _, name, _ in self.entries]
+        self._names = names
+        self._states = _Scope(state_ids, names)
+        self._districts = _Scope(district_ids, names)
+        self._state_districts = {normalize(state): _Scope(ids, names) for state, ids in by_state.items()}
+
+    def _scope(self, kind, state):
+        if kind == "state":
+            return self._states
+        if state:
+            return self._state_districts.get(normalize(state))
+        return self._districts
+
+    def state(self, name):
+        entry = self._states.exact.get(normalize(name))
+        return None if entry is None else self._names[entry]
+
+    def district(self, name, state=None):
+        scope = self._scope("district", state)
+        entry = scope.exact.get(normalize(name)) if scope else None
+        return None if entry is None else self._names[entry]
+
+    def search(self, q, kind="district", state=None, limit=10) -> list:
+        """
+        Up to ``limit`` {'name', 'state', 'kind'} dicts for the query:
+        prefix matches (of the name or of any word in it), or, when a query
+        of three or more characters has none, near-misses by trigram
+        similarity.
+        """
+        scope = self._scope(kind, state)
+        key = normalize(q)
+        if scope is None or not key:
+            return []
+        ids = scope.trie.search(key)[:limit]
+        if not ids and len(key) >= 3:
+            ids = scope.fuzzy(key, self._names, limit)
+        return [{"name": name, "state": state, "kind": kind}
+                for kind, name, state in map(self.entries.__getitem__, ids)]
+
+
+location_index = LocationIndex(STATES_DISTRICTS)
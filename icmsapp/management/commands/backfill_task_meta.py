@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from icmsapp.models import Content, TaskMeta, GST_TASK_COURSE
+
+
+class Command(BaseCommand):
+    help = "Rebuild TaskMeta rows for every task in the GST returns course."
+
+    def handle(self, *args, **options):
+        count = 0
+        contents = (Content.objects.filter(course__slug=GST_TASK_COURSE)
+                    .select_related("topic").order_by("number"))
+        for content in contents.iterator():
+            TaskMeta.refresh(content)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task meta for {count} task(s)."))
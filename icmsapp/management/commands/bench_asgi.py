@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from icmsapp.caches import content1_ids
+from icmsapp.locations import STATES_DISTRICTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test for the async JSON endpoints (institution_count, get_districts, "
+        "resend_otp, course_content_basic, gstr1_task_meta). By default it runs "
+        "in-process, once through the WSGI handler (a thread per concurrent "
+        "client) and once through the ASGI handler (one event loop). With "
+        "--url it drives a running server instead, e.g. gunicorn icmspro.wsgi "
+        "and then uvicorn icmspro.asgi:application, for the deployed numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=2000, help="total per run")
+        parser.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:8000")
+
+    def handle(self, *args, **options):
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        calls = self._calls()
+        concurrency, total = options["concurrency"], options["requests"]
+        if options["url"]:
+            self._report(options["url"], *self._run_http(options["url"], calls, concurrency, total))
+            return
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            self._report("wsgi (threads)", *self._run_wsgi(calls, concurrency, total))
+            self._report("asgi (event loop)", *asyncio.run(self._run_asgi(calls, concurrency, total)))
+
+    def _calls(self):
+        """(method, path, json body or None) for each endpoint, used round-robin."""
+        content_id = content1_ids.first_from(2) or content1_ids.first()
+        calls = [
+            ("get", reverse("institution_count"), None),
+            ("post", reverse("get_districts"), {"state": next(iter(STATES_DISTRICTS), "")}),
+            ("post", reverse("resend_otp"), {"type": "mobile"}),
+            ("get", reverse("gstr1_task_meta_auto"), None),
+        ]
+        if content_id is not None:
+            calls.append(("get", reverse("course_content_basic", args=[content_id]), None))
+            calls.append(("get", reverse("gstr1_task_meta_by_id", args=[content_id]), None))
+        return calls
+
+    def _run_wsgi(self, calls, concurrency, total):
+        latencies, errors = [], []
+
+        def client_loop(n):
+            client = Client()
+            try:
+                for i in range(n, total, concurrency):
+                    method, path, body = calls[i % len(calls)]
+                    started = time.perf_counter()
+                    if body is None:
+                        response = getattr(client, method)(path)
+                    else:
+                        response = getattr(client, method)(path, json.dumps(body), content_type="application/json")
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(client_loop, range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    async def _run_asgi(self, calls, concurrency, total):
+        latencies, errors = [], []
+
+        async def client_loop(n):
+            client = AsyncClient()
+            for i in range(n, total, concurrency):
+                method, path, body = calls[i % len(calls)]
+                started = time.perf_counter()
+                if body is None:
+                    response = await getattr(client, method)(path)
+                else:
+                    response = await getattr(client, method)(path, json.dumps(body), content_type="application/json")
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    def _run_http(self, base_url, calls, concurrency, total):
+        latencies, errors = [], []
+        base_url = base_url.rstrip("/")
+
+        def client_loop(n):
+            for i in range(n, total, concurrency):
+                method, path, body = calls[i % len(calls)]
+                request = urllib.request.Request(
+                    base_url + path, method=method.upper(),
+                    data=None if body is None else json.dumps(body).encode(),
+                    headers={"Content-Type": "application/json"},
+                )
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                except urllib.error.HTTPError as e:
+                    errors.append(e.code)
+                except OSError as e:
+                    errors.append(type(e).__name__)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(client_loop, range(concurrency)))
+        return time.perf_counter() - started, latencies, errors
+
+    def _report(self, label, elapsed, latencies, errors):
+        if not latencies:
+            self.stdout.write(f"{label:<20} no requests completed")
+            return
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        distinct = sorted(set(errors), key=str)[:3]
+        self.stdout.write(
+            f"{label:<20} {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:6.1f} ms  p95 {p95 * 1000:6.1f} ms  "
+            f"{len(errors):4d} errors {distinct if errors else ''}"
+        )
@@ -0,0 +1,113 @@
+import random
+import timeit
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from icmsapp.models import Institution, Student, Invoice, InvoiceItem
+from icmsapp.returns import build_gstr1_summary, B2CL_LIMIT
+
+RATES = [Decimal(r) for r in ("0.25", "3", "5", "12", "18", "28")]
+HSN_CODES = ["8471", "8517", "9403", "6109", "3004", "9983", "9954", "8703"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark: GSTR-1 summary over N generated invoices, grouped in the database "
+        "vs. summed row by row in Python. Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--invoices", type=int, default=100_000)
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["invoices"], options["rounds"], random.Random(options["seed"]))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, count, rounds, rnd):
+        institution = Institution.objects.create(
+            name="bench", email="bench-gstr1@example.invalid", password="-",
+            student_limit=1, validity=date(2099, 12, 31),
+        )
+        student = Student.objects.create(
+            institution=institution, name="bench", email="bench-gstr1@example.invalid",
+            student_id="bench", password="-",
+        )
+        gstin, period = "32BACXM3031K1Z5", "092021"
+
+        self.stdout.write(f"Generating {count} invoices ...")
+        invoices = []
+        for n in range(count):
+            registered = rnd.random() < 0.6
+            inter_state = rnd.random() < 0.3
+            invoices.append(Invoice(
+                student=student, gstin=gstin, fy="2021-2022", period=period,
+                recipient_gstin=f"32AAAAA{n % 10000:04d}A1Z5" if registered else "",
+                recipient_name=f"Recipient {n % 10000}",
+                invoice_no=f"B{n}", invoice_date=date(2021, 9, 1 + n % 30),
+                total_value=Decimal(rnd.choice((5_000, 50_000, 150_000, 300_000))),
+                supply_type="Inter-State" if inter_state else "Intra-State",
+            ))
+        Invoice.objects.bulk_create(invoices, batch_size=2000)
+
+        items = []
+        for inv in invoices:
+            for _ in range(rnd.randint(1, 3)):
+                rate = rnd.choice(RATES)
+                taxable = (inv.total_value / 2).quantize(Decimal("0.01"))
+                tax = (taxable * rate / 100).quantize(Decimal("0.01"))
+                if inv.supply_type == "Inter-State":
+                    igst, cgst, sgst = tax, Decimal("0"), Decimal("0")
+                else:
+                    igst, cgst, sgst = Decimal("0"), tax / 2, tax / 2
+                items.append(InvoiceItem(
+                    invoice=inv, hsn_code=rnd.choice(HSN_CODES), rate=rate,
+                    taxable_value=taxable, integrated_tax=igst,
+                    central_tax=cgst, state_tax=sgst,
+                ))
+        InvoiceItem.objects.bulk_create(items, batch_size=2000)
+        self.stdout.write(f"  {len(items)} invoice items")
+
+        def grouped():
+            return build_gstr1_summary(student.pk, gstin, [period])
+
+        def row_by_row():
+            sections = {}
+            rows = InvoiceItem.objects.filter(
+                invoice__student=student, invoice__gstin=gstin, invoice__period=period,
+            ).values_list(
+                "invoice__recipient_gstin", "invoice__supply_type", "invoice__total_value",
+                "taxable_value", "integrated_tax", "central_tax", "state_tax", "cess",
+            )
+            for rgstin, supply, value, *amounts in rows.iterator(chunk_size=5000):
+                if rgstin:
+                    key = "B2B"
+                elif supply == "Inter-State" and value > B2CL_LIMIT:
+                    key = "B2CL"
+                else:
+                    key = "B2CS"
+                acc = sections.setdefault(key, [Decimal("0")] * 5)
+                for i, amount in enumerate(amounts):
+                    acc[i] += amount
+            return sections
+
+        result = grouped()[period]
+        check = row_by_row()
+        for name, acc in check.items():
+            assert result[name]["taxable_value"] == acc[0], name
+
+        for label, fn in (("GROUP BY", grouped), ("row by row", row_by_row)):
+            total = timeit.timeit(fn, number=rounds)
+            self.stdout.write(f"{label:<11} {total / rounds * 1000:10.1f} ms/summary  ({count} invoices x {rounds} rounds)")
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from icmsapp.caches import content1_ids
+
+ENGINES = ("db", "cached_db", "cache", "signed_cookies")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: N concurrent students each log in and walk the TRN / OTP / "
+        "NIL-return practice flow, once per session engine, with the practice "
+        "flows on the regular session and on the signed practice cookie. "
+        "Runs in-process against the configured database; the sessions it "
+        "creates are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=3, help="flows per student")
+        parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+
+    def handle(self, *args, **options):
+        # failed requests are counted below, not logged with a traceback each
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        content_id = content1_ids.first_from(2) or content1_ids.first()
+        for engine in options["engines"]:
+            for practice_cookie in (False, True):
+                if engine == "signed_cookies" and practice_cookie:
+                    continue
+                label = f"{engine} + {'practice cookie' if practice_cookie else 'session'}"
+                with override_settings(
+                    SESSION_ENGINE="django.contrib.sessions.backends." + engine,
+                    ICMS_PRACTICE_COOKIE=practice_cookie,
+                    ALLOWED_HOSTS=["testserver"],
+                ):
+                    self._run(label, options["students"], options["rounds"], content_id)
+
+    def _flow(self, client, content_id):
+        """One student: admin-style login (a session write) plus the practice flow."""
+        yield client.post(reverse("log"), {"loginType": "administrator",
+                                           "email": "icomvidya123@gmail.com", "password": "icomvidya"})
+        yield client.get(reverse("trn_page"))
+        yield client.post(reverse("trn_page"), {"trn": "201600059591TRN", "captcha": "519741"})
+        yield client.post(reverse("verify_otp"), {"otp": "123456", "qid": "9"})
+        yield client.get(reverse("NIL_Return_Filinglog"))
+        yield client.post(reverse("NIL_Return_Filinglog"),
+                          {"username": "VIJAY@51", "password": "Vjy@051", "captcha": "519741"})
+        if content_id is not None:
+            yield client.get(reverse("trn_dashboard_with_id", args=[content_id]))
+
+    def _run(self, label, students, rounds, content_id):
+        errors = []
+        requests = 0
+        lock = threading.Lock()
+        session_keys = set()
+
+        def student(_):
+            nonlocal requests
+            client = Client()
+            done = 0
+            try:
+                for _ in range(rounds):
+                    for response in self._flow(client, content_id):
+                        done += 1
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+            except Exception as e:           # e.g. "database is locked"
+                errors.append(type(e).__name__ + ": " + str(e)[:60])
+            finally:
+                cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+                with lock:
+                    requests += done
+                    if cookie:
+                        session_keys.add(cookie.value)
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=students) as pool:
+            list(pool.map(student, range(students)))
+        elapsed = time.perf_counter() - started
+        Session.objects.filter(session_key__in=session_keys).delete()
+
+        distinct = sorted(set(errors), key=str)[:3]
+        self.stdout.write(
+            f"{label:<32} {requests / elapsed:8.1f} req/s  {requests:6d} requests  "
+            f"{len(errors):4d} errors {distinct if errors else ''}"
+        )
@@ -0,0 +1,37 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from icmsapp.models import Content, GST_TASK_COURSE
+from icmsapp.taskinfo import TaskInfoParser
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark: full task_info parse vs. memoised parse over the GST task corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+        corpus = list(Content.objects.filter(course__slug=GST_TASK_COURSE)
+                      .values_list("id", "task_info"))
+        if not corpus:
+            self.stdout.write("No task rows to benchmark.")
+            return
+
+        parser = TaskInfoParser()
+
+        def full():
+            for _, text in corpus:
+                parser.parse(text)
+
+        def cached():
+            for cid, text in corpus:
+                parser.parse_cached(cid, text)
+
+        cached()  # warm the memo
+        for label, fn in (("full parse", full), ("cached parse", cached)):
+            total = timeit.timeit(fn, number=rounds)
+            per_task = total / (rounds * len(corpus)) * 1e6
+            self.stdout.write(f"{label:<14} {per_task:10.2f} us/task  ({len(corpus)} tasks x {rounds} rounds)")
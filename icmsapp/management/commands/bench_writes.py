@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from icmsapp.models import Institution, Registration
+
+# SQLite out of the box, for comparison with the tuned OPTIONS from settings.py
+SQLITE_DEFAULTS = {"init_command": "PRAGMA journal_mode=DELETE; PRAGMA synchronous=FULL;", "timeout": 5}
+
+
+class Command(BaseCommand):
+    help = (
+        "Write-contention benchmark: N concurrent workers each enrol students "
+        "(Institution.enrol, as student_add does) and post registration wizard "
+        "steps. On SQLite it runs with SQLite's defaults and with the tuned "
+        "profile from settings.py; otherwise with the configured database. "
+        "Everything it creates is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=50)
+        parser.add_argument("--rounds", type=int, default=10, help="students + wizard posts per worker")
+
+    def handle(self, *args, **options):
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        db = connections.settings["default"]
+        if db["ENGINE"] != "django.db.backends.sqlite3":
+            self._run(db["ENGINE"].rsplit(".", 1)[-1], options["workers"], options["rounds"])
+            return
+
+        configured = db.get("OPTIONS", {})
+        try:
+            for label, sqlite_options in (("sqlite defaults", SQLITE_DEFAULTS), ("sqlite tuned", configured)):
+                connection.close()
+                db["OPTIONS"] = sqlite_options
+                self._run(label, options["workers"], options["rounds"])
+        finally:
+            connection.close()
+            db["OPTIONS"] = configured
+
+    def _run(self, label, workers, rounds):
+        institution = Institution.objects.create(
+            name="bench-writes", email="bench-writes@example.invalid", password="-",
+            student_limit=workers * rounds, validity=date(2099, 12, 31),
+        )
+        password = make_password("bench")
+        counts = {"enrol": 0, "wizard": 0}
+        errors = []
+        lock = threading.Lock()
+        session_keys = set()
+
+        def worker(n):
+            client = Client()
+            done = {"enrol": 0, "wizard": 0}
+            try:
+                for i in range(rounds):
+                    institution.enrol(name=f"S{n}-{i}", email=f"s{n}-{i}@example.invalid",
+                                      student_id=f"B{n}-{i}", password=password)
+                    done["enrol"] += 1
+                    response = client.post(reverse("step_promoters", args=[9]), {"name": f"P{n}-{i}"})
+                    if response.status_code >= 400:
+                        errors.append(response.status_code)
+                    else:
+                        done["wizard"] += 1
+            except Exception as e:           # e.g. "database is locked"
+                errors.append(type(e).__name__ + ": " + str(e)[:60])
+            finally:
+                cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+                with lock:
+                    for key in counts:
+                        counts[key] += done[key]
+                    if cookie:
+                        session_keys.add(cookie.value)
+                connection.close()
+
+        try:
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(worker, range(workers)))
+                elapsed = time.perf_counter() - started
+        finally:
+            Registration.objects.filter(session_key__in=session_keys).delete()
+            Session.objects.filter(session_key__in=session_keys).delete()
+            institution.delete()
+
+        writes = counts["enrol"] + counts["wizard"]
+        distinct = sorted(set(errors), key=str)[:3]
+        self.stdout.write(
+            f"{label:<16} {writes / elapsed:8.1f} ops/s  enrol {counts['enrol']:5d}  "
+            f"wizard {counts['wizard']:5d}  {len(errors):4d} errors {distinct if errors else ''}"
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from icmsapp.locations import (
+    ASSET_PREFIX, DISTRICTS_ASSET, DISTRICTS_GZIP, DISTRICTS_JSON, STATIC_DIR,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the state -> districts map to icmsapp/static as a fingerprinted "
+        "JSON file (states_districts.<hash>.json) with gzip and, when the "
+        "brotli package is installed, brotli copies next to it. Older "
+        "versions are removed. Run it (then collectstatic) after editing "
+        "STATES_DISTRICTS."
+    )
+
+    def handle(self, *args, **options):
+        path = STATIC_DIR / DISTRICTS_ASSET
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for old in path.parent.glob(ASSET_PREFIX.rsplit("/", 1)[-1] + "*"):
+            if not old.name.startswith(path.name):
+                old.unlink()
+                self.stdout.write(f"removed {old.name}")
+
+        path.write_bytes(DISTRICTS_JSON)
+        path.with_name(path.name + ".gz").write_bytes(DISTRICTS_GZIP)
+        written = [(path.name, len(DISTRICTS_JSON)), (path.name + ".gz", len(DISTRICTS_GZIP))]
+        try:
+            import brotli
+        except ImportError:
+            self.stdout.write("brotli not installed: skipping the .br copy")
+        else:
+            compressed = brotli.compress(DISTRICTS_JSON, quality=11)
+            path.with_name(path.name + ".br").write_bytes(compressed)
+            written.append((path.name + ".br", len(compressed)))
+
+        for name, size in written:
+            self.stdout.write(f"{name:<40} {size:6d} bytes")
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from icmsapp.imports import ImportFormatError, read_rows
+from icmsapp.models import Institution
+from icmsapp.practice import IMPORT_CHUNK_SIZE, IMPORTERS
+
+
+class Command(BaseCommand):
+    help = (
+        "Import practice TRN cases (trn, qid, legal_name, pan, state, district, "
+        "reason_default, commencement_date) or practice portal logins (portal, "
+        "username, password, content_number, company, month) from a CSV or XLSX "
+        "file. Existing TRNs / logins are updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--institution", metavar="EMAIL", help="owning institution (default: shared)")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        institution = None
+        if options["institution"]:
+            institution = Institution.objects.filter(email=options["institution"]).first()
+            if institution is None:
+                raise CommandError(f"No institution with email {options['institution']}")
+
+        columns, importer = IMPORTERS[options["kind"]]
+        started = time.perf_counter()
+        with open(options["path"], "rb") as f:
+            try:
+                report = importer(read_rows(f, options["path"], columns), institution=institution,
+                                  chunk_size=options["chunk_size"])
+            except ImportFormatError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors:
+            self.stdout.write(f"line {line}: {message}")
+        if len(report.errors) < report.rejected:
+            self.stdout.write(f"... {report.rejected - len(report.errors)} more")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.created} row(s), rejected {report.rejected} row(s) in {elapsed:.1f} s."
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from icmsapp.imports import CHUNK_SIZE, ImportFormatError, import_students, read_rows
+from icmsapp.models import Institution
+
+
+class Command(BaseCommand):
+    help = (
+        "Import students into an institution from a CSV or XLSX file with "
+        "name, email, student_id and password columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("institution_email")
+        parser.add_argument("path")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        institution = Institution.objects.filter(email=options["institution_email"]).first()
+        if institution is None:
+            raise CommandError(f"No institution with email {options['institution_email']}")
+
+        started = time.perf_counter()
+        with open(options["path"], "rb") as f:
+            try:
+                report = import_students(institution, read_rows(f, options["path"]),
+                                         chunk_size=options["chunk_size"])
+            except ImportFormatError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors:
+            self.stdout.write(f"line {line}: {message}")
+        if len(report.errors) < report.rejected:
+            self.stdout.write(f"... {report.rejected - len(report.errors)} more")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.created} student(s), rejected {report.rejected} row(s) in {elapsed:.1f} s."
+        ))
+        if report.created:
+            self.stdout.write("Bringing the imported password hashes up to full cost; this runs until done.")
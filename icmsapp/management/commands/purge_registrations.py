@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from icmsapp.models import Registration
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete practice registrations owned by a browser session (no student) "
+        "that have not been touched for --days days; their sessions are gone by then."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        deleted, _ = Registration.objects.filter(student__isnull=True, updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} row(s)."))
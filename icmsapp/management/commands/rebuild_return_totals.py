@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from icmsapp.returns import rebuild_return_totals
+
+
+class Command(BaseCommand):
+    help = "Recompute the GSTR-3B running totals (ReturnTotals) from the stored invoices."
+
+    def handle(self, *args, **options):
+        count = rebuild_return_totals()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt totals for {count} return(s)."))
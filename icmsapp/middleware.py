@@ -0,0 +1,60 @@
+"""
+Signed-cookie "practice session" for the lightweight practice flows.
+
+The TRN login / OTP pages, the NIL-return portal login and the task
+pages only carry a few small values between requests (the TRN, the
+question id, the last task opened). They keep them in
+request.practice_session, a signed_cookies session under its own cookie,
+instead of request.session. Those page views then never read or write
+the session backend (the database by default). Students still log in
+with the regular session, whichever SESSION_ENGINE is configured.
+
+The cookie is signed, not encrypted: put nothing secret in it.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date
+
+
+class PracticeSessionMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        if not settings.ICMS_PRACTICE_COOKIE:
+            request.practice_session = request.session
+            return
+        request.practice_session = SessionStore(request.COOKIES.get(settings.PRACTICE_SESSION_COOKIE_NAME))
+
+    def process_response(self, request, response):
+        practice = getattr(request, "practice_session", None)
+        if practice is None or practice is getattr(request, "session", None):
+            return response
+        if practice.accessed:
+            patch_vary_headers(response, ("Cookie",))
+        if not practice.modified or response.status_code >= 500:
+            return response
+
+        name = settings.PRACTICE_SESSION_COOKIE_NAME
+        if practice.is_empty():
+            # reading an absent cookie also marks the store modified
+            if name not in request.COOKIES:
+                return response
+            response.delete_cookie(name, path=settings.SESSION_COOKIE_PATH,
+                                   domain=settings.SESSION_COOKIE_DOMAIN,
+                                   samesite=settings.SESSION_COOKIE_SAMESITE)
+            return response
+
+        max_age = practice.get_expiry_age()
+        practice.save()
+        response.set_cookie(
+            name, practice.session_key,
+            max_age=max_age, expires=http_date(time.time() + max_age),
+            path=settings.SESSION_COOKIE_PATH,
+            domain=settings.SESSION_COOKIE_DOMAIN,
+            secure=settings.SESSION_COOKIE_SECURE or None,
+            httponly=settings.SESSION_COOKIE_HTTPONLY or None,
+            samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0010_coursetopic2_coursecontent2'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskMeta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gstin', models.CharField(blank=True, db_index=True, max_length=15)),
+                ('fy', models.CharField(blank=True, max_length=20)),
+                ('return_period', models.CharField(blank=True, max_length=40)),
+                ('trade_name', models.CharField(blank=True, max_length=255)),
+                ('legal_name', models.CharField(blank=True, max_length=255)),
+                ('gstr1_due_date', models.DateField(blank=True, null=True)),
+                ('gstr3b_due_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='task_meta', to='icmsapp.coursecontent1')),
+            ],
+        ),
+    ]
@@ -0,0 +1,141 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# (slug, title, template, old topic model, old content model)
+LEGACY_COURSES = [
+    ('gst-registration', 'Registration - GSTIN', 'course_overview.html', 'CourseTopic', 'CourseContent'),
+    ('nil-return-filing', 'NIL Return Filing', 'course_overview1.html', 'CourseTopic1', 'CourseContent1'),
+    ('gstr1-filing', 'E-Filing of GSTR1', 'course_overview2.html', 'CourseTopic2', 'CourseContent2'),
+]
+
+
+def copy_forward(apps, schema_editor):
+    Course = apps.get_model('icmsapp', 'Course')
+    Topic = apps.get_model('icmsapp', 'Topic')
+    Content = apps.get_model('icmsapp', 'Content')
+
+    for slug, title, template, topic_name, content_name in LEGACY_COURSES:
+        OldTopic = apps.get_model('icmsapp', topic_name)
+        OldContent = apps.get_model('icmsapp', content_name)
+        course = Course.objects.create(slug=slug, title=title, template=template)
+
+        # legacy ids are kept as the per-course number, so URLs, TRN question
+        # ids and saved browser progress keep pointing at the same rows
+        topics = {}
+        for old in OldTopic.objects.order_by('id'):
+            topics[old.id] = Topic.objects.create(
+                course=course, number=old.id, title=old.title,
+                topic_type=old.topic_type, order=old.order,
+            )
+        Content.objects.bulk_create([
+            Content(
+                course=course, topic=topics[old.topic_id], number=old.id,
+                heading=old.heading, pdf_file=old.pdf_file.name or None,
+                video_url=old.video_url, task_info=old.task_info,
+            )
+            for old in OldContent.objects.order_by('id')
+        ])
+
+
+def copy_backward(apps, schema_editor):
+    Course = apps.get_model('icmsapp', 'Course')
+
+    for slug, _title, _template, topic_name, content_name in LEGACY_COURSES:
+        OldTopic = apps.get_model('icmsapp', topic_name)
+        OldContent = apps.get_model('icmsapp', content_name)
+        course = Course.objects.filter(slug=slug).first()
+        if course is None:
+            continue
+        for topic in course.topics.order_by('number'):
+            OldTopic.objects.create(
+                id=topic.number, title=topic.title,
+                topic_type=topic.topic_type, order=topic.order,
+            )
+        OldContent.objects.bulk_create([
+            OldContent(
+                id=c.number, topic_id=c.topic.number, heading=c.heading,
+                pdf_file=c.pdf_file.name or None, video_url=c.video_url,
+                task_info=c.task_info,
+            )
+            for c in course.contents.select_related('topic').order_by('number')
+        ])
+
+
+TOPIC_TYPES = [('Reading', 'Reading'), ('Video', 'Video'), ('Task', 'Task')]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0011_taskmeta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('template', models.CharField(default='course_overview1.html', max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Topic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('topic_type', models.CharField(choices=TOPIC_TYPES, max_length=20)),
+                ('order', models.PositiveIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topics', to='icmsapp.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'order'], name='topic_course_order_idx')],
+                'constraints': [models.UniqueConstraint(fields=('course', 'number'), name='unique_topic_number_per_course')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Content',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('heading', models.CharField(max_length=255)),
+                ('pdf_file', models.FileField(blank=True, null=True, upload_to='course_pdfs/')),
+                ('video_url', models.URLField(blank=True, null=True)),
+                ('task_info', models.TextField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contents', to='icmsapp.course')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contents', to='icmsapp.topic')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['topic', 'id'], name='content_topic_idx')],
+                'constraints': [models.UniqueConstraint(fields=('course', 'number'), name='unique_content_number_per_course')],
+            },
+        ),
+        # TaskMeta is derived data; it is dropped here and rebuilt against the
+        # new Content rows (lazily, or with `manage.py backfill_task_meta`)
+        migrations.DeleteModel(name='TaskMeta'),
+        migrations.RunPython(copy_forward, copy_backward),
+        migrations.DeleteModel(name='CourseContent'),
+        migrations.DeleteModel(name='CourseContent1'),
+        migrations.DeleteModel(name='CourseContent2'),
+        migrations.DeleteModel(name='CourseTopic'),
+        migrations.DeleteModel(name='CourseTopic1'),
+        migrations.DeleteModel(name='CourseTopic2'),
+        migrations.CreateModel(
+            name='TaskMeta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gstin', models.CharField(blank=True, db_index=True, max_length=15)),
+                ('fy', models.CharField(blank=True, max_length=20)),
+                ('return_period', models.CharField(blank=True, max_length=40)),
+                ('trade_name', models.CharField(blank=True, max_length=255)),
+                ('legal_name', models.CharField(blank=True, max_length=255)),
+                ('gstr1_due_date', models.DateField(blank=True, null=True)),
+                ('gstr3b_due_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='task_meta', to='icmsapp.content')),
+            ],
+        ),
+    ]
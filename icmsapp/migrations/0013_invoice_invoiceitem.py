@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0012_course_topic_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gstin', models.CharField(max_length=15)),
+                ('fy', models.CharField(blank=True, max_length=20)),
+                ('period', models.CharField(max_length=6)),
+                ('recipient_gstin', models.CharField(max_length=15)),
+                ('recipient_name', models.CharField(max_length=255)),
+                ('invoice_no', models.CharField(max_length=16)),
+                ('invoice_date', models.DateField()),
+                ('total_value', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('pos', models.CharField(blank=True, max_length=60)),
+                ('supply_type', models.CharField(blank=True, max_length=20)),
+                ('source', models.CharField(blank=True, max_length=40)),
+                ('irn', models.CharField(blank=True, max_length=64)),
+                ('irn_date', models.DateField(blank=True, null=True)),
+                ('deemed_exports', models.BooleanField(default=False)),
+                ('sez_with_payment', models.BooleanField(default=False)),
+                ('sez_without_payment', models.BooleanField(default=False)),
+                ('reverse_charge', models.BooleanField(default=False)),
+                ('intra_state_igst', models.BooleanField(default=False)),
+                ('differential_tax', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Processed', 'Processed')], default='Pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to='icmsapp.student')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InvoiceItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('taxable_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('central_tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('state_tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cess', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='icmsapp.invoice')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['student', 'gstin', 'period', 'id'], name='invoice_return_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('student', 'gstin', 'period', 'recipient_gstin', 'invoice_no'), name='unique_invoice_per_return'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0013_invoice_invoiceitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='hsn_code',
+            field=models.CharField(blank=True, max_length=8),
+        ),
+        migrations.AddField(
+            model_name='invoiceitem',
+            name='integrated_tax',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='recipient_gstin',
+            field=models.CharField(blank=True, max_length=15),
+        ),
+    ]
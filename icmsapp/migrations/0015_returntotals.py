@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0014_invoice_b2c_hsn'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReturnTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gstin', models.CharField(max_length=15)),
+                ('period', models.CharField(max_length=6)),
+                ('invoice_count', models.IntegerField(default=0)),
+                ('taxable_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('igst', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cgst', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('sgst', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cess', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('zero_rated_value', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('zero_rated_igst', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('zero_rated_cess', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='return_totals', to='icmsapp.student')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'gstin', 'period'), name='unique_totals_per_return')],
+            },
+        ),
+    ]
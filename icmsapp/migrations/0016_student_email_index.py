@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0015_returntotals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_students(apps, schema_editor):
+    Institution = apps.get_model('icmsapp', 'Institution')
+    Student = apps.get_model('icmsapp', 'Student')
+    counts = (Student.objects.filter(institution=OuterRef('pk'))
+              .values('institution').annotate(n=Count('pk')).values('n'))
+    Institution.objects.update(student_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0016_student_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='institution',
+            name='student_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_students, migrations.RunPython.noop),
+    ]
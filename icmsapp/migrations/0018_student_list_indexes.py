@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0017_institution_student_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='institution',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['institution', 'id'], name='student_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['institution', 'name'], name='student_name_idx'),
+        ),
+    ]
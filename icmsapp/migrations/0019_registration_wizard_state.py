@@ -0,0 +1,145 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def key_legacy_rows(apps, schema_editor):
+    # rows from before this migration have no owner; give each its own key so
+    # unique_registration_per_session holds (purge_registrations drops them later)
+    Registration = apps.get_model('icmsapp', 'Registration')
+    for pk in Registration.objects.filter(session_key='').values_list('pk', flat=True):
+        Registration.objects.filter(pk=pk).update(session_key=f'legacy-{pk}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0018_student_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationGoods',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('hsn_sac', models.CharField(blank=True, max_length=8)),
+                ('details', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RegistrationPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('city', models.CharField(blank=True, max_length=120)),
+                ('pincode', models.CharField(blank=True, max_length=10)),
+                ('details', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='aadhaar',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='apob_completed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='authorized_representative',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='authorized_signatory',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='business_completed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='goods_completed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='principal_place',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='promoter',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='qid',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='session_key',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='state_specific',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='icmsapp.student'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='verification',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='registration',
+            name='trn',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.RunPython(key_legacy_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.UniqueConstraint(condition=models.Q(('student__isnull', False)), fields=('student', 'qid'), name='unique_registration_per_student'),
+        ),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.UniqueConstraint(condition=models.Q(('student__isnull', True)), fields=('session_key', 'qid'), name='unique_registration_per_session'),
+        ),
+        migrations.AddField(
+            model_name='registrationgoods',
+            name='registration',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goods_services', to='icmsapp.registration'),
+        ),
+        migrations.AddField(
+            model_name='registrationplace',
+            name='registration',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='additional_places', to='icmsapp.registration'),
+        ),
+        migrations.AddConstraint(
+            model_name='registrationgoods',
+            constraint=models.UniqueConstraint(fields=('registration', 'position'), name='unique_goods_position'),
+        ),
+        migrations.AddConstraint(
+            model_name='registrationplace',
+            constraint=models.UniqueConstraint(fields=('registration', 'position'), name='unique_place_position'),
+        ),
+    ]
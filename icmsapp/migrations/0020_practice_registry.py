@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# the cases and logins that were literals in views.py (TRN_TO_QID / CASE_DATA,
+# LOGIN_MAP in NIL_Return_Filinglog, USERS in NIL_Return_Filinglog1)
+TRN_CASES = [
+    ("201600059591TRN", 9, "Kumar Enterprise", "VJYXV0059M", "Uttar Pradesh", "Gautam Buddha Nagar", "08-12-2021"),
+    ("181020170061TRN", 10, "Vetri Enterprise", "VTMXV0061M", "Uttar Pradesh", "Gautam Buddha Nagar", "11-10-2021"),
+    ("640000130164TRN", 11, "Durairaj and Sons", "VJYXD0064M", "Karnataka", "Bengaluru", "13-01-2021"),
+    ("221020140057TRN", 12, "Jeeva Enterprise", "VJYXJ0057M", "Tamil Nadu", "Chennai", "02-08-2021"),
+    ("081120070046TRN", 13, "ATM Enterprises", "GRUXG0046M", "West Bengal", "Howrah", "08-11-2022"),
+]
+TASK_LOGINS = [
+    ("JNINFOTECH@09", "Icom@001", 2),
+    ("VIJAY@51", "Vjy@051", 3),
+    ("EPLANET", "Eplanet@20", 4),
+    ("GAUTHAM11", "Gautham@51", 5),
+    ("NOVARO53", "Novaro@35", 6),
+]
+DEMO_LOGINS = [
+    ("KKR007", "Icom@123", "KKR Pvt. Ltd.", "October 2023"),
+    ("JHN2255", "Johnshonda@2255", "Johns Honda", "February 2023"),
+    ("Lghome", "Lgkar@123", "LG Home Appliances", "August 2024"),
+    ("VENUSDIGI456", "Wd@135", "Venus Digital Arcade", "July 2022"),
+    ("PRAGATHACOM", "Pragatha@2018", "Pragatha Group", "December 2022"),
+]
+
+
+def load_practice_data(apps, schema_editor):
+    TrnCase = apps.get_model('icmsapp', 'TrnCase')
+    PracticeAccount = apps.get_model('icmsapp', 'PracticeAccount')
+    TrnCase.objects.bulk_create([
+        TrnCase(trn=trn, qid=qid, legal_name=legal_name, pan=pan, state=state, district=district,
+                reason_default="Voluntary Basis", commencement_date=commencement)
+        for trn, qid, legal_name, pan, state, district, commencement in TRN_CASES
+    ])
+    # historical models skip PracticeAccount.save(): set the lookup key here
+    PracticeAccount.objects.bulk_create(
+        [PracticeAccount(portal='task', username=username, login=username.upper(),
+                         password=password, content_number=number)
+         for username, password, number in TASK_LOGINS]
+        + [PracticeAccount(portal='demo', username=username, login=username,
+                           password=password, company=company, month=month)
+           for username, password, company, month in DEMO_LOGINS]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icmsapp', '0019_registration_wizard_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrnCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trn', models.CharField(max_length=32, unique=True)),
+                ('qid', models.PositiveIntegerField(db_index=True)),
+                ('legal_name', models.CharField(blank=True, max_length=150)),
+                ('pan', models.CharField(blank=True, max_length=16)),
+                ('state', models.CharField(blank=True, max_length=60)),
+                ('district', models.CharField(blank=True, max_length=60)),
+                ('reason_default', models.CharField(blank=True, max_length=120)),
+                ('commencement_date', models.CharField(blank=True, max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trn_cases', to='icmsapp.institution')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PracticeAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('portal', models.CharField(choices=[('task', 'NIL return (task)'), ('demo', 'NIL return (demo)')], max_length=10)),
+                ('username', models.CharField(max_length=40)),
+                ('login', models.CharField(editable=False, max_length=40)),
+                ('password', models.CharField(max_length=128)),
+                ('content_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('company', models.CharField(blank=True, max_length=150)),
+                ('month', models.CharField(blank=True, max_length=40)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('institution', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='practice_accounts', to='icmsapp.institution')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('portal', 'login'), name='unique_practice_login')],
+            },
+        ),
+        migrations.RunPython(load_practice_data, migrations.RunPython.noop),
+    ]
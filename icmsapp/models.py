@@ -1,26 +1,110 @@
 import os
 from urllib.parse import parse_qs, urlparse
-from django.db import models
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.utils.crypto import constant_time_compare
 
-class Institution(models.Model):
-    name = models.CharField(max_length=255)
+
+def is_password_hash(value) -> bool:
+    try:
+        identify_hasher(value or "")
+    except ValueError:
+        return False
+    return True
+
+
+class PasswordMixin:
+    """
+    `password` holds a hash from settings.PASSWORD_HASHERS. Rows created
+    before hashing was introduced still hold plaintext; those (and hashes
+    made at another cost) are re-hashed on the next successful login.
+    """
+
+    def set_password(self, raw_password):
+        self.password = make_password(raw_password)
+
+    def _upgrade_password(self, raw_password):
+        self.set_password(raw_password)
+        self.save(update_fields=['password'])
+
+    def check_password(self, raw_password) -> bool:
+        if not raw_password or not self.password:
+            return False
+        if not is_password_hash(self.password):
+            if not constant_time_compare(self.password, raw_password):
+                return False
+            self._upgrade_password(raw_password)
+            return True
+        return check_password(raw_password, self.password, self._upgrade_password)
+
+
+class StudentLimitReached(Exception):
+    pass
+
+
+class StudentConflict(Exception):
+    """Another student of the institution already has this email / student_id."""
+
+    def __init__(self, field):
+        super().__init__(field)
+        self.field = field
+
+
+class Institution(PasswordMixin, models.Model):
+    name = models.CharField(max_length=255, db_index=True)   # institution_list prefix search
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=255)
     student_limit = models.IntegerField()
     validity = models.DateField()
+    # maintained by enrol() and the Student receivers in signals.py
+    student_count = models.IntegerField(default=0)
 
     def __str__(self):
         return self.name
 
-
-class Student(models.Model):
+    def student_conflict(self, email, student_id, exclude_pk=None):
+        """'email' or 'student_id' if another student here already uses it, else None. One query."""
+        qs = Student.objects.filter(Q(email=email) | Q(student_id=student_id), institution=self)
+        if exclude_pk is not None:
+            qs = qs.exclude(pk=exclude_pk)
+        rows = list(qs.values_list('email', flat=True)[:2])
+        if not rows:
+            return None
+        return 'email' if email in rows else 'student_id'
+
+    def enrol(self, **fields):
+        """
+        Create a student: one conditional UPDATE reserves a seat under
+        student_limit, then one INSERT. Raises StudentLimitReached or
+        StudentConflict; either way the seat is released.
+        """
+        with transaction.atomic():
+            reserved = Institution.objects.filter(
+                pk=self.pk, student_count__lt=F('student_limit')
+            ).update(student_count=F('student_count') + 1)
+            if not reserved:
+                raise StudentLimitReached()
+            student = Student(institution=self, **fields)
+            student._counted = True
+            try:
+                with transaction.atomic():
+                    student.save(force_insert=True)
+            except IntegrityError:
+                raise StudentConflict(
+                    self.student_conflict(fields.get('email'), fields.get('student_id')) or 'email'
+                )
+        return student
+
+
+class Student(PasswordMixin, models.Model):
     institution = models.ForeignKey(
         Institution,
         on_delete=models.CASCADE,
         related_name='students'
     )
     name = models.CharField(max_length=255)
-    email = models.EmailField()
+    email = models.EmailField(db_index=True)   # login looks students up by email alone
     student_id = models.CharField(max_length=100)
     password = models.CharField(max_length=255)
 
@@ -35,74 +119,78 @@ class Student(models.Model):
                 name='unique_studentid_per_institution'
             ),
         ]
+        indexes = [
+            # student_list: keyset pages by id, prefix search by name
+            # (email prefix search uses unique_email_per_institution)
+            models.Index(fields=['institution', 'id'], name='student_page_idx'),
+            models.Index(fields=['institution', 'name'], name='student_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.student_id})"
 
 
 
-class CourseTopic(models.Model):
-    title = models.CharField(max_length=255)
-    topic_type = models.CharField(max_length=20, choices=[("Reading", "Reading"), ("Video", "Video"), ("Task", "Task")])
-    order = models.PositiveIntegerField()
-
-    def __str__(self):
-        return self.title
-
-
-
+# Course whose contents are the GST return-filing practice tasks
+GST_TASK_COURSE = 'nil-return-filing'
 
 
-class CourseContent(models.Model):
-    topic = models.ForeignKey('CourseTopic', on_delete=models.CASCADE)
-    heading = models.CharField(max_length=255)
-    pdf_file = models.FileField(upload_to='course_pdfs/', blank=True, null=True)
-    video_url = models.URLField(blank=True, null=True)
-    task_info = models.TextField(blank=True, null=True)
+class Course(models.Model):
+    slug = models.SlugField(max_length=50, unique=True)
+    title = models.CharField(max_length=255)
+    template = models.CharField(max_length=100, default='course_overview1.html')
 
     def __str__(self):
-        return f"{self.topic.title} - Content"
-
-    def pdf_filename(self):
-        return os.path.basename(self.pdf_file.name)
+        return self.title
 
-    def get_embed_url(self):
-        """
-        Converts standard YouTube URLs to embed format.
-        """
-        if self.video_url:
-            parsed_url = urlparse(self.video_url)
-            if 'youtube' in parsed_url.netloc:
-                query = parse_qs(parsed_url.query)
-                video_id = query.get('v')
-                if video_id:
-                    return f"https://www.youtube.com/embed/{video_id[0]}"
-            elif 'youtu.be' in parsed_url.netloc:
-                video_id = parsed_url.path.lstrip('/')
-                return f"https://www.youtube.com/embed/{video_id}"
-        return self.video_url
 
+TOPIC_TYPES = [("Reading", "Reading"), ("Video", "Video"), ("Task", "Task")]
 
 
-class CourseTopic1(models.Model):
+class Topic(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='topics')
+    # per-course id used in URLs, TRN question ids and browser progress keys
+    number = models.PositiveIntegerField()
     title = models.CharField(max_length=255)
-    topic_type = models.CharField(
-        max_length=20,
-        choices=[("Reading", "Reading"), ("Video", "Video"), ("Task", "Task")]
-    )
+    topic_type = models.CharField(max_length=20, choices=TOPIC_TYPES)
     order = models.PositiveIntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'number'],
+                name='unique_topic_number_per_course'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['course', 'order'], name='topic_course_order_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
-class CourseContent1(models.Model):
-    topic = models.ForeignKey('CourseTopic1', on_delete=models.CASCADE)
+class Content(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='contents')
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name='contents')
+    # per-course id; for the GST returns course this is the task / content_id
+    number = models.PositiveIntegerField()
     heading = models.CharField(max_length=255)
     pdf_file = models.FileField(upload_to='course_pdfs/', blank=True, null=True)
     video_url = models.URLField(blank=True, null=True)
     task_info = models.TextField(blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'number'],
+                name='unique_content_number_per_course'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['topic', 'id'], name='content_topic_idx'),
+        ]
+
     def __str__(self):
         return f"{self.topic.title} - Content"
 
@@ -137,8 +225,21 @@ class CourseContent1(models.Model):
 from django.db import models
 
 class Registration(models.Model):
+    """
+    One practice GST registration application (the ten step_* wizard
+    pages for a question id), owned by the logged-in student or, failing
+    that, by the browser session. See wizard.py.
+    """
     # Key
-    trn = models.CharField(max_length=32, unique=True)
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='registrations'
+    )
+    session_key = models.CharField(max_length=40, blank=True)
+    qid = models.PositiveIntegerField(default=0)
+    trn = models.CharField(max_length=32, blank=True)
 
     # KPI bar
     due_date = models.DateField(null=True, blank=True)
@@ -199,59 +300,317 @@ class Registration(models.Model):
 
     also_authorized_signatory = models.BooleanField(default=False)
 
+    # Wizard sections without typed columns, as posted by their step pages
+    business_completed = models.BooleanField(default=False)
+    promoter = models.JSONField(default=dict, blank=True)
+    authorized_signatory = models.JSONField(default=dict, blank=True)
+    authorized_representative = models.JSONField(default=dict, blank=True)
+    principal_place = models.JSONField(default=dict, blank=True)
+    apob_completed = models.BooleanField(default=False)
+    goods_completed = models.BooleanField(default=False)
+    state_specific = models.JSONField(default=dict, blank=True)
+    aadhaar = models.JSONField(default=dict, blank=True)
+    verification = models.JSONField(default=dict, blank=True)
+
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'qid'],
+                condition=Q(student__isnull=False),
+                name='unique_registration_per_student'
+            ),
+            models.UniqueConstraint(
+                fields=['session_key', 'qid'],
+                condition=Q(student__isnull=True),
+                name='unique_registration_per_session'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.trn} / {self.legal_name or 'Draft'}"
+
+
+class RegistrationPlace(models.Model):
+    """An additional place of business on a Registration (wizard step 6)."""
+    registration = models.ForeignKey(
+        Registration,
+        on_delete=models.CASCADE,
+        related_name='additional_places'
+    )
+    position = models.PositiveIntegerField()
+    city = models.CharField(max_length=120, blank=True)
+    pincode = models.CharField(max_length=10, blank=True)
+    details = models.JSONField(default=dict, blank=True)   # the rest of the posted fields
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['registration', 'position'], name='unique_place_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.city} {self.pincode}"
+
+
+class RegistrationGoods(models.Model):
+    """A goods / services line on a Registration (wizard step 7)."""
+    registration = models.ForeignKey(
+        Registration,
+        on_delete=models.CASCADE,
+        related_name='goods_services'
+    )
+    position = models.PositiveIntegerField()
+    description = models.CharField(max_length=255, blank=True)
+    hsn_sac = models.CharField(max_length=8, blank=True)
+    details = models.JSONField(default=dict, blank=True)   # the rest of the posted fields
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['registration', 'position'], name='unique_goods_position'),
+        ]
+
+    def __str__(self):
+        return f"{self.hsn_sac} {self.description}"
     
 
-class CourseContent2(models.Model):
-    topic = models.ForeignKey('CourseTopic2', on_delete=models.CASCADE)
-    heading = models.CharField(max_length=255)
-    pdf_file = models.FileField(upload_to='course_pdfs/', blank=True, null=True)
-    video_url = models.URLField(blank=True, null=True)
-    task_info = models.TextField(blank=True, null=True)
+class TaskMeta(models.Model):
+    """
+    GSTIN / FY / period / names extracted from Content.task_info.
+    Rebuilt by the post_save signal and the backfill_task_meta command so the
+    GST views read one row instead of parsing free text per request.
+    """
+    content = models.OneToOneField(
+        'Content',
+        on_delete=models.CASCADE,
+        related_name='task_meta'
+    )
+    gstin = models.CharField(max_length=15, blank=True, db_index=True)
+    fy = models.CharField(max_length=20, blank=True)
+    return_period = models.CharField(max_length=40, blank=True)
+    trade_name = models.CharField(max_length=255, blank=True)   # UPPERCASE
+    legal_name = models.CharField(max_length=255, blank=True)
+    gstr1_due_date = models.DateField(null=True, blank=True)
+    gstr3b_due_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.topic.title} - Content"
+        return f"{self.content_id} / {self.gstin or '-'}"
+
+    @classmethod
+    def refresh(cls, content):
+        from .taskinfo import (
+            task_parser, _return_period_to_month_year,
+            _compute_due_date_for_gstr1, _compute_due_date_for_gstr3b,
+        )
+        task_info = content.task_info or ""
+        topic_title = content.topic.title if content.topic_id else ""
+        meta = task_parser.parse_cached(content.pk, task_info)
+        company = task_parser.company_cached(content.pk, task_info, content.heading or "", topic_title)
+
+        mon, yr = _return_period_to_month_year(meta["ReturnPeriod"], meta["FY"])
+        obj, _ = cls.objects.update_or_create(content=content, defaults={
+            "gstin": meta["GSTIN"],
+            "fy": meta["FY"],
+            "return_period": meta["ReturnPeriod"],
+            "trade_name": company.upper(),
+            "legal_name": meta["LegalName"].strip(),
+            "gstr1_due_date": _compute_due_date_for_gstr1(mon, yr) if mon and yr else None,
+            "gstr3b_due_date": _compute_due_date_for_gstr3b(mon, yr) if mon and yr else None,
+        })
+        return obj
+
+
+class Invoice(models.Model):
+    """
+    A practice B2B invoice entered on the GSTR-1 invoice form.
+    Listings always filter on (student, gstin, period) and page by id.
+    """
+    STATUS_CHOICES = [("Pending", "Pending"), ("Processed", "Processed")]
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='invoices'
+    )
+    gstin = models.CharField(max_length=15)          # supplier (the return being filed)
+    fy = models.CharField(max_length=20, blank=True)
+    period = models.CharField(max_length=6)          # MMYYYY, e.g. 092021
+
+    recipient_gstin = models.CharField(max_length=15, blank=True)   # blank: unregistered (B2C)
+    recipient_name = models.CharField(max_length=255)
+    invoice_no = models.CharField(max_length=16)
+    invoice_date = models.DateField()
+    total_value = models.DecimalField(max_digits=14, decimal_places=2)
+    pos = models.CharField(max_length=60, blank=True)
+    supply_type = models.CharField(max_length=20, blank=True)
+    source = models.CharField(max_length=40, blank=True)
+    irn = models.CharField(max_length=64, blank=True)
+    irn_date = models.DateField(null=True, blank=True)
+
+    deemed_exports = models.BooleanField(default=False)
+    sez_with_payment = models.BooleanField(default=False)
+    sez_without_payment = models.BooleanField(default=False)
+    reverse_charge = models.BooleanField(default=False)
+    intra_state_igst = models.BooleanField(default=False)
+    differential_tax = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    created_at = models.DateTimeField(auto_now_add=True)
 
-    def pdf_filename(self):
-        return os.path.basename(self.pdf_file.name)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'gstin', 'period', 'recipient_gstin', 'invoice_no'],
+                name='unique_invoice_per_return'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['student', 'gstin', 'period', 'id'], name='invoice_return_idx'),
+        ]
 
-    def get_embed_url(self):
-        """
-        Converts a YouTube URL into its embeddable form.
-        Handles:
-        - https://www.youtube.com/watch?v=VIDEO_ID
-        - https://youtu.be/VIDEO_ID
-        - Returns original URL if not a YouTube video.
-        """
-        if not self.video_url:
-            return ""
+    def __str__(self):
+        return f"{self.invoice_no} / {self.recipient_gstin}"
 
-        parsed_url = urlparse(self.video_url)
 
-        if 'youtube.com' in parsed_url.netloc:
-            query = parse_qs(parsed_url.query)
-            video_id = query.get('v')
-            if video_id:
-                return f"https://www.youtube.com/embed/{video_id[0]}"
+class InvoiceItem(models.Model):
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    hsn_code = models.CharField(max_length=8, blank=True)
+    rate = models.DecimalField(max_digits=5, decimal_places=2)
+    taxable_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    integrated_tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    central_tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    state_tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cess = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
-        elif 'youtu.be' in parsed_url.netloc:
-            video_id = parsed_url.path.lstrip('/')
-            return f"https://www.youtube.com/embed/{video_id}"
+    def __str__(self):
+        return f"{self.invoice.invoice_no} @ {self.rate}%"
+
+
+class ReturnTotals(models.Model):
+    """
+    Running GSTR-3B table 3.1 figures for one return (student, gstin, period),
+    kept in step with Invoice / InvoiceItem inserts and deletes by the
+    receivers in signals.py. `manage.py rebuild_return_totals` recomputes
+    them from the invoices.
+    """
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='return_totals'
+    )
+    gstin = models.CharField(max_length=15)
+    period = models.CharField(max_length=6)          # MMYYYY
+    invoice_count = models.IntegerField(default=0)
+
+    # 3.1(a) outward taxable supplies (other than zero rated, nil rated and exempted)
+    taxable_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    igst = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cgst = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    sgst = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cess = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    # 3.1(b) outward taxable supplies (zero rated: SEZ with / without payment)
+    zero_rated_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    zero_rated_igst = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    zero_rated_cess = models.DecimalField(max_digits=16, decimal_places=2, default=0)
 
-        return self.video_url  # fallback for non-YouTube URLs
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'gstin', 'period'],
+                name='unique_totals_per_return'
+            ),
+        ]
 
-class CourseTopic2(models.Model):
-    title = models.CharField(max_length=255)
-    topic_type = models.CharField(
-        max_length=20,
-        choices=[("Reading", "Reading"), ("Video", "Video"), ("Task", "Task")]
+    def __str__(self):
+        return f"{self.gstin} / {self.period}"
+
+
+class TrnCase(models.Model):
+    """
+    A practice registration case: the TRN a student logs in with on
+    trn_page, the question id it opens and the Business page prefill.
+    Looked up through practice.practice_registry.
+    """
+    trn = models.CharField(max_length=32, unique=True)
+    qid = models.PositiveIntegerField(db_index=True)
+    legal_name = models.CharField(max_length=150, blank=True)
+    pan = models.CharField(max_length=16, blank=True)
+    state = models.CharField(max_length=60, blank=True)
+    district = models.CharField(max_length=60, blank=True)
+    reason_default = models.CharField(max_length=120, blank=True)
+    commencement_date = models.CharField(max_length=10, blank=True)   # DD-MM-YYYY, shown as given
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='trn_cases'
     )
-    order = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    PREFILL_FIELDS = ('legal_name', 'pan', 'state', 'district', 'reason_default', 'commencement_date')
+
+    def prefill(self) -> dict:
+        """Business page defaults (only the fields this case sets)."""
+        return {field: getattr(self, field) for field in self.PREFILL_FIELDS if getattr(self, field)}
 
     def __str__(self):
-        return self.title
-    
+        return f"{self.trn} -> {self.qid}"
+
+
+class PracticeAccount(models.Model):
+    """
+    A practice GST portal login. The passwords are the published practice
+    credentials from the course material, not secrets, so they are
+    compared as stored.
+    """
+    # NIL_Return_Filinglog: opens the task content_number, user id not case sensitive
+    PORTAL_TASK = 'task'
+    # NIL_Return_Filinglog1: demo dashboard for company / month
+    PORTAL_DEMO = 'demo'
+    PORTAL_CHOICES = [(PORTAL_TASK, 'NIL return (task)'), (PORTAL_DEMO, 'NIL return (demo)')]
+    CASE_INSENSITIVE_PORTALS = {PORTAL_TASK}
+
+    portal = models.CharField(max_length=10, choices=PORTAL_CHOICES)
+    username = models.CharField(max_length=40)
+    login = models.CharField(max_length=40, editable=False)   # lookup key, see login_key()
+    password = models.CharField(max_length=128)
+    content_number = models.PositiveIntegerField(null=True, blank=True)
+    company = models.CharField(max_length=150, blank=True)
+    month = models.CharField(max_length=40, blank=True)
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='practice_accounts'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['portal', 'login'], name='unique_practice_login'),
+        ]
+
+    @classmethod
+    def login_key(cls, portal, username) -> str:
+        username = (username or '').strip()
+        return username.upper() if portal in cls.CASE_INSENSITIVE_PORTALS else username
+
+    def save(self, *args, **kwargs):
+        self.login = self.login_key(self.portal, self.username)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'portal', 'username'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'login'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_portal_display()}: {self.username}"
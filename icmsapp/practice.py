@@ -0,0 +1,267 @@
+"""
+Practice identities: the step1 registration credentials, the TRN cases
+(TrnCase) and the practice portal logins (PracticeAccount).
+
+The step1 credentials are read from a CSV (settings.ICMS_TEST_CREDENTIALS_FILE,
+one row per identity) on first use, kept as a frozenset of field tuples so
+a check is one hash lookup whatever the size of the list, and the help
+message shown on a mismatch is built once alongside it.
+
+TRN cases and portal logins live in the database and are read through
+practice_registry, an in-process cache: each lookup key is fetched once
+(misses included) and kept for REGISTRY_TIMEOUT seconds. The receivers in
+signals.py, and the bulk imports below, clear it on writes in this
+process; the timeout bounds how long other processes can serve an old
+entry.
+"""
+import csv
+import time
+from itertools import islice
+
+from django.conf import settings
+
+from .imports import ImportReport
+from .models import PracticeAccount, TrnCase
+
+CREDENTIAL_FIELDS = ("user_type", "state", "district", "business_name", "pan_number", "email", "mobile")
+# identities spelled out in the help message; the rest are only counted
+HELP_LIMIT = 10
+HELP_LABELS = ("User Type", "State", "District", "Business Name", "PAN", "Email", "Mobile")
+
+
+def _key(data) -> tuple:
+    return tuple(data.get(field) or "" for field in CREDENTIAL_FIELDS)
+
+
+def _help_message(rows, total) -> str:
+    parts = ["Registration Error: Only test credentials are allowed. Please use one of the following valid combinations:"]
+    for i, row in enumerate(rows, start=1):
+        lines = [f"{i}. {HELP_LABELS[0]}: {row[0] or 'N/A'}"]
+        lines += [f"   {label}: {value or 'N/A'}" for label, value in zip(HELP_LABELS[1:], row[1:])]
+        parts.append("\n".join(lines))
+    if total > len(rows):
+        parts.append(f"... and {total - len(rows)} more practice identities.")
+    return "\n\n".join(parts)
+
+
+class TestCredentials:
+    def __init__(self):
+        self._keys = None
+        self._help = None
+
+    def invalidate(self):
+        self._keys = None
+
+    def _load(self):
+        with open(settings.ICMS_TEST_CREDENTIALS_FILE, encoding="utf-8-sig", newline="") as f:
+            rows = [_key(row) for row in csv.DictReader(f)]
+        self._help = _help_message(rows[:HELP_LIMIT], len(rows))
+        self._keys = frozenset(rows)
+        return self._keys
+
+    def matches(self, form_data) -> bool:
+        keys = self._keys
+        if keys is None:
+            keys = self._load()
+        return _key(form_data) in keys
+
+    @property
+    def help_message(self) -> str:
+        if self._keys is None:
+            self._load()
+        return self._help
+
+
+test_credentials = TestCredentials()
+
+
+# ------------------------------------------------------------ registry
+
+REGISTRY_TIMEOUT = 60
+# the cache is emptied when it reaches this many keys (e.g. bad-TRN floods)
+REGISTRY_MAX_ENTRIES = 10000
+
+
+class PracticeRegistry:
+    def __init__(self):
+        self._entries = {}
+
+    def invalidate(self, **kwargs):
+        self._entries = {}
+
+    def _get(self, key, load):
+        now = time.monotonic()
+        entries = self._entries
+        hit = entries.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        value = load()
+        if len(entries) >= REGISTRY_MAX_ENTRIES:
+            entries = self._entries = {}
+        entries[key] = (now + REGISTRY_TIMEOUT, value)
+        return value
+
+    def trn_case(self, trn):
+        """The TrnCase for a TRN, or None."""
+        trn = (trn or "").strip()
+        return self._get(("trn", trn), lambda: TrnCase.objects.filter(trn=trn).first() if trn else None)
+
+    def case_prefill(self, qid) -> dict:
+        """Business page defaults for a question id ({} when no case opens it)."""
+        case = self._get(("qid", qid), lambda: TrnCase.objects.filter(qid=qid).order_by("pk").first())
+        return case.prefill() if case else {}
+
+    def account(self, portal, username):
+        """The PracticeAccount for a portal login (see PracticeAccount.login_key), or None."""
+        login = PracticeAccount.login_key(portal, username)
+        return self._get(("login", portal, login),
+                         lambda: PracticeAccount.objects.filter(portal=portal, login=login).first() if login else None)
+
+
+practice_registry = PracticeRegistry()
+
+
+# ------------------------------------------------------------ bulk import
+
+CASE_COLUMNS = ("trn", "qid")
+ACCOUNT_COLUMNS = ("portal", "username", "password")
+IMPORT_CHUNK_SIZE = 1000
+
+
+_MAX_NUMBER = 2147483647   # PositiveIntegerField's portable upper bound
+
+
+def _clean(row, fields):
+    return {field: (row.get(field) or "").strip() for field in fields}
+
+
+def _number(value):
+    """int for a plain ASCII digit string within range, else None (str.isdigit() also accepts '²')."""
+    if not (value.isascii() and value.isdigit()):
+        return None
+    number = int(value)
+    return number if number <= _MAX_NUMBER else None
+
+
+def _upsert(model, objects, key_fields, update_fields):
+    model.objects.bulk_create(objects, batch_size=500, update_conflicts=True,
+                              unique_fields=key_fields, update_fields=update_fields)
+
+
+def _import(rows, validate, existing_owners, build, model, key_fields, update_fields, institution, chunk_size):
+    """
+    Shared chunked upsert: validate each row, insert new keys and update
+    existing ones. An institution may only update its own rows; the site
+    admin (institution None) may update any, without changing the owner.
+    """
+    report = ImportReport()
+    seen = set()
+    owner = institution.pk if institution else None
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+        chunk = []
+        for line, row in batch:
+            values, key = validate(line, row, report)
+            if values is None:
+                continue
+            if key in seen:
+                report.error(line, f"Duplicate in file: {' / '.join(map(str, key))}")
+                continue
+            seen.add(key)
+            chunk.append((line, key, values))
+        if not chunk:
+            continue
+        owners = existing_owners([key for _, key, _ in chunk])
+        fresh = []
+        for line, key, values in chunk:
+            if institution is not None and key in owners and owners[key] != owner:
+                report.error(line, f"Already registered by another institution: {' / '.join(map(str, key))}")
+            else:
+                fresh.append(build(values, institution))
+        if fresh:
+            _upsert(model, fresh, key_fields, update_fields)
+            report.created += len(fresh)
+    # bulk_create sends no post_save
+    practice_registry.invalidate()
+    return report
+
+
+def _validate_case(line, row, report):
+    values = _clean(row, ("trn", "qid", *TrnCase.PREFILL_FIELDS))
+    if not values["trn"] or not values["qid"]:
+        report.error(line, "Missing trn or qid")
+        return None, None
+    qid = _number(values["qid"])
+    if qid is None:
+        report.error(line, f"qid must be a number: {values['qid']}")
+        return None, None
+    for field in ("trn", *TrnCase.PREFILL_FIELDS):
+        limit = TrnCase._meta.get_field(field).max_length
+        if len(values[field]) > limit:
+            report.error(line, f"{field} is longer than {limit} characters")
+            return None, None
+    values["qid"] = qid
+    return values, (values["trn"],)
+
+
+def import_trn_cases(rows, institution=None, chunk_size=IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Insert or update TrnCase rows from (line, row dict) pairs (trn, qid + prefill columns)."""
+    def existing_owners(keys):
+        return {(trn,): owner for trn, owner in
+                TrnCase.objects.filter(trn__in=[trn for trn, in keys]).values_list("trn", "institution_id")}
+
+    return _import(
+        rows, _validate_case, existing_owners,
+        lambda values, inst: TrnCase(institution=inst, **values),
+        TrnCase, ["trn"], ["qid", *TrnCase.PREFILL_FIELDS],
+        institution, chunk_size,
+    )
+
+
+def _validate_account(line, row, report):
+    values = _clean(row, ("portal", "username", "password", "content_number", "company", "month"))
+    portals = dict(PracticeAccount.PORTAL_CHOICES)
+    if not values["username"] or not values["password"]:
+        report.error(line, "Missing username or password")
+        return None, None
+    if values["portal"] not in portals:
+        report.error(line, f"portal must be one of {', '.join(portals)}: {values['portal']}")
+        return None, None
+    content_number = _number(values["content_number"]) if values["content_number"] else None
+    if values["content_number"] and content_number is None:
+        report.error(line, f"content_number must be a number: {values['content_number']}")
+        return None, None
+    for field in ("username", "password", "company", "month"):
+        limit = PracticeAccount._meta.get_field(field).max_length
+        if len(values[field]) > limit:
+            report.error(line, f"{field} is longer than {limit} characters")
+            return None, None
+    values["content_number"] = content_number
+    values["login"] = PracticeAccount.login_key(values["portal"], values["username"])
+    return values, (values["portal"], values["login"])
+
+
+def import_practice_accounts(rows, institution=None, chunk_size=IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Insert or update PracticeAccount rows from (line, row dict) pairs."""
+    def existing_owners(keys):
+        logins = PracticeAccount.objects.filter(login__in={login for _, login in keys})
+        return {(portal, login): owner for portal, login, owner in
+                logins.values_list("portal", "login", "institution_id")}
+
+    return _import(
+        rows, _validate_account, existing_owners,
+        lambda values, inst: PracticeAccount(institution=inst, **values),
+        PracticeAccount, ["portal", "login"],
+        ["username", "password", "content_number", "company", "month"],
+        institution, chunk_size,
+    )
+
+
+# kind -> (required columns, importer), for the admin upload and the command
+IMPORTERS = {
+    "cases": (CASE_COLUMNS, import_trn_cases),
+    "accounts": (ACCOUNT_COLUMNS, import_practice_accounts),
+}
@@ -0,0 +1,228 @@
+"""
+Return summaries computed from the stored practice invoices.
+
+GSTR-1 figures are aggregated in the database (GROUP BY over InvoiceItem
+joined to its Invoice), so the cost of a summary is one indexed scan of the
+return's rows instead of shipping every invoice to Python or the browser.
+
+GSTR-3B table 3.1 is not recomputed at all on read: ReturnTotals holds
+running sums per return that are adjusted as invoices are added or removed.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Invoice, InvoiceItem, ReturnTotals
+
+# Unregistered inter-state invoices above this value are reported in 5A (B2CL)
+B2CL_LIMIT = Decimal("100000")
+
+GSTR1_SECTIONS = ("B2B", "B2CL", "B2CS")
+
+_PAISE = Decimal("0.01")
+_ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+_AMOUNTS = {
+    "taxable_value": "taxable_value",
+    "igst": "integrated_tax",
+    "cgst": "central_tax",
+    "sgst": "state_tax",
+    "cess": "cess",
+}
+
+
+def _sums():
+    return {key: Coalesce(Sum(field), _ZERO) for key, field in _AMOUNTS.items()}
+
+
+def _cents(row, names=_AMOUNTS):
+    # SQLite sums decimals as floats; normalise to paise on every backend
+    for key in names:
+        row[key] = Decimal(row[key]).quantize(_PAISE)
+    return row
+
+
+def _empty_totals():
+    totals = {key: Decimal("0.00") for key in _AMOUNTS}
+    totals["records"] = 0
+    return totals
+
+
+def _section_expr():
+    return Case(
+        When(~Q(invoice__recipient_gstin=""), then=Value("B2B")),
+        When(
+            Q(invoice__supply_type__iexact="Inter-State", invoice__total_value__gt=B2CL_LIMIT),
+            then=Value("B2CL"),
+        ),
+        default=Value("B2CS"),
+    )
+
+
+def build_gstr1_summary(student_pk, gstin, periods) -> dict:
+    """
+    GSTR-1 summary for one or more MMYYYY periods of a return:
+
+        {period: {"B2B": {...}, "B2CL": {...}, "B2CS": {...},
+                  "HSN": [{"hsn_code", "rate", ...}], "total": {...}}}
+
+    Section rows carry records (invoice count) plus taxable_value / igst /
+    cgst / sgst / cess. Two queries: one grouped by (period, section), one
+    by (period, hsn_code, rate).
+    """
+    if isinstance(periods, str):
+        periods = [periods]
+    items = InvoiceItem.objects.filter(
+        invoice__student_id=student_pk,
+        invoice__gstin=gstin,
+        invoice__period__in=list(periods),
+    )
+
+    summary = {}
+    for period in periods:
+        summary[period] = {name: _empty_totals() for name in GSTR1_SECTIONS}
+        summary[period]["HSN"] = []
+        summary[period]["total"] = _empty_totals()
+
+    by_section = (
+        items.annotate(section=_section_expr())
+        .values("invoice__period", "section")
+        .annotate(records=Count("invoice", distinct=True), **_sums())
+        .order_by()
+    )
+    for row in by_section:
+        _cents(row)
+        period = summary[row.pop("invoice__period")]
+        period[row.pop("section")].update(row)
+        total = period["total"]
+        for key, value in row.items():
+            total[key] += value
+
+    by_hsn = (
+        items.values("invoice__period", "hsn_code", "rate")
+        .annotate(records=Count("invoice", distinct=True), **_sums())
+        .order_by("invoice__period", "hsn_code", "rate")
+    )
+    for row in by_hsn:
+        summary[row.pop("invoice__period")]["HSN"].append(_cents(row))
+
+    return summary
+
+
+# ------------------------------------------------------------------
+# GSTR-3B table 3.1: running totals
+# ------------------------------------------------------------------
+
+def _is_zero_rated(invoice) -> bool:
+    return invoice.sez_with_payment or invoice.sez_without_payment
+
+
+def _item_deltas(invoice, items, sign):
+    deltas = defaultdict(Decimal)
+    zero_rated = _is_zero_rated(invoice)
+    for item in items:
+        if zero_rated:
+            deltas["zero_rated_value"] += sign * item.taxable_value
+            deltas["zero_rated_igst"] += sign * item.integrated_tax
+            deltas["zero_rated_cess"] += sign * item.cess
+        else:
+            deltas["taxable_value"] += sign * item.taxable_value
+            deltas["igst"] += sign * item.integrated_tax
+            deltas["cgst"] += sign * item.central_tax
+            deltas["sgst"] += sign * item.state_tax
+            deltas["cess"] += sign * item.cess
+    return deltas
+
+
+def _bump(invoice, deltas, create=True):
+    """Add deltas to the return's ReturnTotals row with one UPDATE (F() expressions)."""
+    if not deltas:
+        return
+    key = {"student_id": invoice.student_id, "gstin": invoice.gstin, "period": invoice.period}
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    updates["updated_at"] = timezone.now()
+    if ReturnTotals.objects.filter(**key).update(**updates) or not create:
+        return
+    try:
+        with transaction.atomic():
+            ReturnTotals.objects.create(**key, **deltas)
+    except IntegrityError:
+        # created concurrently between the UPDATE and the INSERT
+        ReturnTotals.objects.filter(**key).update(**updates)
+
+
+def add_invoice_items(invoice, items):
+    """Items stored with bulk_create (no post_save) are added here."""
+    _bump(invoice, _item_deltas(invoice, items, 1))
+
+
+def count_invoice(invoice, sign):
+    _bump(invoice, {"invoice_count": sign}, create=sign > 0)
+
+
+def remove_invoice_items(invoice, items):
+    _bump(invoice, _item_deltas(invoice, items, -1), create=False)
+
+
+def remove_invoice(invoice):
+    """Subtract a whole invoice (its items summed in one query)."""
+    zero_rated = _is_zero_rated(invoice)
+    sums = _cents(InvoiceItem.objects.filter(invoice=invoice).aggregate(**_sums()))
+    if zero_rated:
+        deltas = {
+            "zero_rated_value": -sums["taxable_value"],
+            "zero_rated_igst": -sums["igst"],
+            "zero_rated_cess": -sums["cess"],
+        }
+    else:
+        deltas = {name: -sums[name] for name in _AMOUNTS}
+    deltas["invoice_count"] = -1
+    _bump(invoice, deltas, create=False)
+
+
+def gstr3b_table_3_1(student_pk, gstin, period):
+    """Stored table 3.1 figures for a return (one unique-index lookup), or None."""
+    return ReturnTotals.objects.filter(student_id=student_pk, gstin=gstin, period=period).first()
+
+
+def rebuild_return_totals():
+    """Recompute every ReturnTotals row from the invoices. Returns the row count."""
+    zero_rated = Q(invoice__sez_with_payment=True) | Q(invoice__sez_without_payment=True)
+    amount = DecimalField(max_digits=16, decimal_places=2)
+
+    def part(field, cond):
+        return Coalesce(Sum(field, filter=cond), _ZERO, output_field=amount)
+
+    columns = {
+        "taxable_value": part("taxable_value", ~zero_rated),
+        "igst": part("integrated_tax", ~zero_rated),
+        "cgst": part("central_tax", ~zero_rated),
+        "sgst": part("state_tax", ~zero_rated),
+        "cess": part("cess", ~zero_rated),
+        "zero_rated_value": part("taxable_value", zero_rated),
+        "zero_rated_igst": part("integrated_tax", zero_rated),
+        "zero_rated_cess": part("cess", zero_rated),
+    }
+    rows = {}
+    # annotation aliases may not shadow the summed field names
+    for row in (InvoiceItem.objects
+                .values("invoice__student_id", "invoice__gstin", "invoice__period")
+                .annotate(**{f"sum_{name}": expr for name, expr in columns.items()})
+                .order_by()):
+        key = (row["invoice__student_id"], row["invoice__gstin"], row["invoice__period"])
+        rows[key] = _cents({name: row[f"sum_{name}"] for name in columns}, names=columns)
+
+    counts = (Invoice.objects.values_list("student_id", "gstin", "period")
+              .annotate(n=Count("id")).order_by())
+    with transaction.atomic():
+        ReturnTotals.objects.all().delete()
+        ReturnTotals.objects.bulk_create([
+            ReturnTotals(student_id=student_pk, gstin=gstin, period=period,
+                         invoice_count=n, **rows.get((student_pk, gstin, period), {}))
+            for student_pk, gstin, period, n in counts
+        ], batch_size=1000)
+    return len(counts)
@@ -0,0 +1,129 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.db.models import F
+from django.dispatch import receiver
+
+from . import returns
+from .caches import content1_ids, invalidate_course_navs
+from .credentials import invalidate_student_login, invalidate_student_logins
+from .practice import practice_registry
+from .stats import invalidate_admin_stats
+from .models import (
+    Course, Topic, Content, TaskMeta, Invoice, InvoiceItem, Institution, Student,
+    TrnCase, PracticeAccount,
+)
+
+
+@receiver(post_save, sender=Content)
+def refresh_task_meta(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    TaskMeta.refresh(instance)
+
+
+@receiver(post_save, sender=Topic)
+def refresh_topic_task_meta(sender, instance, raw=False, **kwargs):
+    # the topic title is a fallback source for the trade name
+    if raw:
+        return
+    for content in Content.objects.filter(topic=instance).select_related("topic"):
+        TaskMeta.refresh(content)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_delete, sender=Content)
+def invalidate_content_ids(sender, **kwargs):
+    content1_ids.invalidate()
+
+
+for _model in (Course, Topic, Content):
+    post_save.connect(invalidate_course_navs, sender=_model)
+    post_delete.connect(invalidate_course_navs, sender=_model)
+
+
+# GSTR-3B running totals. Item edits (as opposed to inserts / deletes) are
+# not tracked; `manage.py rebuild_return_totals` resyncs after bulk edits.
+
+@receiver(post_save, sender=Invoice)
+def count_return_invoice(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        returns.count_invoice(instance, 1)
+
+
+@receiver(post_save, sender=InvoiceItem)
+def add_return_item(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        returns.add_invoice_items(instance.invoice, [instance])
+
+
+def _deleted_directly(origin, model):
+    # origin is the instance / queryset delete() was called on (None on old callers)
+    return origin is None or isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+@receiver(pre_delete, sender=Invoice)
+def remove_return_invoice(sender, instance, origin=None, **kwargs):
+    # deleting the student drops its ReturnTotals rows as well
+    if _deleted_directly(origin, Invoice):
+        returns.remove_invoice(instance)
+
+
+@receiver(pre_delete, sender=InvoiceItem)
+def remove_return_item(sender, instance, origin=None, **kwargs):
+    # items cascading from an invoice delete are covered by remove_return_invoice
+    if _deleted_directly(origin, InvoiceItem):
+        returns.remove_invoice_items(instance.invoice, [instance])
+
+
+# Cached student login rows (credentials.py)
+
+@receiver(pre_save, sender=Student)
+def forget_old_student_email(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not instance.pk or (update_fields is not None and 'email' not in update_fields):
+        return
+    old_email = Student.objects.filter(pk=instance.pk).values_list('email', flat=True).first()
+    if old_email != instance.email:
+        invalidate_student_login(old_email)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def forget_student_login(sender, instance, **kwargs):
+    invalidate_student_login(instance.email)
+
+
+@receiver(post_save, sender=Institution)
+def forget_institution_student_logins(sender, instance, created=False, raw=False, **kwargs):
+    # the cached rows carry the institution name
+    if created or raw:
+        return
+    invalidate_student_logins(Student.objects.filter(institution=instance).values_list('email', flat=True))
+
+
+# Institution.student_count. Institution.enrol() counts its own inserts.
+
+@receiver(post_save, sender=Student)
+def count_new_student(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and not getattr(instance, '_counted', False):
+        Institution.objects.filter(pk=instance.institution_id).update(student_count=F('student_count') + 1)
+
+
+@receiver(post_delete, sender=Student)
+def uncount_student(sender, instance, origin=None, **kwargs):
+    # nothing to keep when the institution itself is being deleted
+    if isinstance(origin, Institution) or getattr(origin, "model", None) is Institution:
+        return
+    Institution.objects.filter(pk=instance.institution_id).update(student_count=F('student_count') - 1)
+
+
+# Cached admin dashboard statistics (stats.py)
+
+for _model in (Institution, Student):
+    post_save.connect(invalidate_admin_stats, sender=_model)
+    post_delete.connect(invalidate_admin_stats, sender=_model)
+
+
+# Practice TRN / login lookups (practice.py)
+
+for _model in (TrnCase, PracticeAccount):
+    post_save.connect(practice_registry.invalidate, sender=_model)
+    post_delete.connect(practice_registry.invalidate, sender=_model)
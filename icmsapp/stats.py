@@ -0,0 +1,95 @@
+"""
+Admin dashboard statistics.
+
+Built from one query over Institution (student counts come from the
+maintained Institution.student_count column, so no join on Student) and
+cached; the receivers in signals.py drop the entry whenever an
+institution or student is written.
+"""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Institution
+
+STATS_CACHE_KEY = "icms:stats:admin"
+# entries are also tied to today's date ("expiring"); the timeout bounds how
+# long a write that bypasses the signals (QuerySet.update) can go unseen
+STATS_CACHE_TIMEOUT = 300
+EXPIRY_WINDOW_DAYS = 30
+
+
+def _drop_admin_stats():
+    cache.delete(STATS_CACHE_KEY)
+
+
+def invalidate_admin_stats(**kwargs):
+    # again on commit: a request running meanwhile may have cached the
+    # pre-commit figures, which would otherwise stand for the full timeout
+    _drop_admin_stats()
+    transaction.on_commit(_drop_admin_stats)
+
+
+def _utilisation(students, limit):
+    return round(students * 100 / limit, 1) if limit > 0 else None
+
+
+def _stats_rows():
+    return Institution.objects.order_by("name", "pk").values_list(
+        "pk", "name", "student_count", "student_limit", "validity",
+    )
+
+
+def _build_admin_stats(today, rows):
+    expiring_before = today + timedelta(days=EXPIRY_WINDOW_DAYS)
+    institutions, expiring = [], []
+    total_students = total_limit = expired = 0
+    for pk, name, students, limit, validity in rows:
+        total_students += students
+        total_limit += limit
+        institutions.append({
+            "id": pk,
+            "name": name,
+            "students": students,
+            "student_limit": limit,
+            "utilisation": _utilisation(students, limit),
+            "validity": validity.isoformat(),
+        })
+        if validity < today:
+            expired += 1
+        elif validity <= expiring_before:
+            expiring.append({"id": pk, "name": name, "validity": validity.isoformat(),
+                             "days_left": (validity - today).days})
+
+    expiring.sort(key=lambda row: row["validity"])
+    return {
+        "date": today.isoformat(),
+        "institution_count": len(institutions),
+        "student_count": total_students,
+        "student_limit": total_limit,
+        "utilisation": _utilisation(total_students, total_limit),
+        "expired_count": expired,
+        "expiring_within_days": EXPIRY_WINDOW_DAYS,
+        "expiring": expiring,
+        "institutions": institutions,
+    }
+
+
+def admin_stats() -> dict:
+    today = date.today()
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None or stats["date"] != today.isoformat():
+        stats = _build_admin_stats(today, _stats_rows())
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+async def aadmin_stats() -> dict:
+    """admin_stats() for async views (async cache API and ORM iteration)."""
+    today = date.today()
+    stats = await cache.aget(STATS_CACHE_KEY)
+    if stats is None or stats["date"] != today.isoformat():
+        stats = _build_admin_stats(today, [row async for row in _stats_rows()])
+        await cache.aset(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,456 @@
+import re
+from datetime import date
+
+# =====================================================
+# ============== COMPANY / TRADE NAME EXTRACT =========
+# =====================================================
+
+_COMPANY_SUFFIXES = (
+    r"(?:Infotech|Technologies|Technology|Enterprises?|Associates|Agencies|Solutions?|Systems?|Labs?|"
+    r"Industr(?:y|ies)|International|Corporation|Corp\.?|Ltd\.?|Limited|Pvt\.?\s*Ltd\.?|LLP|Company|Enterprizes)"
+)
+_HONORIFICS = r"(?:Mr|Mrs|Ms|Miss|Dr|Shri|Smt|Sri)\.?"
+_HONORIFICS_SET = {"Mr", "Mrs", "Ms", "Miss", "Dr", "Shri", "Smt", "Sri"}
+
+OWNER_PAT = re.compile(
+    r"""(?im)
+        \b(?:owner|proprietor|proprietrix|partner|director|managing\s+partner)
+        \s*(?:name)?\s*[:=\-–—]\s*
+        ([A-Z][A-Za-z .'\-]{1,80})
+    """,
+)
+
+_BUSINESS_TOKENS = {
+    "World","Stores","Store","Shop","Shops","Traders","Trader","Dealers","Dealer","Enterprises","Enterprise",
+    "Associates","Agency","Agencies","Electronics","Electricals","Solutions","Systems","Technologies",
+    "Technology","Industries","Industry","International","Corporation","Company","Corp","Labs","Ltd","LLP",
+    "Pvt","Private","Limited","Enterprizes","Group","Mart","Bazaar","Center","Centre","Supermarket",
+    "Mega","Hyper","Retail","Wholesale","Wholesalers","Wholesaler","Distributors","Distributor","Logistics",
+    "Foods","Food","Cafe","Café","Restaurant","Builders","Constructions","Construction","Interio","Designs",
+    "Design","Studios","Studio","Marketing","Services","Service"
+}
+
+_DATEY_TAIL = re.compile(
+    r"""(?ix)
+        (?:\s*,?\s*(?:on|since|from|in|as\s+of|established|started|commenced)\b.*$
+          |\s*,?\s*(?:\d{1,2}\s*(?:st|nd|rd|th)?\s+[A-Za-z]{3,9}\s*,?\s*\d{2,4}).*$
+          |\s*,?\s*(?:[A-Za-z]{3,9}\s+\d{1,2},?\s*\d{2,4}).*$
+          |\s*,?\s*(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*$
+          |\s*,?\s*(?:\d{4}).*$
+        )
+    """
+)
+
+_COMPANY_SUFFIX_PAT = re.compile(rf"\b{_COMPANY_SUFFIXES}\b")
+_CREDENTIAL_LINE_PAT = re.compile(r"(?im)^(?:User\s*ID|Password|GSTIN|Email|Mobile|PAN)\s*[:=].*$")
+_HSPACE_PAT = re.compile(r"[ \t]+")
+_LINE_BREAK_PAT = re.compile(r"[\r\n]")
+_BUSINESS_LABEL_PAT = re.compile(r"(?im)\b(Trade|Business)\s*Name\b\s*[:=\-–—]\s*(.+)$")
+_NAMED_AS_PAT = re.compile(
+    r"""(?ix)
+        \b(?:company|firm|business|shop)?\s*
+        (?:named|called|trading\s+as|doing\s+business\s+as|d[/]b[/]a)\s*
+        ["']?([A-Z][A-Za-z0-9& .'\-]{1,100})["']?
+    """
+)
+_LEADING_COMPANY_PAT = re.compile(
+    r"""(?ix)
+        ^\s*
+        (?!""" + _HONORIFICS + r"""\b)
+        ([A-Z][\w&.'-]+(?:\s+[A-Z][\w&.'-]+){0,6})
+        \s+(?:is|was|has|have|operates|operated|runs|owned|registered)\b
+    """
+)
+_TITLE_WORDS_PAT = re.compile(r"\b([A-Z][A-Za-z0-9& .'\-]{2,100})\b")
+_LEADING_HONORIFIC_NAME_PAT = re.compile(
+    rf"^\s*{_HONORIFICS}\s+([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){{0,3}})\b"
+)
+_LEADING_NAME_PAT = re.compile(r"^\s*([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){0,3})\b")
+
+def _looks_like_person(cand: str) -> bool:
+    cand = (cand or "").strip()
+    if not cand:
+        return False
+
+    tokens = cand.split()
+
+    # reject if it's only an honorific (with/without dot), e.g., "Mr."
+    if len(tokens) == 1:
+        t0 = tokens[0].rstrip(".")
+        if t0 in _HONORIFICS_SET:
+            return False
+
+    # if it starts with an honorific, require at least two tokens (e.g., "Mr John")
+    if tokens:
+        first = tokens[0].rstrip(".")
+        if first in _HONORIFICS_SET and len(tokens) < 2:
+            return False
+
+    if not (1 <= len(tokens) <= 4):
+        return False
+
+    for t in tokens:
+        # allow initials like "A." or "K."
+        if t.endswith(".") and len(t) <= 3 and t[:-1].isalpha() and t[0].isupper():
+            continue
+        if not (t[0].isupper() and t[1:].islower()):
+            return False
+        if any(ch.isdigit() or ch in "@_-/&" for ch in t):
+            return False
+        if t in _BUSINESS_TOKENS:
+            return False
+
+    return True
+
+def _strip_quotes(s: str) -> str:
+    s = (s or "").strip()
+    if (len(s) >= 2) and ((s[0] == s[-1]) and s[0] in ("'", '"')):
+        return s[1:-1].strip()
+    return s
+
+def _clean_company(s: str) -> str:
+    s = (s or "").strip(" -–—:.,'•\t\r\n")
+    s = _DATEY_TAIL.sub("", s)
+    return s.strip(" -–—:.,'•\t\r\n")
+
+def _looks_like_company(cand: str) -> bool:
+    c = (cand or "").strip()
+    if not c:
+        return False
+    if _looks_like_person(c):
+        return False
+    if _COMPANY_SUFFIX_PAT.search(c):
+        return True
+    parts = set(p.strip(" .,&-") for p in c.split())
+    if parts & _BUSINESS_TOKENS:
+        return True
+    words = c.split()
+    if len(words) >= 2 and all(w and w[0].isupper() for w in words[:2]):
+        return True
+    return False
+
+def _extract_company_name(task_info: str, heading: str, topic_title: str) -> str:
+    text = (task_info or "")
+    text = _CREDENTIAL_LINE_PAT.sub("", text)
+    text = _HSPACE_PAT.sub(" ", text).strip()
+    joined = text
+
+    m = _BUSINESS_LABEL_PAT.search(joined)
+    if m:
+        cand = _strip_quotes(_clean_company(m.group(2)))
+        if _looks_like_company(cand):
+            return cand
+
+    m = _NAMED_AS_PAT.search(joined)
+    if m:
+        cand = _strip_quotes(_clean_company(m.group(1)))
+        if _looks_like_company(cand):
+            return cand
+
+    m = _LEADING_COMPANY_PAT.search(joined)
+    if m:
+        cand = _clean_company(m.group(1))
+        if _looks_like_company(cand):
+            return cand
+
+    for src in (heading or "", topic_title or ""):
+        if src:
+            mh = _TITLE_WORDS_PAT.search(src)
+            if mh:
+                cand = _clean_company(mh.group(1))
+                if _looks_like_company(cand):
+                    return cand
+
+    return "User"
+
+# === NEW: extract legal name from first line (don't split on ".") ===
+def _extract_legal_from_leading(task_info: str) -> str:
+    t = (task_info or "").strip()
+    if not t:
+        return ""
+    first_line = _LINE_BREAK_PAT.split(t, maxsplit=1)[0].strip()
+
+    m = _LEADING_HONORIFIC_NAME_PAT.match(first_line)
+    if m:
+        cand = m.group(1).strip()
+        return cand if _looks_like_person(cand) else ""
+
+    m2 = _LEADING_NAME_PAT.match(first_line)
+    if m2:
+        cand = m2.group(1).strip()
+        return cand if _looks_like_person(cand) else ""
+
+    return ""
+
+# =====================================================
+# =============== META PARSER & DUE DATES =============
+# =====================================================
+
+_DASH = r"[:=\-–—]"
+_PERIOD_VALUE = r"([A-Za-z]{3,12}(?:[ '\-]?\d{2,4})?|\d{1,2}[/\-]\d{2,4}|\d{4}[/\-]\d{1,2})"
+
+_GSTIN_PAT = re.compile(rf"\bGSTIN\b\s*{_DASH}?\s*([0-9A-Z]{{15}})", re.I)
+_FY_PAT = re.compile(
+    rf"\b(FY|F\.?\s*Y\.?|F\s*Y|Fin(?:ancial)?\s*Y(?:r|ear)?)\b\s*{_DASH}?\s*\(?\s*([12]\d{{3}})\s*(?:[/\-]|\s+to\s+|\s+)([12]?\d{{2,4}})\)?",
+    re.I
+)
+_RETURN_PERIOD_LINE_PAT = re.compile(rf"\b(Return\s*Period|Period|Month)\b\s*{_DASH}?\s*{_PERIOD_VALUE}", re.I)
+_RETURN_PERIOD_PAT = re.compile(rf"\bReturn\s*Period\b\s*{_DASH}?\s*{_PERIOD_VALUE}", re.I)
+_PERIOD_OR_MONTH_PAT = re.compile(rf"\b(Period|Month)\b\s*{_DASH}?\s*{_PERIOD_VALUE}", re.I)
+_TRADE_NAME_PAT = re.compile(rf"\bTrade\s*Name\b\s*{_DASH}?\s*(.+)$", re.I)
+_LEGAL_NAME_PAT = re.compile(rf"\bLegal\s*Name\b\s*{_DASH}?\s*(.+)$", re.I)
+_HONORIFIC_NAME_PAT = re.compile(
+    rf"\b{_HONORIFICS}\s+([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){{0,3}})", re.I
+)
+_LEADING_PERSON_PAT = re.compile(
+    r"""(?ix)
+    ^\s*
+    (?!""" + _HONORIFICS + r"""\b)
+    ([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){0,3})
+    \s+(?:started|commenced|requested|has\s+requested|is|was|has|have|asked|authorised|authorized|applied)\b
+    """
+)
+_FY_RANGE_PAT = re.compile(r"^\s*([12]\d{3})\s*-\s*([12]\d{3})\s*$")
+_PERIOD_WORD_PAT = re.compile(r"^([A-Za-z]{3,12})(?:[ '\-]?(\d{2,4}))?$")
+
+def _norm(s: str) -> str:
+    if not s:
+        return ""
+    s = s.replace("–", "-").replace("—", "-").replace("−", "-")
+    return s.strip()
+
+def _clean(v: str) -> str:
+    return (v or "").strip(" \t\r\n-:=•").strip()
+
+def _normalize_fy(y1: str, y2: str) -> str:
+    try:
+        a = int(y1)
+    except:
+        return f"{y1}-{y2}"
+    if len(y2) == 2:
+        try:
+            tail = int(y2)
+        except:
+            return f"{y1}-{y2}"
+        b = a // 100 * 100 + tail
+        if b < a:
+            b += 100
+    else:
+        try:
+            b = int(y2)
+        except:
+            return f"{y1}-{y2}"
+    return f"{a}-{b}"
+
+MONTHS = {
+    "jan":"January","january":"January","feb":"February","february":"February","mar":"March","march":"March",
+    "apr":"April","april":"April","may":"May","jun":"June","june":"June","jul":"July","july":"July",
+    "aug":"August","august":"August","sep":"September","sept":"September","september":"September",
+    "oct":"October","october":"October","nov":"November","november":"November","dec":"December","december":"December",
+}
+
+def _fy_second_year(fy: str):
+    m = _FY_RANGE_PAT.match(fy or "")
+    if not m:
+        return None
+    try:
+        return int(m.group(2))
+    except:
+        return None
+
+def _expand_year(two_or_four: str, fallback_year: int | None):
+    try:
+        n = int(two_or_four)
+    except:
+        return fallback_year
+    if n >= 100:
+        return n
+    if fallback_year:
+        century = (fallback_year // 100) * 100
+        candidate = century + n
+        if candidate < fallback_year - 20:
+            candidate += 100
+        return candidate
+    return 2000 + n
+
+def _return_period_to_month_year(return_period: str, fy: str | None):
+    if not return_period:
+        return None, None
+    rp = return_period.strip()
+    m = _PERIOD_WORD_PAT.match(rp)
+    if m:
+        mon = MONTHS.get(m.group(1).lower(), m.group(1).title())
+        if mon not in MONTHS.values():
+            # e.g. "month tax invoice" – not a period at all
+            return None, None
+        year = None
+        if m.group(2):
+            year = _expand_year(m.group(2), _fy_second_year(fy) if fy else None)
+        else:
+            month_index = ["January","February","March","April","May","June","July","August","September","October","November","December"].index(mon)
+            if fy:
+                start_year = int(fy.split("-")[0])
+                year = start_year if month_index >= 3 else start_year + 1
+        return mon, year
+    return None, None
+
+def _return_period_code(return_period: str, fy: str | None) -> str:
+    """'September' + '2021-2022' -> '092021' (the portal's MMYYYY ret_period), or ''."""
+    mon, year = _return_period_to_month_year(return_period, fy)
+    if not mon or not year:
+        return ""
+    months = ["January","February","March","April","May","June","July","August","September","October","November","December"]
+    return f"{months.index(mon) + 1:02d}{year}"
+
+def _compute_due_date_for_gstr1(month_name: str, year: int) -> date:
+    months = ["January","February","March","April","May","June","July","August","September","October","November","December"]
+    idx = months.index(month_name)
+    next_idx = (idx + 1) % 12
+    next_year = year + (1 if idx == 11 else 0)
+    return date(next_year, next_idx + 1, 11)
+
+def _compute_due_date_for_gstr3b(month_name: str, year: int) -> date:
+    months = ["January","February","March","April","May","June","July","August","September","October","November","December"]
+    idx = months.index(month_name)
+    next_idx = (idx + 1) % 12
+    next_year = year + (1 if idx == 11 else 0)
+    return date(next_year, next_idx + 1, 21)
+
+def _format_date_ind(d: date) -> str:
+    return d.strftime("%d %b %Y")
+
+
+class TaskInfoParser:
+    """
+    Extracts GSTIN / FY / ReturnPeriod / TradeName / LegalName from a
+    Content.task_info paragraph.
+
+    Every pattern is compiled once at import.  parse() always does the full
+    extraction; parse_cached() / company_cached() memoise the result per
+    (content id, hash of the text) so repeated page hits on the same task
+    cost one dict lookup.  Edited task text hashes differently, so a stale
+    entry is never returned.
+    """
+
+    max_entries = 1024
+
+    def __init__(self):
+        self._meta = {}
+        self._company = {}
+
+    def clear(self):
+        self._meta.clear()
+        self._company.clear()
+
+    def parse(self, task_info: str) -> dict:
+        meta = {"GSTIN": "", "FY": "", "ReturnPeriod": "", "TradeName": "", "LegalName": ""}
+        if not task_info:
+            return meta
+
+        text = _norm(task_info)
+        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+        joined = "\n".join(lines)
+
+        # FIRST: legal name from beginning (handles "Mr. ...")
+        lead_name = _extract_legal_from_leading(joined)
+        if lead_name:
+            meta["LegalName"] = lead_name
+
+        for ln in lines:
+            m = _GSTIN_PAT.search(ln)
+            if m and not meta["GSTIN"]:
+                meta["GSTIN"] = m.group(1).upper(); continue
+            m = _FY_PAT.search(ln)
+            if m and not meta["FY"]:
+                meta["FY"] = _normalize_fy(m.group(2), m.group(3)); continue
+            m = _RETURN_PERIOD_LINE_PAT.search(ln)
+            if m and not meta["ReturnPeriod"]:
+                meta["ReturnPeriod"] = (m.group(2) or "").strip(" \t\r\n-:=•"); continue
+            m = _TRADE_NAME_PAT.search(ln)
+            if m and not meta["TradeName"]:
+                meta["TradeName"] = (m.group(1) or "").strip(" \t\r\n-:=•"); continue
+            m = _LEGAL_NAME_PAT.search(ln)
+            if m and not meta["LegalName"]:
+                cand = (m.group(1) or "").strip()
+                if _looks_like_person(cand):
+                    meta["LegalName"] = cand
+                continue
+
+        if not meta["GSTIN"]:
+            m = _GSTIN_PAT.search(joined)
+            if m: meta["GSTIN"] = m.group(1).upper()
+
+        if not meta["FY"]:
+            m = _FY_PAT.search(joined)
+            if m: meta["FY"] = _normalize_fy(m.group(2), m.group(3))
+
+        if not meta["ReturnPeriod"]:
+            m = _RETURN_PERIOD_PAT.search(joined) or _PERIOD_OR_MONTH_PAT.search(joined)
+            if m: meta["ReturnPeriod"] = (m.group(m.lastindex) or "").strip(" \t\r\n-:=•")
+
+        if not meta["LegalName"]:
+            m_owner = OWNER_PAT.search(joined)
+            if m_owner:
+                cand = (m_owner.group(1) or "").strip()
+                if _looks_like_person(cand): meta["LegalName"] = cand
+
+        if not meta["LegalName"]:
+            m = _HONORIFIC_NAME_PAT.search(joined)
+            if m:
+                cand = (m.group(1) or "").strip()
+                if _looks_like_person(cand): meta["LegalName"] = cand
+
+        if not meta["LegalName"]:
+            m2 = _LEADING_PERSON_PAT.search(joined)
+            if m2:
+                cand = (m2.group(1) or "").strip()
+                if not _COMPANY_SUFFIX_PAT.search(cand) and _looks_like_person(cand):
+                    meta["LegalName"] = cand
+
+        if not meta["TradeName"]:
+            m = _NAMED_AS_PAT.search(joined)
+            if m:
+                cand = _strip_quotes(_clean_company(m.group(1)))
+                if _looks_like_company(cand): meta["TradeName"] = cand
+
+        if not meta["TradeName"]:
+            m2 = _LEADING_COMPANY_PAT.search(joined)
+            if m2:
+                cand = _clean_company(m2.group(1))
+                if _looks_like_company(cand): meta["TradeName"] = cand
+
+        mon, yr = _return_period_to_month_year(meta["ReturnPeriod"], meta["FY"])
+        if mon and yr:
+            meta["ReturnPeriod"] = f"{mon} {yr}"
+
+        # uppercase Trade Name
+        if meta["TradeName"]:
+            meta["TradeName"] = meta["TradeName"].upper()
+
+        return meta
+
+    def parse_cached(self, content_id, task_info: str) -> dict:
+        task_info = task_info or ""
+        key = (content_id, hash(task_info))
+        meta = self._meta.get(key)
+        if meta is None:
+            if len(self._meta) >= self.max_entries:
+                self._meta.clear()
+            meta = self._meta[key] = self.parse(task_info)
+        # callers get their own copy so the cached dict is never mutated
+        return dict(meta)
+
+    def company_cached(self, content_id, task_info: str, heading: str, topic_title: str) -> str:
+        key = (content_id, hash((task_info or "", heading or "", topic_title or "")))
+        name = self._company.get(key)
+        if name is None:
+            if len(self._company) >= self.max_entries:
+                self._company.clear()
+            name = self._company[key] = _extract_company_name(task_info, heading, topic_title)
+        return name
+
+
+task_parser = TaskInfoParser()
+
+def parse_task_info_para(task_info: str):
+    return task_parser.parse(task_info)
@@ -1,3 +1,605 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from unittest import mock
 
-# Create your tests here.
+from . import caches, imports, views
+from .caches import content1_ids, course_nav, SharedVersion
+from .credentials import authenticate_student, invalidate_student_login
+from .hashers import TunablePBKDF2PasswordHasher
+from .imports import import_students
+from .locations import DISTRICTS_ASSET, DISTRICTS_JSON, DISTRICTS_VERSION, STATIC_DIR, STATES_DISTRICTS
+from .paging import keyset_page, prefix_filter
+from .stats import admin_stats, STATS_CACHE_KEY
+from .models import (
+    StudentLimitReached, StudentConflict, Registration, Course, Topic, Content, GST_TASK_COURSE, Institution, Student, TrnCase, PracticeAccount,
+)
+from .practice import practice_registry, import_trn_cases, TestCredentials, HELP_LIMIT, REGISTRY_TIMEOUT
+
+
+TASK_INFO = (
+    "Ravi Traders is a shop in Kochi owned by Mr. Ravi Menon.\n"
+    "Legal Name: Ravi Menon\n"
+    "GSTIN: 32AAACR1234A1Z5\n"
+    "Financial Year: 2023-2024\n"
+    "Return Period: September"
+)
+
+
+def make_task(number=2, task_info=TASK_INFO):
+    """A GST task (content number in the returns course); its TaskMeta is built by the post_save signal."""
+    course, _ = Course.objects.get_or_create(slug=GST_TASK_COURSE, defaults={"title": "NIL Return Filing"})
+    topic, _ = Topic.objects.get_or_create(
+        course=course, number=1, defaults={"title": "GSTR-1", "topic_type": "Task", "order": 1},
+    )
+    return Content.objects.create(course=course, topic=topic, number=number, heading="GST_1", task_info=task_info)
+
+
+class RegistrationWizardTests(TestCase):
+    QID = 9
+    STEPS = [
+        "step_business_details", "step_promoters", "step_authorized_signatory",
+        "step_authorized_representative", "step_principal_place", "step_additional_places",
+        "step_goods_services", "step_state_specific", "step_aadhaar", "step_verification",
+    ]
+
+    def setUp(self):
+        self.client.post(reverse("trn_page"), {"trn": "201600059591TRN", "captcha": "519741"})
+        self.client.post(reverse("step_promoters", args=[self.QID]), {"name": "Vijay Kumar"})
+
+    def test_get_writes_nothing(self):
+        for step in self.STEPS:
+            with self.subTest(step=step), \
+                    mock.patch.object(SessionBase, "save", autospec=True) as session_save, \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(step, args=[self.QID]))
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.wsgi_request.session.modified)
+            session_save.assert_not_called()
+            writes = [q["sql"] for q in queries.captured_queries if not q["sql"].lstrip().upper().startswith("SELECT")]
+            self.assertEqual(writes, [])
+
+    def test_post_writes_only_changed_sections(self):
+        url = reverse("step_promoters", args=[self.QID])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"name": "Vijay Kumar"})
+        self.assertFalse([q for q in queries.captured_queries if "icmsapp_registration" in q["sql"] and q["sql"].startswith("UPDATE")])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"name": "Vijay Kumar", "mobile": "9999999999"})
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "icmsapp_registration"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"promoter"', updates[0])
+        self.assertNotIn('"principal_place"', updates[0])
+        self.assertEqual(Registration.objects.get(qid=self.QID).promoter["mobile"], "9999999999")
+
+
+def make_institution(email="college@example.com"):
+    return Institution.objects.create(
+        name="Test College", email=email, password="x", student_limit=10, validity="2030-01-01",
+    )
+
+
+def make_student(email="asha@example.com"):
+    return make_institution().enrol(name="Asha", email=email, student_id="S1", password="x")
+
+
+def login_student(client, student):
+    session = client.session
+    session.update({"user_type": "student", "student_pk": student.pk, "email": student.email})
+    session.save()
+
+
+class TaskViewQueryTests(TestCase):
+    """Each GST task view loads its task once: one TaskMeta query, whatever the helpers need."""
+
+    def setUp(self):
+        make_task()
+        content1_ids.ids()   # the id index is process-wide; keep its one-off load out of the counts
+
+    def test_query_count_per_view(self):
+        views = [
+            ("trn_dashboard_with_id", 1),
+            ("gst_ledger_dashboard_with_id", 1),
+            ("file_returns_with_id", 1),
+            ("gstr1_summary_with_id", 1),
+            ("gstr1_task_meta_by_id", 1),
+            ("file_gstr1", 1),
+            ("gstr3b_return_with_id", 1),
+        ]
+        for name, queries in views:
+            with self.subTest(view=name), self.assertNumQueries(queries):
+                response = self.client.get(reverse(name, args=[2]))
+            self.assertEqual(response.status_code, 200)
+
+
+class TaskMetaSessionTests(TestCase):
+    def setUp(self):
+        make_task(2)
+        make_task(3)
+
+    @override_settings(ICMS_PRACTICE_COOKIE=False)
+    def test_remembered_task_from_database_session(self):
+        # the async view must read the database-backed practice session without sync ORM calls
+        session = self.client.session
+        session["last_content_id"] = 3
+        session.save()
+        response = self.client.get(reverse("gstr1_task_meta_auto"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], 3)
+
+
+class TaskEtagTests(TestCase):
+    def setUp(self):
+        self.content = make_task(2)
+
+    def test_conditional_get(self):
+        for name in ("gstr1_task_meta_by_id", "course_content_basic"):
+            with self.subTest(view=name):
+                url = reverse(name, args=[2])
+                etag = self.client.get(url).headers["ETag"]
+                response = self.client.get(url, headers={"if-none-match": etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["ETag"], etag)
+
+    def test_saving_the_task_changes_the_etag(self):
+        url = reverse("gstr1_task_meta_by_id", args=[2])
+        etag = self.client.get(url).headers["ETag"]
+        self.content.task_info = TASK_INFO.replace("September", "October")
+        self.content.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.json()["meta"]["ReturnPeriod"], "October 2023")
+
+
+class TasksMetaBatchTests(TestCase):
+    def setUp(self):
+        make_task(2)
+        make_task(3)
+
+    def test_order_and_duplicates(self):
+        response = self.client.get(reverse("tasks_meta_batch"), {"ids": "3,2,3,99"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in json.loads(b"".join(response.streaming_content))], [3, 2])
+
+    def test_invalid_ids(self):
+        for ids in ("2,²", "2,x", "2,٣", "1_0", "+3", "-2", ",".join(str(n) for n in range(201))):
+            with self.subTest(ids=ids[:20]):
+                self.assertEqual(self.client.get(reverse("tasks_meta_batch"), {"ids": ids}).status_code, 400)
+
+
+class Gstr3bTableTests(TestCase):
+    def setUp(self):
+        make_task()
+        login_student(self.client, make_student())
+
+    def test_malformed_items_or_flags_are_a_400(self):
+        base = {"recipient-name": "Buyer", "invoice-no": "INV2", "invoice-date": "2023-09-05", "total-value": "10"}
+        for extra in ({"itemDetails": {}}, {"itemDetails": "x"}, {"itemDetails": [1]}, {"checkboxes": []}):
+            with self.subTest(extra=extra):
+                response = self.client.post(reverse("invoices_api"), json.dumps({**base, **extra}),
+                                            content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_invoice_shows_in_table_3_1(self):
+        response = self.client.post(reverse("invoices_api"), json.dumps({
+            "fy": "2023-2024", "period": "September",
+            "recipient-gstin": "32AAACB1111B1Z1", "recipient-name": "Buyer",
+            "invoice-no": "INV1", "invoice-date": "2023-09-05", "total-value": "1180",
+            "itemDetails": [{"hsn": "8471", "rate": "18%", "taxableValue": "1000", "integratedTax": "180"}],
+        }), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+        page = self.client.get(reverse("gstr3b_return_with_id", args=[2]))
+        # what the NEXT button opens: the rendered URL plus the nil choice
+        filing = self.client.get(page.context["next_url"] + "&nil=yes")
+        for response in (page, filing):
+            table = response.context["table_3_1"]
+            self.assertEqual((table.taxable_value, table.igst), (Decimal("1000.00"), Decimal("180.00")))
+
+
+class StudentImportTests(TestCase):
+    def setUp(self):
+        self.institution = make_student().institution
+        session = self.client.session
+        session.update({"user_type": "institute", "institution_id": self.institution.pk})
+        session.save()
+
+    def upload(self, content):
+        return self.client.post(reverse("student_import"), {"file": SimpleUploadedFile("students.csv", content)})
+
+    def test_imports_rows(self):
+        response = self.upload("name,email,student_id,password\nRené,rene@example.com,S2,pw\n".encode())
+        self.assertEqual(response.json()["created"], 1)
+
+    def test_unreadable_file_is_a_400(self):
+        for label, content in (
+            ("cp1252", "name,email,student_id,password\nRené,rene@example.com,S2,pw\n".encode("cp1252")),
+            ("oversized field", b"name,email,student_id,password\n" + b"x" * 200_000 + b",a@example.com,S2,pw\n"),
+        ):
+            with self.subTest(label):
+                response = self.upload(content)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()["success"])
+
+
+class ImportHashTests(TestCase):
+    @mock.patch.object(TunablePBKDF2PasswordHasher, "iterations", 20_000)
+    def test_import_hardens_its_hashes_after_commit(self):
+        institution = make_student().institution
+        row = {"name": "Ravi", "email": "ravi@example.com", "student_id": "S2", "password": "secret"}
+        # run the background job inline: another thread cannot see this test's transaction
+        with mock.patch("icmsapp.imports._harden_in_background", imports.harden_import_hashes), \
+                self.captureOnCommitCallbacks(execute=True):
+            import_students(institution, [(2, row)])
+        self.assertTrue(Student.objects.get(email="ravi@example.com").password.startswith("pbkdf2_wrapped_sha256$20000$"))
+        self.assertIsNotNone(authenticate_student("ravi@example.com", "secret"))
+
+    def test_clash_missed_by_the_check_is_reported_per_row(self):
+        institution = make_student().institution   # holds asha@example.com / S1
+        rows = [
+            (2, {"name": "Asha", "email": "asha@example.com", "student_id": "S9", "password": "pw"}),
+            (3, {"name": "Ravi", "email": "ravi@example.com", "student_id": "S2", "password": "pw"}),
+        ]
+        # as if asha@example.com had been inserted right after the clash check
+        with mock.patch("icmsapp.imports._unclaimed", lambda institution, chunk, report: chunk):
+            report = import_students(institution, rows)
+        self.assertEqual((report.created, [line for line, _ in report.errors]), (1, [2]))
+        self.assertEqual(Institution.objects.get(pk=institution.pk).student_count, 2)
+
+    @mock.patch.object(TunablePBKDF2PasswordHasher, "iterations", 20_000)
+    def test_hash_passwords_hardens_import_hashes(self):
+        institution = make_student().institution
+        row = {"name": "Ravi", "email": "ravi@example.com", "student_id": "S2", "password": "secret"}
+        self.assertEqual(import_students(institution, [(2, row)]).created, 1)
+        self.assertTrue(Student.objects.get(email="ravi@example.com").password.startswith("pbkdf2_sha256$1000$"))
+
+        call_command("hash_passwords", stdout=io.StringIO())
+        self.assertTrue(Student.objects.get(email="ravi@example.com").password.startswith("pbkdf2_wrapped_sha256$20000$"))
+
+        self.assertIsNone(authenticate_student("ravi@example.com", "wrong"))
+        self.assertIsNotNone(authenticate_student("ravi@example.com", "secret"))
+        # the wrapped hash is replaced by a plain full-cost one on login
+        self.assertTrue(Student.objects.get(email="ravi@example.com").password.startswith("pbkdf2_sha256$20000$"))
+
+
+class PracticeImportTests(TestCase):
+    def setUp(self):
+        practice_registry.invalidate()
+        session = self.client.session
+        session["user_type"] = "admin"
+        session.save()
+
+    def upload(self, kind, content):
+        return self.client.post(reverse("practice_import"), {
+            "kind": kind, "file": SimpleUploadedFile(f"{kind}.csv", content),
+        })
+
+    def test_row_errors_are_reported(self):
+        response = self.upload("cases", "trn,qid,legal_name\nX1TRN,5,Ravi\nX2TRN,²\nX3TRN,\nX1TRN,6\n".encode())
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report["created"], 1)
+        self.assertEqual([e["line"] for e in report["errors"]], [3, 4, 5])
+        self.assertEqual(TrnCase.objects.get(trn="X1TRN").qid, 5)
+
+        response = self.upload("accounts", "portal,username,password,content_number\ntask,ravi,pw,²\ndemo,ravi,pw,\n".encode())
+        self.assertEqual((response.json()["created"], response.json()["rejected"]), (1, 1))
+        self.assertTrue(PracticeAccount.objects.filter(portal="demo", username="ravi").exists())
+
+    def test_undecodable_upload_is_a_400(self):
+        response = self.upload("accounts", "portal,username,password,company\ndemo,ravi,pw,Café\n".encode("cp1252"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_institution_cannot_overwrite_another_institutions_rows(self):
+        first, second = make_institution("one@example.com"), make_institution("two@example.com")
+        import_trn_cases([(2, {"trn": "X1TRN", "qid": "5"})], institution=first)
+
+        report = import_trn_cases([(2, {"trn": "X1TRN", "qid": "6"})], institution=second)
+        self.assertEqual((report.created, report.rejected), (0, 1))
+        self.assertEqual(TrnCase.objects.get(trn="X1TRN").qid, 5)
+
+        # the site admin may update any row, and the owner is kept
+        import_trn_cases([(2, {"trn": "X1TRN", "qid": "7"})])
+        case = TrnCase.objects.get(trn="X1TRN")
+        self.assertEqual((case.qid, case.institution_id), (7, first.pk))
+
+    def test_registry_follows_imports_and_saves(self):
+        self.assertIsNone(practice_registry.trn_case("X1TRN"))
+        import_trn_cases([(2, {"trn": "X1TRN", "qid": "5"})])
+        self.assertEqual(practice_registry.trn_case("X1TRN").qid, 5)
+
+        case = TrnCase.objects.get(trn="X1TRN")
+        case.qid = 6
+        case.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(practice_registry.trn_case("X1TRN").qid, 6)
+        with self.assertNumQueries(0):
+            practice_registry.trn_case("X1TRN")
+
+        case.delete()
+        self.assertIsNone(practice_registry.trn_case("X1TRN"))
+
+    def test_registry_entries_expire(self):
+        # writes in another process are not seen here until the entry times out
+        practice_registry.invalidate()
+        TrnCase.objects.bulk_create([TrnCase(trn="X1TRN", qid=5)])   # no signals
+        with mock.patch("icmsapp.practice.time.monotonic", return_value=1000.0):
+            self.assertEqual(practice_registry.trn_case("X1TRN").qid, 5)
+        TrnCase.objects.filter(trn="X1TRN").update(qid=6)
+        with mock.patch("icmsapp.practice.time.monotonic", return_value=1000.0 + REGISTRY_TIMEOUT - 1), \
+                self.assertNumQueries(0):
+            self.assertEqual(practice_registry.trn_case("X1TRN").qid, 5)
+        with mock.patch("icmsapp.practice.time.monotonic", return_value=1000.0 + REGISTRY_TIMEOUT), \
+                self.assertNumQueries(1):
+            self.assertEqual(practice_registry.trn_case("X1TRN").qid, 6)
+
+
+@mock.patch.object(caches, "VERSION_CHECK_INTERVAL", 0)
+class SharedVersionTests(TestCase):
+    """The in-process caches rebuild when another worker bumps their shared version."""
+
+    def setUp(self):
+        self.content = make_task(2)
+
+    def test_content_ids_follow_other_workers(self):
+        self.assertEqual(content1_ids.ids(), [2])
+        # a row saved by another process: no signal reaches this one
+        Content.objects.bulk_create([Content(course=self.content.course, topic=self.content.topic, number=3, heading="GST_2")])
+        self.assertEqual(content1_ids.ids(), [2])
+        SharedVersion(f"content-ids:{GST_TASK_COURSE}").bump()
+        self.assertEqual(content1_ids.ids(), [2, 3])
+
+    def test_course_nav_follows_other_workers(self):
+        nav = course_nav(GST_TASK_COURSE)
+        self.assertEqual([t.number for t in nav.topics()], [1])
+        Topic.objects.bulk_create([Topic(course=self.content.course, number=2, title="GSTR-3B", topic_type="Task", order=2)])
+        self.assertEqual([t.number for t in nav.topics()], [1])
+        SharedVersion("course-nav").bump()
+        self.assertEqual([t.number for t in nav.topics()], [1, 2])
+
+    def test_commit_bumps_the_shared_version(self):
+        version = SharedVersion("course-nav")
+        version.stale()
+        with self.captureOnCommitCallbacks(execute=True):
+            Topic.objects.create(course=self.content.course, number=2, title="GSTR-3B", topic_type="Task", order=2)
+        self.assertTrue(version.stale())
+
+
+@mock.patch.object(TunablePBKDF2PasswordHasher, "iterations", 20_000)
+class StudentLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = make_student()   # enrolled with the plaintext password "x"
+
+    def test_plaintext_and_outdated_hashes_are_upgraded(self):
+        self.assertIsNotNone(authenticate_student("asha@example.com", "x"))
+        self.assertTrue(Student.objects.get(pk=self.student.pk).password.startswith("pbkdf2_sha256$20000$"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.filter(pk=self.student.pk).update(password=make_password("x", hasher="pbkdf2_sha256"))
+            invalidate_student_login("asha@example.com")
+        with mock.patch.object(TunablePBKDF2PasswordHasher, "iterations", 30_000):
+            self.assertIsNotNone(authenticate_student("asha@example.com", "x"))
+            self.assertTrue(Student.objects.get(pk=self.student.pk).password.startswith("pbkdf2_sha256$30000$"))
+
+    def test_cached_rows_and_invalidation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.set_password("x")
+            self.student.save()
+        self.assertEqual(authenticate_student("asha@example.com", "x").name, "Asha")
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(authenticate_student("asha@example.com", "x"))
+            self.assertIsNone(authenticate_student("asha@example.com", "wrong"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.name = "Asha R"
+            self.student.save()
+        self.assertEqual(authenticate_student("asha@example.com", "x").name, "Asha R")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertIsNone(authenticate_student("asha@example.com", "x"))
+
+
+class StudentCountTests(TestCase):
+    def setUp(self):
+        self.institution = make_institution()
+        Institution.objects.filter(pk=self.institution.pk).update(student_limit=2)
+
+    def count(self):
+        return Institution.objects.values_list("student_count", flat=True).get(pk=self.institution.pk)
+
+    def test_enrol_reserves_seats_up_to_the_limit(self):
+        self.institution.enrol(name="A", email="a@example.com", student_id="S1", password="x")
+        with self.assertRaises(StudentConflict) as conflict:
+            self.institution.enrol(name="B", email="a@example.com", student_id="S2", password="x")
+        self.assertEqual(conflict.exception.field, "email")
+        self.assertEqual(self.count(), 1)   # the clashing insert gave its seat back
+
+        self.institution.enrol(name="B", email="b@example.com", student_id="S2", password="x")
+        with self.assertRaises(StudentLimitReached):
+            self.institution.enrol(name="C", email="c@example.com", student_id="S3", password="x")
+        self.assertEqual(self.count(), 2)
+
+    def test_signals_count_other_inserts_and_deletes(self):
+        student = Student.objects.create(institution=self.institution, name="A", email="a@example.com",
+                                         student_id="S1", password="x")
+        self.assertEqual(self.count(), 1)
+        student.delete()
+        self.assertEqual(self.count(), 0)
+
+
+class KeysetPagingTests(TestCase):
+    def setUp(self):
+        self.pks = [make_institution(f"inst{i}@example.com").pk for i in range(7)]
+
+    def test_cursors_walk_both_ways(self):
+        qs = Institution.objects.all()
+        first = keyset_page(qs, {}, 3, descending=True)
+        self.assertEqual([i.pk for i in first], self.pks[:-4:-1])
+        self.assertEqual((first.has_previous, first.has_next), (False, True))
+
+        second = keyset_page(qs, {"after": first.next_cursor}, 3, descending=True)
+        self.assertEqual([i.pk for i in second], self.pks[3:0:-1])
+        last = keyset_page(qs, {"after": second.next_cursor}, 3, descending=True)
+        self.assertEqual(([i.pk for i in last], last.has_next), ([self.pks[0]], False))
+
+        back = keyset_page(qs, {"before": last.previous_cursor}, 3, descending=True)
+        self.assertEqual([i.pk for i in back], [i.pk for i in second])
+        self.assertEqual((back.has_previous, back.has_next), (True, True))
+        self.assertFalse(keyset_page(qs, {"before": first.previous_cursor}, 3, descending=True).object_list)
+
+        # a malformed cursor is ignored: first page
+        self.assertEqual([i.pk for i in keyset_page(qs, {"after": "x"}, 3, descending=True)], [i.pk for i in first])
+
+    def test_prefix_filter_is_case_sensitive(self):
+        Institution.objects.filter(pk=self.pks[0]).update(name="Kerala College")
+        match = lambda q: list(Institution.objects.filter(prefix_filter(("name", "email"), q)).values_list("pk", flat=True))
+        self.assertEqual(match("Kerala"), [self.pks[0]])
+        self.assertEqual(match("kerala"), [])
+        self.assertEqual(len(match("inst")), 7)
+        self.assertEqual(match("College"), [])   # prefixes only
+
+
+class AdminStatsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.institution = make_institution()
+
+    def test_cached_until_a_write_or_the_next_day(self):
+        self.assertEqual(admin_stats()["institution_count"], 1)
+        with self.assertNumQueries(0):
+            admin_stats()
+
+        make_institution("second@example.com")
+        self.assertEqual(admin_stats()["institution_count"], 2)
+
+        # entries are tied to the day they were built for ("expiring" moves with it)
+        with mock.patch("icmsapp.stats.date") as fake_date:
+            fake_date.today.return_value = date.today() + timedelta(days=1)
+            with self.assertNumQueries(1):
+                self.assertEqual(admin_stats()["date"], fake_date.today.return_value.isoformat())
+
+    def test_entry_cached_before_commit_is_dropped_on_commit(self):
+        admin_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_institution("second@example.com")
+            admin_stats()   # a concurrent request refilling the cache with pre-commit figures
+            self.assertIsNotNone(cache.get(STATS_CACHE_KEY))
+        self.assertIsNone(cache.get(STATS_CACHE_KEY))
+
+
+class DistrictsAssetTests(TestCase):
+    url = reverse("get_districts")
+
+    def test_versioned_map_is_immutable_and_conditional(self):
+        response = self.client.get(self.url, {"v": DISTRICTS_VERSION})
+        self.assertEqual(response.json(), STATES_DISTRICTS)
+        self.assertEqual(response["ETag"], f'"{DISTRICTS_VERSION}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.client.get(self.url, {"v": DISTRICTS_VERSION}, HTTP_IF_NONE_MATCH=f'"{DISTRICTS_VERSION}"')
+        self.assertEqual((response.status_code, response.content), (304, b""))
+
+        # an old ?v= (or none) is only cached briefly
+        response = self.client.get(self.url, {"v": "0ld"})
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=3600", response["Cache-Control"])
+
+    def test_gzip_and_single_state(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), DISTRICTS_JSON)
+
+        response = self.client.get(self.url, {"state": "Goa"})
+        self.assertEqual(response.json(), {"districts": ["North Goa", "South Goa"]})
+
+    def test_static_asset_matches_the_map(self):
+        path = STATIC_DIR / DISTRICTS_ASSET
+        self.assertEqual(path.read_bytes(), DISTRICTS_JSON, "run manage.py build_districts_asset")
+        self.assertEqual(gzip.decompress(path.with_name(path.name + ".gz").read_bytes()), DISTRICTS_JSON)
+        self.assertTrue(views._districts_url().endswith(DISTRICTS_ASSET))
+        with mock.patch("icmsapp.views.asset_built", return_value=False):
+            self.assertEqual(views._districts_url(), f"{self.url}?v={DISTRICTS_VERSION}")
+
+
+class LocationSearchTests(TestCase):
+    url = reverse("location_search")
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_prefix_matches_whole_names_then_words(self):
+        self.assertEqual(self.names(q="  BENGALURU "), ["Bengaluru Rural", "Bengaluru Urban"])
+        self.assertEqual(self.names(q="urban"), ["Bengaluru Urban", "Warangal Urban"])
+        self.assertEqual(self.names(q="kurn"), ["Kurnool"])   # stored as "kurnool"
+        self.assertEqual(self.names(q="tamil", kind="state"), ["Tamil Nadu"])
+        self.assertEqual(self.names(q="bil", state="himachal pradesh"), ["Bilaspur"])
+        self.assertEqual(len(self.names(q="b", limit=3)), 3)
+
+    def test_typos_fall_back_to_trigrams(self):
+        self.assertEqual(self.names(q="kolkatta"), ["Kolkata"])
+        self.assertEqual(self.names(q="bengaluru urbn")[0], "Bengaluru Urban")
+        self.assertEqual(self.names(q="kq"), [])   # too short for the fallback
+
+    def test_bad_kind_is_a_400(self):
+        self.assertEqual(self.client.get(self.url, {"q": "goa", "kind": "city"}).status_code, 400)
+
+
+class TestCredentialsTests(TestCase):
+    row = {
+        "user_type": "Taxpayer", "state": "Goa", "district": "North Goa", "business_name": "Row 0 Traders",
+        "pan_number": "AAAAA0000A", "email": "row0@icommail.com", "mobile": "9000000000",
+    }
+
+    def credentials(self, count):
+        """A TestCredentials reading a CSV of ``count`` identities."""
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", newline="", delete=False)
+        self.addCleanup(os.unlink, f.name)
+        with f:
+            f.write(",".join(self.row) + "\n")
+            for i in range(count):
+                f.write(",".join(value.replace("0", str(i)) for value in self.row.values()) + "\n")
+        override = override_settings(ICMS_TEST_CREDENTIALS_FILE=f.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        return TestCredentials()
+
+    def test_only_exact_rows_match(self):
+        credentials = self.credentials(3)
+        self.assertTrue(credentials.matches(self.row))
+        self.assertFalse(credentials.matches({**self.row, "mobile": "9000000001"}))
+        self.assertFalse(credentials.matches({**self.row, "email": ""}))
+        self.assertFalse(credentials.matches({}))
+
+    def test_help_message_lists_the_first_rows_and_counts_the_rest(self):
+        message = self.credentials(HELP_LIMIT + 5).help_message
+        self.assertIn(f"{HELP_LIMIT}. User Type: Taxpayer", message)
+        self.assertNotIn(f"{HELP_LIMIT + 1}. User Type", message)
+        self.assertTrue(message.endswith("... and 5 more practice identities."))
+
+    def test_shipped_file_drives_step1_validation(self):
+        self.assertEqual(views.validate_test_credentials({**self.row}), (False, views.test_credentials.help_message))
+        self.assertEqual(views.validate_test_credentials({
+            "user_type": "Taxpayer", "state": "Karnataka", "district": "Bengaluru Urban",
+            "business_name": "Das Electricals", "pan_number": "LDSTL0067M",
+            "email": "leodas@icommail.com", "mobile": "2023191067",
+        }), (True, ""))
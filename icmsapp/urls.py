@@ -17,10 +17,13 @@ urlpatterns = [
     path('edit_institution/<int:pk>/', views.edit_institution, name='edit_institution'),
     path('delete/<int:pk>/', views.delete_institution, name='delete_institution'),
     path('api/institutes/count/', views.institution_count, name='institution_count'),
+    path('api/admin/stats/', views.admin_stats_api, name='admin_stats_api'),
 
     # Students
     path('students/', views.student_list, name='student_list'),
     path('students/add/', views.student_add, name='student_add'),
+    path('students/import/', views.student_import, name='student_import'),
+    path('practice/import/', views.practice_import, name='practice_import'),
     path('students/edit/<int:pk>/', views.student_add, name='student_edit'),
     path('students/delete/<int:pk>/', views.student_delete, name='student_delete'),
     path('students/edit-password/<int:pk>/', views.edit_password, name='edit_password'),
@@ -42,6 +45,7 @@ urlpatterns = [
     path('register/success/', views.registration_success, name='registration_success'),
     path('api/get-districts/', views.get_districts, name='get_districts'),
     path('api/resend-otp/', views.resend_otp, name='resend_otp'),
+    path('api/locations/', views.location_search, name='location_search'),
 
     # TRN + OTP
     path('trn/', views.trn_page, name='trn_page'),
@@ -68,6 +72,7 @@ urlpatterns = [
     path('returns/gstr1/<int:content_id>/', views.gstr1_summary, name='gstr1_summary_with_id'),
     path('api/returns/gstr1/task/meta/', views.gstr1_task_meta, name='gstr1_task_meta_auto'),
     path('api/returns/gstr1/task/<int:content_id>/meta/', views.gstr1_task_meta, name='gstr1_task_meta_by_id'),
+    path('api/returns/tasks/meta/', views.tasks_meta_batch, name='tasks_meta_batch'),
     path('gstdashboard/', views.gst_dashboard, name='gst_dashboard'),
     path('gstdashboard/<int:qid>/', views.gst_dashboard, name='gst_dashboard_with_id'),
     
@@ -108,6 +113,8 @@ urlpatterns = [
     path('gstinvoiceform/', views.gstinvoiceform, name='gstinvoiceform'),
 
     path('invoice_listing/', views.invoice_listing, name='invoice_listing'),
+    path('api/returns/invoices/', views.invoices_api, name='invoices_api'),
+    path('api/returns/gstr1/summary/', views.gstr1_summary_api, name='gstr1_summary_api'),
 
     
 ]
@@ -1,201 +1,58 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, Http404
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
 from django.utils.dateparse import parse_date
-from django.core.paginator import Paginator
 from django.contrib import messages
-from django.views.decorators.http import require_POST, require_GET
+from django.views.decorators.http import require_POST, require_GET, require_http_methods
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import logout
-from django.db.models import Q
+from django.contrib.auth.hashers import make_password
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag, urlencode
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
 import json
 import re
 from datetime import date, datetime, timedelta
-from .models import CourseTopic2, CourseContent2
+from decimal import Decimal, InvalidOperation
 
 from .models import (
-    Institution, Student,
-    CourseTopic, CourseContent,
-    CourseTopic1, CourseContent1
-)
-
-# =====================================================
-# ============== COMPANY / TRADE NAME EXTRACT =========
-# =====================================================
-
-_COMPANY_SUFFIXES = (
-    r"(?:Infotech|Technologies|Technology|Enterprises?|Associates|Agencies|Solutions?|Systems?|Labs?|"
-    r"Industr(?:y|ies)|International|Corporation|Corp\.?|Ltd\.?|Limited|Pvt\.?\s*Ltd\.?|LLP|Company|Enterprizes)"
+    Institution, Student, StudentLimitReached, StudentConflict,
+    Content, TaskMeta, GST_TASK_COURSE,
+    Invoice, InvoiceItem, PracticeAccount,
 )
-_HONORIFICS = r"(?:Mr|Mrs|Ms|Miss|Dr|Shri|Smt|Sri)\.?"
-_HONORIFICS_SET = {"Mr", "Mrs", "Ms", "Miss", "Dr", "Shri", "Smt", "Sri"}
-
-OWNER_PAT = re.compile(
-    r"""(?im)
-        \b(?:owner|proprietor|proprietrix|partner|director|managing\s+partner)
-        \s*(?:name)?\s*[:=\-–—]\s*
-        ([A-Z][A-Za-z .'\-]{1,80})
-    """,
+from .caches import content1_ids, course_nav
+from .imports import import_students, read_rows, ImportFormatError
+from .paging import keyset_page, prefix_filter
+from .locations import (
+    STATES, STATES_DISTRICTS, DISTRICTS_JSON, DISTRICTS_GZIP, DISTRICTS_VERSION,
+    DISTRICTS_ASSET, asset_built, location_index,
 )
-
-_BUSINESS_TOKENS = {
-    "World","Stores","Store","Shop","Shops","Traders","Trader","Dealers","Dealer","Enterprises","Enterprise",
-    "Associates","Agency","Agencies","Electronics","Electricals","Solutions","Systems","Technologies",
-    "Technology","Industries","Industry","International","Corporation","Company","Corp","Labs","Ltd","LLP",
-    "Pvt","Private","Limited","Enterprizes","Group","Mart","Bazaar","Center","Centre","Supermarket",
-    "Mega","Hyper","Retail","Wholesale","Wholesalers","Wholesaler","Distributors","Distributor","Logistics",
-    "Foods","Food","Cafe","Café","Restaurant","Builders","Constructions","Construction","Interio","Designs",
-    "Design","Studios","Studio","Marketing","Services","Service"
-}
-
-def _looks_like_person(cand: str) -> bool:
-    cand = (cand or "").strip()
-    if not cand:
-        return False
-
-    tokens = cand.split()
-
-    # reject if it's only an honorific (with/without dot), e.g., "Mr."
-    if len(tokens) == 1:
-        t0 = tokens[0].rstrip(".")
-        if t0 in _HONORIFICS_SET:
-            return False
-
-    # if it starts with an honorific, require at least two tokens (e.g., "Mr John")
-    if tokens:
-        first = tokens[0].rstrip(".")
-        if first in _HONORIFICS_SET and len(tokens) < 2:
-            return False
-
-    if not (1 <= len(tokens) <= 4):
-        return False
-
-    for t in tokens:
-        # allow initials like "A." or "K."
-        if t.endswith(".") and len(t) <= 3 and t[:-1].isalpha() and t[0].isupper():
-            continue
-        if not (t[0].isupper() and t[1:].islower()):
-            return False
-        if any(ch.isdigit() or ch in "@_-/&" for ch in t):
-            return False
-        if t in _BUSINESS_TOKENS:
-            return False
-
-    return True
-
-_DATEY_TAIL = re.compile(
-    r"""(?ix)
-        (?:\s*,?\s*(?:on|since|from|in|as\s+of|established|started|commenced)\b.*$
-          |\s*,?\s*(?:\d{1,2}\s*(?:st|nd|rd|th)?\s+[A-Za-z]{3,9}\s*,?\s*\d{2,4}).*$
-          |\s*,?\s*(?:[A-Za-z]{3,9}\s+\d{1,2},?\s*\d{2,4}).*$
-          |\s*,?\s*(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*$
-          |\s*,?\s*(?:\d{4}).*$
-        )
-    """
+from .stats import admin_stats, aadmin_stats
+from .practice import test_credentials, practice_registry, IMPORTERS as PRACTICE_IMPORTERS
+from . import wizard
+from .credentials import authenticate_student, authenticate_institution
+from .returns import build_gstr1_summary, GSTR1_SECTIONS, add_invoice_items, gstr3b_table_3_1
+from .taskinfo import (
+    _return_period_to_month_year, _compute_due_date_for_gstr1,
+    _compute_due_date_for_gstr3b, _format_date_ind, _return_period_code,
 )
 
-def _strip_quotes(s: str) -> str:
-    s = (s or "").strip()
-    if (len(s) >= 2) and ((s[0] == s[-1]) and s[0] in ("'", '"')):
-        return s[1:-1].strip()
-    return s
-
-def _clean_company(s: str) -> str:
-    s = (s or "").strip(" -–—:.,'•\t\r\n")
-    s = _DATEY_TAIL.sub("", s)
-    return s.strip(" -–—:.,'•\t\r\n")
-
-def _looks_like_company(cand: str) -> bool:
-    c = (cand or "").strip()
-    if not c:
-        return False
-    if _looks_like_person(c):
-        return False
-    if re.search(rf"\b{_COMPANY_SUFFIXES}\b", c):
-        return True
-    parts = set(p.strip(" .,&-") for p in c.split())
-    if parts & _BUSINESS_TOKENS:
-        return True
-    words = c.split()
-    if len(words) >= 2 and all(w and w[0].isupper() for w in words[:2]):
-        return True
-    return False
-
-def _extract_company_name(task_info: str, heading: str, topic_title: str) -> str:
-    text = (task_info or "")
-    text = re.sub(r"(?im)^(?:User\s*ID|Password|GSTIN|Email|Mobile|PAN)\s*[:=].*$", "", text)
-    text = re.sub(r"[ \t]+", " ", text).strip()
-    joined = text
-
-    m = re.search(r"(?im)\b(Trade|Business)\s*Name\b\s*[:=\-–—]\s*(.+)$", joined)
-    if m:
-        cand = _strip_quotes(_clean_company(m.group(2)))
-        if _looks_like_company(cand):
-            return cand
-
-    m = re.search(
-        rf"""(?ix)
-            \b(?:company|firm|business|shop)?\s*
-            (?:named|called|trading\s+as|doing\s+business\s+as|d[/]b[/]a)\s*
-            ["']?([A-Z][A-Za-z0-9& .'\-]{{1,100}})["']?
-        """,
-        joined
-    )
-    if m:
-        cand = _strip_quotes(_clean_company(m.group(1)))
-        if _looks_like_company(cand):
-            return cand
-
-    m = re.search(
-        r"""(?ix)
-            ^\s*
-            (?!""" + _HONORIFICS + r"""\b)
-            ([A-Z][\w&.'-]+(?:\s+[A-Z][\w&.'-]+){0,6})
-            \s+(?:is|was|has|have|operates|operated|runs|owned|registered)\b
-        """,
-        joined
-    )
-    if m:
-        cand = _clean_company(m.group(1))
-        if _looks_like_company(cand):
-            return cand
-
-    for src in (heading or "", topic_title or ""):
-        if src:
-            mh = re.search(rf"\b([A-Z][A-Za-z0-9& .'\-]{{2,100}})\b", src)
-            if mh:
-                cand = _clean_company(mh.group(1))
-                if _looks_like_company(cand):
-                    return cand
-
-    return "User"
-
-# === NEW: extract legal name from first line (don't split on ".") ===
-def _extract_legal_from_leading(task_info: str) -> str:
-    t = (task_info or "").strip()
-    if not t:
-        return ""
-    first_line = re.split(r"[\r\n]", t, maxsplit=1)[0].strip()
-
-    m = re.match(
-        rf"^\s*{_HONORIFICS}\s+([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){{0,3}})\b",
-        first_line
-    )
-    if m:
-        cand = m.group(1).strip()
-        return cand if _looks_like_person(cand) else ""
-
-    m2 = re.match(r"^\s*([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){0,3})\b", first_line)
-    if m2:
-        cand = m2.group(1).strip()
-        return cand if _looks_like_person(cand) else ""
-
-    return ""
-
 # =====================================================
 # ================== HELPERS / RESOLVER ===============
 # =====================================================
 
-def _resolve_task_id(request, content_id):
+_UNREAD = object()
+
+def _resolve_task_id(request, content_id, remembered=_UNREAD):
+    """
+    Task id from the URL, ?content_id=, or the practice session's
+    last_content_id. Async callers read that last one themselves
+    (practice_session.aget) and pass it as ``remembered``.
+    """
     cid = None
     if content_id is not None:
         try:
@@ -209,281 +66,115 @@ def _resolve_task_id(request, content_id):
             cid = int(q)
 
     if cid is None:
-        cid = request.session.get("last_content_id")
+        if remembered is _UNREAD:
+            remembered = request.practice_session.get("last_content_id")
+        cid = remembered
 
+    # existence checks are bisects on the in-process id index, not queries
     if cid is None:
-        ge2 = CourseContent1.objects.filter(id__gte=2).order_by("id").first()
-        if ge2:
-            cid = ge2.id
-        else:
-            first_any = CourseContent1.objects.order_by("id").first()
-            if not first_any:
-                raise Http404("No course content found.")
-            cid = first_any.id
+        cid = content1_ids.first_from(2) or content1_ids.first()
+        if cid is None:
+            raise Http404("No course content found.")
 
-    if cid < 2 and CourseContent1.objects.filter(pk=2).exists():
+    if cid < 2 and 2 in content1_ids:
         cid = 2
 
-    if not CourseContent1.objects.filter(pk=cid).exists():
-        ge2 = CourseContent1.objects.filter(id__gte=2).order_by("id").first()
-        if ge2:
-            cid = ge2.id
-        else:
-            first_any = CourseContent1.objects.order_by("id").first()
-            if not first_any:
-                raise Http404("No course content found.")
-            cid = first_any.id
+    if cid not in content1_ids:
+        cid = content1_ids.first_from(2) or content1_ids.first()
+        if cid is None:
+            raise Http404("No course content found.")
 
     return cid
 
-def _company_for_task(content_id: int) -> str:
-    obj = get_object_or_404(CourseContent1.objects.select_related("topic"), pk=content_id)
-    heading = getattr(obj, "heading", "") or ""
-    topic_title = obj.topic.title if getattr(obj, "topic_id", None) else ""
-    task_info = getattr(obj, "task_info", "") or ""
-    return _extract_company_name(task_info, heading, topic_title)
-
-def _trade_name_for_task(content_id: int) -> str:
-    return _company_for_task(content_id).upper()
-
-# =====================================================
-# =============== META PARSER & DUE DATES =============
-# =====================================================
-
-_DASH = r"[:=\-–—]"
-
-def _norm(s: str) -> str:
-    if not s:
-        return ""
-    s = s.replace("–", "-").replace("—", "-").replace("−", "-")
-    return s.strip()
-
-def _clean(v: str) -> str:
-    return (v or "").strip(" \t\r\n-:=•").strip()
-
-def _normalize_fy(y1: str, y2: str) -> str:
-    try:
-        a = int(y1)
-    except:
-        return f"{y1}-{y2}"
-    if len(y2) == 2:
-        try:
-            tail = int(y2)
-        except:
-            return f"{y1}-{y2}"
-        b = a // 100 * 100 + tail
-        if b < a:
-            b += 100
-    else:
-        try:
-            b = int(y2)
-        except:
-            return f"{y1}-{y2}"
-    return f"{a}-{b}"
-
-MONTHS = {
-    "jan":"January","january":"January","feb":"February","february":"February","mar":"March","march":"March",
-    "apr":"April","april":"April","may":"May","jun":"June","june":"June","jul":"July","july":"July",
-    "aug":"August","august":"August","sep":"September","sept":"September","september":"September",
-    "oct":"October","october":"October","nov":"November","november":"November","dec":"December","december":"December",
-}
-
-def _fy_second_year(fy: str):
-    m = re.match(r"^\s*([12]\d{3})\s*-\s*([12]\d{3})\s*$", fy or "")
-    if not m:
-        return None
-    try:
-        return int(m.group(2))
-    except:
-        return None
+def _remember_content(request, cid: int):
+    # practice-flow state lives in the signed practice cookie (middleware.py),
+    # so course / portal page views never write the database session
+    if request.practice_session.get("last_content_id") != cid:
+        request.practice_session["last_content_id"] = cid
 
-def _expand_year(two_or_four: str, fallback_year: int | None):
-    try:
-        n = int(two_or_four)
-    except:
-        return fallback_year
-    if n >= 100:
-        return n
-    if fallback_year:
-        century = (fallback_year // 100) * 100
-        candidate = century + n
-        if candidate < fallback_year - 20:
-            candidate += 100
-        return candidate
-    return 2000 + n
-
-def _return_period_to_month_year(return_period: str, fy: str | None):
-    if not return_period:
-        return None, None
-    rp = return_period.strip()
-    m = re.match(r"^([A-Za-z]{3,12})(?:[ '\-]?(\d{2,4}))?$", rp)
-    if m:
-        mon = MONTHS.get(m.group(1).lower(), m.group(1).title())
-        year = None
-        if m.group(2):
-            year = _expand_year(m.group(2), _fy_second_year(fy) if fy else None)
-        else:
-            month_index = ["January","February","March","April","May","June","July","August","September","October","November","December"].index(mon)
-            if fy:
-                start_year = int(fy.split("-")[0])
-                year = start_year if month_index >= 3 else start_year + 1
-        return mon, year
-    return None, None
-
-def _compute_due_date_for_gstr1(month_name: str, year: int) -> date:
-    months = ["January","February","March","April","May","June","July","August","September","October","November","December"]
-    idx = months.index(month_name)
-    next_idx = (idx + 1) % 12
-    next_year = year + (1 if idx == 11 else 0)
-    return date(next_year, next_idx + 1, 11)
-
-def _compute_due_date_for_gstr3b(month_name: str, year: int) -> date:
-    months = ["January","February","March","April","May","June","July","August","September","October","November","December"]
-    idx = months.index(month_name)
-    next_idx = (idx + 1) % 12
-    next_year = year + (1 if idx == 11 else 0)
-    return date(next_year, next_idx + 1, 21)
-
-def parse_task_info_para(task_info: str):
-    meta = {"GSTIN": "", "FY": "", "ReturnPeriod": "", "TradeName": "", "LegalName": ""}
-    if not task_info:
-        return meta
-
-    text = _norm(task_info)
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    joined = "\n".join(lines)
-
-    # FIRST: legal name from beginning (handles "Mr. ...")
-    lead_name = _extract_legal_from_leading(joined)
-    if lead_name:
-        meta["LegalName"] = lead_name
-
-    for ln in lines:
-        m = re.search(rf"\bGSTIN\b\s*{_DASH}?\s*([0-9A-Z]{{15}})", ln, flags=re.I)
-        if m and not meta["GSTIN"]:
-            meta["GSTIN"] = m.group(1).upper(); continue
-        m = re.search(
-            rf"\b(FY|F\.?\s*Y\.?|F\s*Y|Fin(?:ancial)?\s*Y(?:r|ear)?)\b\s*{_DASH}?\s*\(?\s*([12]\d{{3}})\s*(?:[/\-]|\s+to\s+|\s+)([12]?\d{{2,4}})\)?",
-            ln, flags=re.I
-        )
-        if m and not meta["FY"]:
-            meta["FY"] = _normalize_fy(m.group(2), m.group(3)); continue
-        m = re.search(
-            rf"\b(Return\s*Period|Period|Month)\b\s*{_DASH}?\s*([A-Za-z]{{3,12}}(?:[ '\-]?\d{{2,4}})?|\d{{1,2}}[/\-]\d{{2,4}}|\d{{4}}[/\-]\d{{1,2}})",
-            ln, flags=re.I
-        )
-        if m and not meta["ReturnPeriod"]:
-            meta["ReturnPeriod"] = (m.group(2) or "").strip(" \t\r\n-:=•"); continue
-        m = re.search(rf"\bTrade\s*Name\b\s*{_DASH}?\s*(.+)$", ln, flags=re.I)
-        if m and not meta["TradeName"]:
-            meta["TradeName"] = (m.group(1) or "").strip(" \t\r\n-:=•"); continue
-        m = re.search(rf"\bLegal\s*Name\b\s*{_DASH}?\s*(.+)$", ln, flags=re.I)
-        if m and not meta["LegalName"]:
-            cand = (m.group(1) or "").strip()
-            if _looks_like_person(cand):
-                meta["LegalName"] = cand
-            continue
-
-    if not meta["GSTIN"]:
-        m = re.search(rf"\bGSTIN\b\s*{_DASH}?\s*([0-9A-Z]{{15}})", joined, flags=re.I)
-        if m: meta["GSTIN"] = m.group(1).upper()
-
-    if not meta["FY"]:
-        m = re.search(
-            rf"\b(FY|F\.?\s*Y\.?|F\s*Y|Fin(?:ancial)?\s*Y(?:r|ear)?)\b\s*{_DASH}?\s*\(?\s*([12]\d{{3}})\s*(?:[/\-]|\s+to\s+|\s+)([12]?\d{{2,4}})\)?",
-            joined, flags=re.I
-        )
-        if m: meta["FY"] = _normalize_fy(m.group(2), m.group(3))
-
-    if not meta["ReturnPeriod"]:
-        m = re.search(
-            rf"\bReturn\s*Period\b\s*{_DASH}?\s*([A-Za-z]{{3,12}}(?:[ '\-]?\d{{2,4}})?|\d{{1,2}}[/\-]\d{{2,4}}|\d{{4}}[/\-]\d{{1,2}})",
-            joined, flags=re.I
-        ) or re.search(
-            rf"\b(Period|Month)\b\s*{_DASH}?\s*([A-Za-z]{{3,12}}(?:[ '\-]?\d{{2,4}})?|\d{{1,2}}[/\-]\d{{2,4}}|\d{{4}}[/\-]\d{{1,2}})",
-            joined, flags=re.I
-        )
-        if m: meta["ReturnPeriod"] = (m.group(m.lastindex) or "").strip(" \t\r\n-:=•")
-
-    if not meta["LegalName"]:
-        m_owner = OWNER_PAT.search(joined)
-        if m_owner:
-            cand = (m_owner.group(1) or "").strip()
-            if _looks_like_person(cand): meta["LegalName"] = cand
-
-    if not meta["LegalName"]:
-        honor_pat = rf"\b{_HONORIFICS}\s+([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){{0,3}})"
-        m = re.search(honor_pat, joined, flags=re.I)
-        if m:
-            cand = (m.group(1) or "").strip()
-            if _looks_like_person(cand): meta["LegalName"] = cand
-
-    if not meta["LegalName"]:
-        m2 = re.search(
-            r"""(?ix)
-            ^\s*
-            (?!""" + _HONORIFICS + r"""\b)
-            ([A-Z][A-Za-z.'-]+(?:\s+[A-Z][A-Za-z.'-]+){0,3})
-            \s+(?:started|commenced|requested|has\s+requested|is|was|has|have|asked|authorised|authorized|applied)\b
-            """,
-            joined
-        )
-        if m2:
-            cand = (m2.group(1) or "").strip()
-            if not re.search(rf"\b{_COMPANY_SUFFIXES}\b", cand) and _looks_like_person(cand):
-                meta["LegalName"] = cand
-
-    if not meta["TradeName"]:
-        m = re.search(
-            rf"""(?ix)
-                \b(?:company|firm|business|shop)?\s*
-                (?:named|called|trading\s+as|doing\s+business\s+as|d[/]b[/]a)\s*
-                ["']?([A-Z][A-Za-z0-9& .'\-]{{1,100}})["']?
-            """,
-            joined
-        )
-        if m:
-            cand = _strip_quotes(_clean_company(m.group(1)))
-            if _looks_like_company(cand): meta["TradeName"] = cand
-
-    if not meta["TradeName"]:
-        m2 = re.search(
-            r"""(?ix)
-                ^\s*
-                (?!""" + _HONORIFICS + r"""\b)
-                ([A-Z][\w&.'-]+(?:\s+[A-Z][\w&.'-]+){0,6})
-                \s+(?:is|was|has|have|operates|operated|runs|owned|registered)\b
-            """,
-            joined
-        )
-        if m2:
-            cand = _clean_company(m2.group(1))
-            if _looks_like_company(cand): meta["TradeName"] = cand
-
-    mon, yr = _return_period_to_month_year(meta["ReturnPeriod"], meta["FY"])
-    if mon and yr:
-        meta["ReturnPeriod"] = f"{mon} {yr}"
-
-    # uppercase Trade Name
-    if meta["TradeName"]:
-        meta["TradeName"] = meta["TradeName"].upper()
-
-    return meta
-
-def _format_date_ind(d: date) -> str:
-    return d.strftime("%d %b %Y")
+def _task_meta(content_id: int) -> TaskMeta:
+    """
+    Stored TaskMeta row for a task (content number in the GST task course).
+    Rows saved before the table existed are built (and persisted) on first
+    access.
+    """
+    pk = content1_ids.pk_for(content_id)
+    if pk is None:
+        raise Http404("No Content matches the given query.")
+    tm = TaskMeta.objects.select_related("content").filter(content_id=pk).first()
+    if tm is None:
+        obj = get_object_or_404(Content.objects.select_related("topic"), pk=pk)
+        tm = TaskMeta.refresh(obj)
+    return tm
+
+async def _atask_meta(content_id: int) -> TaskMeta:
+    """_task_meta() for async views."""
+    await content1_ids.aids()
+    pk = content1_ids.pk_for(content_id)
+    if pk is None:
+        raise Http404("No Content matches the given query.")
+    tm = await TaskMeta.objects.select_related("content").filter(content_id=pk).afirst()
+    if tm is None:
+        obj = await Content.objects.select_related("topic").filter(pk=pk).afirst()
+        if obj is None:
+            raise Http404("No Content matches the given query.")
+        tm = await sync_to_async(TaskMeta.refresh)(obj)
+    return tm
 
 # ************ DEFAULT LEGAL NAME (UPPERCASE) ************
 _LEGAL_NAME_DEFAULT = "AKHIL VASUDEV"
 
-def _legal_name_for_task(content_id: int) -> str:
-    obj = get_object_or_404(CourseContent1.objects.select_related("topic"), pk=content_id)
-    meta = parse_task_info_para(obj.task_info or "")
-    legal = (meta.get("LegalName") or "").strip()
-    return legal if legal else _LEGAL_NAME_DEFAULT
+def _load_task(request, content_id=None) -> TaskMeta:
+    """
+    Per-request task loader shared by the GST views: resolves the task id,
+    fetches its TaskMeta row and keeps it on the request, so every helper
+    in the same request reuses one lookup.
+    """
+    tm = getattr(request, "_task_meta", None)
+    if tm is None:
+        cid = _resolve_task_id(request, content_id)
+        tm = request._task_meta = _task_meta(cid)
+    return tm
+
+async def _aload_task(request, content_id=None) -> TaskMeta:
+    """_load_task() for async views."""
+    tm = getattr(request, "_task_meta", None)
+    if tm is None:
+        await content1_ids.aids()   # _resolve_task_id then only bisects
+        # a database-backed practice session (ICMS_PRACTICE_COOKIE=0) may not load synchronously here
+        remembered = await request.practice_session.aget("last_content_id")
+        cid = _resolve_task_id(request, content_id, remembered)
+        tm = request._task_meta = await _atask_meta(cid)
+    return tm
+
+async def _aload_task_by_pk(request, pk: int) -> TaskMeta:
+    """Like _aload_task, but 404s instead of falling back to another task."""
+    tm = getattr(request, "_task_meta", None)
+    if tm is None or tm.content.number != pk:
+        tm = request._task_meta = await _atask_meta(pk)
+    return tm
+
+def _task_etag(tm: TaskMeta) -> str:
+    # TaskMeta is rebuilt (and updated_at moves) whenever the task or its topic is saved
+    return f"task-{tm.content.number}-{tm.updated_at.timestamp():.6f}"
+
+def _task_json(request, tm: TaskMeta, payload) -> JsonResponse:
+    """
+    JSON for a task with its ETag, or a 304 when If-None-Match matches.
+    Done here rather than with @condition, which calls its etag function
+    synchronously and so cannot query from an async view.
+    """
+    etag = quote_etag(_task_etag(tm))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(payload(tm))
+    response.headers.setdefault("ETag", etag)
+    return response
 
 # -------------------- Auth & Dashboards --------------------
 
+# log stays sync: its cost is the PBKDF2 check (CPU-bound, ~0.4 s) and the
+# session / messages writes, none of which an event loop would overlap
 def log(request):
     if request.method == 'POST':
         login_type = request.POST.get('loginType')
@@ -498,36 +189,37 @@ def log(request):
             messages.error(request, "Invalid admin credentials")
 
         elif login_type == 'institute':
-            try:
-                institute = Institution.objects.get(email=email, password=password)
+            institute = authenticate_institution(email, password)
+            if institute is not None:
                 request.session['user_type'] = 'institute'
                 request.session['institution_id'] = institute.id
                 request.session['institution_name'] = institute.name
                 request.session['email'] = email
                 return redirect('institutedashboard')
-            except Institution.DoesNotExist:
-                messages.error(request, "Invalid institution credentials")
+            messages.error(request, "Invalid institution credentials")
 
         elif login_type == 'student':
-            try:
-                student = Student.objects.get(email=email, password=password)
+            student = authenticate_student(email, password)
+            if student is not None:
                 request.session['user_type'] = 'student'
+                request.session['student_pk'] = student.pk
                 request.session['email'] = student.email
                 request.session['student_name'] = student.name
-                request.session['institution_name'] = student.institution.name
+                request.session['institution_name'] = student.institution_name
                 return redirect('studentdashboard')
-            except Student.DoesNotExist:
-                messages.error(request, "Invalid student credentials")
+            messages.error(request, "Invalid student credentials")
 
     return render(request, 'log.html')
 
+# stored passwords are hashes, so lists show a fixed-width mask
+MASKED_PASSWORD = '*' * 8
+
 def admindashboard(request):
     if request.session.get('user_type') != 'admin':
         return redirect('log')
-    institutions = Institution.objects.all()
+    # the figures are fetched from admin_stats_api
     return render(request, 'admindashboard.html', {
         'admin_name': request.session.get('admin_name'),
-        'institutions': institutions
     })
 
 def get_logged_in_institution(request):
@@ -548,20 +240,18 @@ def institutedashboard(request):
         student_id = request.POST.get('student_id')
         student_password = request.POST.get('password')
 
-        if Student.objects.filter(email=student_email, institution=institution).exists():
-            messages.error(request, "Email already exists.")
-        elif Student.objects.filter(student_id=student_id, institution=institution).exists():
-            messages.error(request, "Student ID already exists.")
-        elif Student.objects.filter(institution=institution).count() >= institution.student_limit:
-            messages.error(request, "Student limit reached.")
-        else:
-            Student.objects.create(
-                institution=institution,
+        try:
+            institution.enrol(
                 name=student_name,
                 email=student_email,
                 student_id=student_id,
-                password=student_password
+                password=make_password(student_password)
             )
+        except StudentLimitReached:
+            messages.error(request, "Student limit reached.")
+        except StudentConflict as e:
+            messages.error(request, "Email already exists." if e.field == 'email' else "Student ID already exists.")
+        else:
             messages.success(request, "Student added successfully.")
             return redirect('institutedashboard')
 
@@ -583,13 +273,14 @@ def studentdashboard(request):
 
 def student_list(request):
     institution = get_logged_in_institution(request)
-    students_queryset = Student.objects.filter(institution=institution).order_by('id')
-    paginator = Paginator(students_queryset, 8)
-    page_number = request.GET.get('page')
-    students_page = paginator.get_page(page_number)
+    students_queryset = Student.objects.filter(institution=institution)
+    q = request.GET.get('q', '').strip()
+    if q:
+        students_queryset = students_queryset.filter(prefix_filter(('name', 'email'), q))
+    students_page = keyset_page(students_queryset, request.GET, 8)
     for student in students_page:
-        student.masked_password = '*' * len(student.password)
-    return render(request, 'student_list.html', {'students': students_page})
+        student.masked_password = MASKED_PASSWORD
+    return render(request, 'student_list.html', {'students': students_page, 'q': q})
 
 def student_add(request, pk=None):
     institution = get_logged_in_institution(request)
@@ -601,36 +292,36 @@ def student_add(request, pk=None):
         student_id = request.POST.get('student_id')
         password = request.POST.get('password')
 
-        email_qs = Student.objects.filter(email=email, institution=institution)
-        if student:
-            email_qs = email_qs.exclude(pk=student.pk)
-
-        id_qs = Student.objects.filter(student_id=student_id, institution=institution)
+        conflict_messages = {
+            'email': "Email already exists in this institution.",
+            'student_id': "Student ID already exists in this institution.",
+        }
         if student:
-            id_qs = id_qs.exclude(pk=student.pk)
-
-        if email_qs.exists():
-            messages.error(request, "Email already exists in this institution.")
-        elif id_qs.exists():
-            messages.error(request, "Student ID already exists in this institution.")
-        elif not student and Student.objects.filter(institution=institution).count() >= institution.student_limit:
-            messages.error(request, "Student limit reached.")
-        else:
-            if student:
+            conflict = institution.student_conflict(email, student_id, exclude_pk=student.pk)
+            if conflict:
+                messages.error(request, conflict_messages[conflict])
+            else:
                 student.name = name
                 student.email = email
                 student.student_id = student_id
-                student.password = password
+                if password:
+                    student.set_password(password)
                 student.save()
                 messages.success(request, "Student updated successfully.")
-            else:
-                Student.objects.create(
-                    institution=institution,
+                return redirect('student_list')
+        else:
+            try:
+                institution.enrol(
                     name=name, email=email,
-                    student_id=student_id, password=password
+                    student_id=student_id, password=make_password(password)
                 )
+            except StudentLimitReached:
+                messages.error(request, "Student limit reached.")
+            except StudentConflict as e:
+                messages.error(request, conflict_messages[e.field])
+            else:
                 messages.success(request, "Student added successfully.")
-            return redirect('student_list')
+                return redirect('student_list')
 
     return render(request, 'student_form.html', {'student': student})
 
@@ -641,10 +332,47 @@ def edit_password(request, pk):
     new_password = (request.POST.get('password') or '').strip()
     if not new_password:
         return JsonResponse({'success': False, 'error': 'Password cannot be empty.'}, status=400)
-    student.password = new_password
-    student.save()
+    student.set_password(new_password)
+    student.save(update_fields=['password'])
     return JsonResponse({'success': True})
 
+@require_POST
+def student_import(request):
+    if request.session.get('user_type') != 'institute':
+        return JsonResponse({'success': False, 'error': 'Login required.'}, status=403)
+    institution = get_logged_in_institution(request)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'Choose a CSV or XLSX file.'}, status=400)
+    try:
+        report = import_students(institution, read_rows(upload.file, upload.name))
+    except ImportFormatError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **report.as_dict()})
+
+@require_POST
+def practice_import(request):
+    """
+    Upload TRN cases (kind=cases) or practice portal logins (kind=accounts)
+    as CSV / XLSX. The site admin loads shared rows; an institution loads
+    its own.
+    """
+    user_type = request.session.get('user_type')
+    if user_type not in ('admin', 'institute'):
+        return JsonResponse({'success': False, 'error': 'Login required.'}, status=403)
+    institution = get_logged_in_institution(request) if user_type == 'institute' else None
+    if request.POST.get('kind') not in PRACTICE_IMPORTERS:
+        return JsonResponse({'success': False, 'error': 'kind must be cases or accounts.'}, status=400)
+    columns, importer = PRACTICE_IMPORTERS[request.POST['kind']]
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'Choose a CSV or XLSX file.'}, status=400)
+    try:
+        report = importer(read_rows(upload.file, upload.name, columns), institution=institution)
+    except ImportFormatError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **report.as_dict()})
+
 def student_delete(request, pk):
     institution = get_logged_in_institution(request)
     student = get_object_or_404(Student, pk=pk, institution=institution)
@@ -655,16 +383,14 @@ def student_delete(request, pk):
 # -------------------- Institution CRUD --------------------
 
 def institution_list(request):
-    institutions = Institution.objects.all().order_by('-id')
-    for inst in institutions:
-        # distinct check to prevent error if password is empty
-        pwd_len = len(inst.password) if inst.password else 0
-        inst.masked_password = '*' * pwd_len
-        
-    paginator = Paginator(institutions, 8)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    return render(request, 'institution_list.html', {'page_obj': page_obj})
+    institutions = Institution.objects.all()
+    q = request.GET.get('q', '').strip()
+    if q:
+        institutions = institutions.filter(prefix_filter(('name', 'email'), q))
+    page_obj = keyset_page(institutions, request.GET, 8, descending=True)
+    for inst in page_obj:
+        inst.masked_password = MASKED_PASSWORD if inst.password else ''
+    return render(request, 'institution_list.html', {'page_obj': page_obj, 'q': q})
 
 def add_institution(request):
     if request.method == 'POST':
@@ -688,7 +414,7 @@ def add_institution(request):
 
             # FIX: Use objects.create
             Institution.objects.create(
-                name=name, email=email, password=password,
+                name=name, email=email, password=make_password(password),
                 student_limit=student_limit, validity=validity_date
             )
             messages.success(request, "Institution added successfully.")
@@ -722,7 +448,7 @@ def edit_institution(request, pk):
             institution.student_limit = int(student_limit)
             institution.validity = validity_date
             if password:
-                institution.password = password
+                institution.set_password(password)
             institution.save()
             messages.success(request, "Institution updated successfully.")
             return redirect('institution_list')
@@ -739,9 +465,14 @@ def delete_institution(request, pk):
         messages.success(request, "Institution deleted successfully.")
     return redirect('institution_list')
 
-def institution_count(request):
-    count = Institution.objects.count()
-    return JsonResponse({'count': count})
+async def institution_count(request):
+    return JsonResponse({'count': (await aadmin_stats())['institution_count']})
+
+@require_GET
+def admin_stats_api(request):
+    if request.session.get('user_type') != 'admin':
+        return JsonResponse({'error': 'Admin login required.'}, status=403)
+    return JsonResponse(admin_stats())
 
 def user_logout(request):
     logout(request)
@@ -752,21 +483,18 @@ def goodsandservicetax(request):
 
 # -------------------- Courses --------------------
 
+def course_page(request, slug, topic_id=None):
+    """
+    Overview / topic page of any course; topic_id is the topic's per-course
+    number. Renders the course's own template.
+    """
+    nav = course_nav(slug).page(topic_id)
+    if nav is None:
+        raise Http404("No Topic matches the given query.")
+    return render(request, nav['course'].template, nav)
+
 def course_overview(request):
-    topics = CourseTopic.objects.order_by('order')
-    selected_topic = topics.first()
-    content = CourseContent.objects.filter(topic=selected_topic).first()
-    previous_topic = next_topic = None
-    if selected_topic:
-        arr = list(topics)
-        i = arr.index(selected_topic)
-        previous_topic = arr[i - 1] if i > 0 else None
-        next_topic = arr[i + 1] if i < len(arr) - 1 else None
-
-    return render(request, 'course_overview.html', {
-        'topics': topics, 'selected_topic': selected_topic, 'content': content,
-        'previous_topic': previous_topic, 'next_topic': next_topic
-    })
+    return course_page(request, 'gst-registration')
 
 def course_topic_detail(request, topic_id):
     if request.session.get('user_type') != 'student':
@@ -782,83 +510,22 @@ def course_topic_detail(request, topic_id):
         messages.error(request, "No student matches the given session.")
         return redirect('log')
 
-    selected_topic = get_object_or_404(CourseTopic, id=topic_id)
-    content = CourseContent.objects.filter(topic=selected_topic).first()
-    topics = CourseTopic.objects.all().order_by('order')
-
-    return render(request, 'course_overview.html', {
-        'selected_topic': selected_topic, 'content': content, 'topics': topics,
-    })
+    return course_page(request, 'gst-registration', topic_id)
 
 def gov(request):
     return render(request, 'gov.html')
 
 def course_overview1(request):
-    topics = list(CourseTopic1.objects.order_by('order'))
-    selected_topic = topics[0] if topics else None
-    content = CourseContent1.objects.filter(topic=selected_topic).first() if selected_topic else None
-    previous_topic = next_topic = None
-    if selected_topic:
-        i = topics.index(selected_topic)
-        previous_topic = topics[i - 1] if i > 0 else None
-        next_topic = topics[i + 1] if i < len(topics) - 1 else None
-
-    return render(request, 'course_overview1.html', {
-        'topics': topics, 'selected_topic': selected_topic, 'content': content,
-        'previous_topic': previous_topic, 'next_topic': next_topic,
-    })
+    return course_page(request, GST_TASK_COURSE)
 
 def course_topic_detail1(request, topic_id):
-    topics = list(CourseTopic1.objects.order_by('order'))
-    selected_topic = get_object_or_404(CourseTopic1, pk=topic_id)
-    content = CourseContent1.objects.filter(topic=selected_topic).first()
-    previous_topic = next_topic = None
-    if selected_topic in topics:
-        i = topics.index(selected_topic)
-        previous_topic = topics[i - 1] if i > 0 else None
-        next_topic = topics[i + 1] if i < len(topics) - 1 else None
-
-    return render(request, 'course_overview1.html', {
-        'topics': topics, 'selected_topic': selected_topic, 'content': content,
-        'previous_topic': previous_topic, 'next_topic': next_topic,
-    })
+    return course_page(request, GST_TASK_COURSE, topic_id)
 
 def gov1(request):
     return render(request, 'gov1.html')
 
 # -------------------- Registration & TRN --------------------
 
-STATES_DISTRICTS = {
-    'Andhra Pradesh':['Anantapur', 'Chittoor' , 'East Godavari' , 'Krishna' , 'kurnool' , 'Nellore' , 'Prakasam' , 'Srikakulam' , 'Viskhapattanam' , 'Vizianagaram' , 'West Godavari' , 'YSR Kadapa'] ,
-    'Arunachal Pradesh':['Tawng' ,'West Kameng' ,' East Kameng' , 'Papum Pare' ,'Kurung Kumey','Kra Daadi' , 'Lower Subansiri', 'Upper Subansiri' , 'West Siang' , 'East Siang' , 'Siang' , 'Upper Sing' , 'Lower Sing' ,'Dibing Valley' , 'Anjaw' , 'Lohit' ,'Namasai', 'Changlang' , 'Tirap' , 'Longding' ],
-    'Assam':['Baksa' , 'Barpeta' , 'Biswanath' , 'Bongaigaon' , 'Cachar' , 'Charaideo' , 'Chirang' , 'Darrang' , 'Dhemaji' , 'Dhubri' , 'Dibrugarh' , 'Dima Hasao (formerly North Cachar Hills)' , 'Goalpara' , 'Golaghat' , 'Hailakandi' , 'Hojai' , 'Jorhat' , 'Kamrup' , 'Kamrup Metropolitan' , 'Karbi Anglong' , 'Karimganj' , 'Kokrajhar' , 'Lakhimpur' , 'Majuli ' , 'Morigaon' , 'Nagaon' , 'Nalbari' , 'Sivasagar' , 'onitpur' , 'South Salmara-Mankachar' , 'Tinsukia' , 'Udalguri' , 'West Karbi Anglong' , 'Tamulpur' , 'Bajali'],
-    'Bihar':['Patna' , 'Nalanda' , 'Bhojpur' , 'Buxar' , 'Rohtas' , 'Muzaffarpur' , 'Vaishali' , 'Sitamarhi' , 'Sheohar' , 'East Champaran (Motihari)' , 'West Champaran (Bettiah)' , 'Darbhanga' , 'Madhubani' , 'Samastipur' , 'Saharsa' , 'Supaul' , 'Madhepura' , 'Purnia' , 'Araria' , 'Kishanganj' , 'Katihar' ,'Bhagalpur' , 'anka' , 'Munger' , 'Jamui' , 'Lakhisarai' , 'Sheikhpura' , 'GayaNawada' , 'Aurangabad' ,'Jehanabad', 'Arwal', 'Saran (Chhapra)', 'Siwan' , 'Gopalganj'],
-    'Chhattisgarh':['Balod','Baloda Bazar','Balrampur','Bastar','Bemetara','Bijapur','Bilaspur','Dantewada (South Bastar)','Dhamtari','Durg','Gariaband','Gaurela-Pendra-Marwahi','Janjgir-Champa','Jashpur','Kabirdham (Kawardha)','Kanker (North Bastar)','Kondagaon','Korba','Koriya','Mahasamund','Mungeli','Narayanpur','Raigarh','Raipur','Rajnandgaon','Sukma','Surajpur','Surguja','Sarangarh-Bilaigarh','Khairagarh-Chhuikhadan-Gandai','Manendragarh-Chirmiri-Bharatpur','Mohla-Manpur-Ambagarh Chowki'],
-    'Goa':['North Goa','South Goa'],
-    'Gujarat':['Ahmedabad','Amreli','Anand','Aravalli','Banaskantha (Palanpur)','Bharuch','Bhavnagar','Botad','Chhota Udaipur', 'Dahod','Dang (Ahwa)','Devbhoomi Dwarka','Gandhinagar','Gir Somnath', 'Jamnagar','Junagadh','Kheda (Nadiad)','Kutch (Bhuj)','Mahisagar','Mehsana','Morbi','Narmada (Rajpipla)','Navsari','Panchmahal (Godhra)','Patan','Porbandar','Rajkot','Sabarkantha (Himmatnagar)','Surat','Surendranagar','Tapi (Vyara)','Vadodara','Valsad'],	
-    'Haryana':['Ambala','Bhiwani','Charkhi Dadri','Faridabad','Fatehabad','Gurugram','Hisar','Jhajjar','Jind','Kaithal','Karnal','Kurukshetra','Mahendragarh','Nuh','Palwal','Panchkula','Panipat','Rewari','Rohtak','Sirsa','Sonipat','Yamunanagar'],	
-    'Himachal Pradesh':['Bilaspur','Chamba','Hamirpur','Kangra','Kinnaur','Kullu','Lahaul and Spiti','Mandi','Shimla','Sirmaur','Solan','Una'],	
-    'Jharkhand':['Bokaro','Chatra','Deoghar','Dhanbad', 'Dumka','East Singhbhum','Garhwa','Giridih','Godda','Gumla','Hazaribagh','Jamtara','Khunti','Koderma','Latehar','Lohardaga', 'Pakur','Palamu','Ramgarh','Ranchi','Sahebganj','Seraikela Kharsawan','Simdega','West Singhbhum'],
-    'Karnataka': [ 'Bagalkot','Ballari','Belagavi','Bengaluru Rural','Bengaluru Urban','Bidar','Chamarajanagar','Chikballapur','Chikkamagaluru','Chitradurga','Dakshina Kannada','Davanagere','Dharwad','Gadag', 'Hassan','Haveri','Kalaburagi','Kodagu','Kolar','Koppal','Mandya','Mysuru','Raichur','Ramanagara','Shivamogga','Tumakuru', 'Udupi','Uttara Kannada','Vijayapura','Yadgir','Vijayanagara'],
-    'Kerala': ['Alappuzha','Ernakulam','Idukki','Kannur','Kasaragod','Kollam','Kottayam','Kozhikode','Malappuram','Palakkad','Pathanamthitta','Thiruvananthapuram','Thrissur','Wayanad'],
-    'Madhya Pradesh':['Agar Malwa','Alirajpur','Anuppur','Ashoknagar','Balaghat','Barwani','Betul','Bhind','Bhopal','Burhanpur','Chhatarpur','Chhindwara','Damoh','Datia','Dewas','Dhar','Dindori','Guna','Gwalior','Harda','Hoshangabad','Indore','Jabalpur','Jhabua','Katni','Khandwa','Khargone','Mandla','Mandsaur','Morena','Narsinghpur','Neemuch','Niwari','Panna','Raisen','Rajgarh','Ratlam','Rewa','Sagar','Satna','Sehore','Seoni','Shahdol','Shajapur','Sheopur','Shivpuri','Sidhi','Singrauli','Tikamgarh','Ujjain','Umaria','Vidisha'],
-    'Maharashtra': ['Ahmednagar','Akola','Amravati','Aurangabad','Beed','Bhandara','Buldhana','Chandrapur','Dhule','Gadchiroli','Gondia','Hingoli','Jalgaon','Jalna','Kolhapur','Latur','Mumbai City','Mumbai Suburban','Nagpur','Nanded','Nandurbar','Nashik','Osmanabad','Palghar','Parbhani','Pune','Raigad','Ratnagiri','Sangli','Satara','Sindhudurg','Solapur','Thane','Wardha','Washim','Yavatmal'],
-    'Manipur':['Bishnupur','Chandel','Churachandpur','Imphal East','Imphal West', 'Jiribam','Kakching','Kamjong','Kangpokpi','Noney', 'Pherzawl', 'Senapati','Tamenglong','Tengnoupal','Thoubal','Ukhrul'],	
-    'Meghalaya':['East Garo Hills','East Jaintia Hills','East Khasi Hills','North Garo Hills','Ri Bhoi','South Garo Hills','South West Garo Hills','South West Khasi Hills','West Garo Hills','West Jaintia Hills','West Khasi Hills','South West Khasi Hills'],
-    'Mizoram':['Aizawl','Champhai','Kolasib', 'Lawngtlai','Lunglei', 'Mamit','Saiha','Serchhip','Hnahthial','Saitual','Khawzawl'],	
-    'Nagaland':[ 'Dimapur','Kiphire','Kohima','Longleng','Mokokchung','Mon','Peren','Phek','Tuensang','Wokha', 'Zunheboto','Noklak'],	
-    'Odisha':['Angul','Balangir','Balasore','Bargarh','Bhadrak','Boudh','Cuttack','Deogarh','Dhenkanal','Gajapati','Ganjam', 'Jagatsinghpur', 'Jajpur', 'Jharsuguda', 'Kalahandi','Kandhamal','Kendrapara', 'Kendujhar (Keonjhar)','Khordha','Koraput','Malkangiri', 'Mayurbhanj', 'Nabarangpur',  'Nayagarh', 'Nuapada', 'Puri','Rayagada', 'Sambalpur', 'Sonepur','Sundergarh'],	
-    'Punjab':['Amritsar','Barnala', 'Bathinda','Faridkot', 'Fatehgarh Sahib', 'Fazilka', 'Ferozepur', 'Gurdaspur','Hoshiarpur',  'Jalandhar', 'Kapurthala', 'Ludhiana','Mansa','Moga','Muktsar','Nawanshahr (Shahid Bhagat Singh Nagar)','Pathankot','Patiala','Rupnagar','Sangrur','SAS Nagar (Mohali)','Tarn Taran'],	
-    'Rajasthan':['Ajmer', 'Alwar', 'Banswara', 'Baran', 'Barmer', 'Bharatpur', 'Bhilwara', 'Bikaner', 'Bundi', 'Chittorgarh', 'Churu', 'Dausa', 'Dholpur','Dungarpur','Hanumangarh','Jaipur','Jaisalmer','Jalore','Jhalawar','Jhunjhunu','Jodhpur', 'Karauli','Kota','Nagaur','Pali','Pratapgarh','Rajsamand','Sawai Madhopur', 'Sikar','Sirohi','Tonk','Udaipur'],
-    'Sikkim':['East Sikkim','North Sikkim','South Sikkim','West Sikkim'],	
-    'Tamil Nadu':['Ariyalur','Chennai','Coimbatore', 'Cuddalore', 'Dharmapuri', 'Dindigul', 'Erode', 'Kanchipuram', 'Kanyakumari', 'Karur',  'Krishnagiri',  'Madurai', 'Nagapattinam', 'Namakkal', 'Perambalur', 'Pudukkottai','Ramanathapuram', 'Salem',  'Sivaganga',  'Tenkasi', 'Thanjavur','The Nilgiris', 'Theni',  'Thoothukudi (Tuticorin)', 'Tiruchirappalli', 'Tirunelveli','Tirupur','Tiruvallur', 'Tiruvannamalai','Tiruvarur','Vellore', 'Viluppuram','Virudhunagar'],	
-    'Telangana':['Adilabad','Bhadradri Kothagudem','Hyderabad','Jagtial','Jangaon','Jayashankar Bhoopalpally','Jogulamba Gadwal','Kamareddy','Karimnagar','Khammam','Komaram Bheem Asifabad','Mahabubabad','Mahbubnagar','Mancherial','Medak', 'Medchal-Malkajgiri', 'Mulugu','Nagarkurnool', 'Nalgonda','Narayanpet', 'Nirmal', 'Nizamabad','Peddapalli','Rajanna Sircilla', 'Rangareddy','Sangareddy','Siddipet','Suryapet','Vikarabad','Wanaparthy','Warangal Rural','Warangal Urban','Yadadri Bhuvanagiri'],
-    'Tripura':['Dhalai', 'Gomati','Khowai', 'North Tripura', 'Sepahijala', 'South Tripura','Unakoti','West Tripura'],	
-    'Uttar Pradesh':[ 'Agra','Aligarh','Ambedkar Nagar','Amethi','Amroha','Auraiya','Ayodhya','Azamgarh','Baghpat','Bahraich','Ballia','Balrampur','Banda','Barabanki','Bareilly','Basti','Bhadohi','Bijnor','Budaun','Bulandshahr','Chandauli','Chitrakoot','Deoria','Etah','Etawah','Farrukhabad','Fatehpur','Firozabad','Gautam Buddha Nagar','Ghaziabad', 'Ghazipur', 'Gonda', 'Gorakhpur','Hamirpur','Hapur','Hardoi','Hathras','Jalaun','Jaunpur','Jhansi','Kannauj','Kanpur Dehat','Kanpur Nagar','Kasganj','Kaushambi','Kushinagar','Lakhimpur Kheri','Lalitpur','Lucknow','Maharajganj', 'Mahoba','Mainpuri','Mathura','Mau','Meerut','Mirzapur', 'Moradabad','Muzaffarnagar','Pilibhit','Pratapgarh','Raebareli', 'Rampur', 'Saharanpur', 'Sambhal','Sant Kabir Nagar','Shahjahanpur', 'Shamli', 'Shravasti','Siddharthnagar', 'Sitapur', 'Sonbhadra', 'Sultanpur', 'Unnao','Varanasi'],	
-    'Uttarakhand':['Almora','Bageshwar','Chamoli','Champawat','Dehradun', 'Haridwar','Nainital','Pauri Garhwal', 'Pithoragarh','Rudraprayag','Tehri Garhwal','Udham Singh Nagar','Uttarkashi'],	
-    'West Bengal':[ 'Alipurduar', 'Bankura', 'Birbhum','Cooch Behar','Dakshin Dinajpur', 'Darjeeling', 'Hooghly','Howrah','Jalpaiguri', 'Jhargram', 'Kalimpong', 'Kolkata', 'Malda', 'Murshidabad', 'Nadia', 'North 24 Parganas','Paschim Bardhaman','Paschim Medinipur','Purba Bardhaman','Purba Medinipur', 'Purulia',  'South 24 Parganas','Uttar Dinajpur'],
-}
-
 USER_TYPES = [
     'Taxpayer',
     'Tax Deductor',
@@ -871,88 +538,16 @@ USER_TYPES = [
     'Non-Resident Online Services Provider',
 ]
 
-# Test credentials for validation
-ALLOWED_TEST_CREDENTIALS = [
-    {
-        'user_type': 'Taxpayer',
-        'state': 'Maharashtra',
-        'district': 'Mumbai City',
-        'business_name': 'Jagadish Traders',
-        'pan_number': 'VJYCJ0054M',
-        'email': 'jagadishl1974@icommail.com',
-        'mobile': '2206197454'
-    },
-    {
-        'user_type': 'Taxpayer',
-        'state': 'Maharashtra',
-        'district': 'Thane',
-        'business_name': 'Vishwa Bhai Agencies',
-        'pan_number': 'VISCV0055M',
-        'email': 'vishwaramadorai@icommail.com',
-        'mobile': '2901199955'
-    },
-    {
-        'user_type': 'Taxpayer',
-        'state': 'Tamil Nadu',
-        'district': 'Chennai',
-        'business_name': 'Vijay Associates',
-        'pan_number': 'VJYAV0027M',
-        'email': 'vijayvishwa@icommail.com',
-        'mobile': '2000102627'
-    },
-    {
-        'user_type': 'Taxpayer',
-        'state': 'Tamil Nadu',
-        'district': 'Coimbatore',
-        'business_name': 'Saravana Agencies',
-        'pan_number': 'VELAV0038M',
-        'email': 'saravana@icommail.com',
-        'mobile': '2004170438'
-    },
-    {
-        'user_type': 'Taxpayer',
-        'state': 'Karnataka',
-        'district': 'Bengaluru Urban',
-        'business_name': 'Das Electricals',
-        'pan_number': 'LDSTL0067M',
-        'email': 'leodas@icommail.com',
-        'mobile': '2023191067'
-    }
-]
-
-
 def validate_test_credentials(form_data):
     """
-    Validate form data against allowed test credentials
+    Validate form data against the allowed test credentials (practice.py)
     Returns (is_valid, error_message)
     """
     if not form_data:
         return False, "No form data received"
-
-    for i, allowed_credential in enumerate(ALLOWED_TEST_CREDENTIALS):
-        user_type_match = form_data.get('user_type') == allowed_credential.get('user_type')
-        state_match = form_data.get('state') == allowed_credential.get('state')
-        district_match = form_data.get('district') == allowed_credential.get('district')
-        business_name_match = form_data.get('business_name') == allowed_credential.get('business_name')
-        pan_match = form_data.get('pan_number') == allowed_credential.get('pan_number')
-        email_match = form_data.get('email') == allowed_credential.get('email')
-        mobile_match = form_data.get('mobile') == allowed_credential.get('mobile')
-
-        if (user_type_match and state_match and district_match and
-            business_name_match and pan_match and email_match and mobile_match):
-            return True, ""
-
-    error_message = "Registration Error: Only test credentials are allowed. Please use one of the following valid combinations:"
-    for i, credential in enumerate(ALLOWED_TEST_CREDENTIALS):
-        error_message += f"\n\n{i+1}. User Type: {credential.get('user_type', 'N/A')}"
-        error_message += f"\n   State: {credential.get('state', 'N/A')}"
-        error_message += f"\n   District: {credential.get('district', 'N/A')}"
-        error_message += f"\n   Business Name: {credential.get('business_name', 'N/A')}"
-        error_message += f"\n   PAN: {credential.get('pan_number', 'N/A')}"
-        error_message += f"\n   Email: {credential.get('email', 'N/A')}"
-        error_message += f"\n   Mobile: {credential.get('mobile', 'N/A')}"
-
-    return False, error_message
+    if test_credentials.matches(form_data):
+        return True, ""
+    return False, test_credentials.help_message
 
 def registration_step1(request):
     """Handle the first step of registration"""
@@ -966,13 +561,15 @@ def registration_step1(request):
             'email': request.POST.get('email'),
             'mobile': request.POST.get('mobile'),
         }
+        _canonical_place(form_data)
 
         is_valid, error_message = validate_test_credentials(form_data)
 
         if not is_valid:
             messages.error(request, error_message)
             context = {
-                'states_districts': STATES_DISTRICTS,
+                'states': STATES,
+                'districts_url': _districts_url(),
                 'user_types': USER_TYPES,
                 'form_data': form_data,
             }
@@ -984,7 +581,8 @@ def registration_step1(request):
         return redirect('registration_step2')
 
     context = {
-        'states_districts': STATES_DISTRICTS,
+        'states': STATES,
+        'districts_url': _districts_url(),
         'user_types': USER_TYPES,
     }
     return render(request, 'step1.html', context)
@@ -1024,18 +622,79 @@ def registration_step2(request):
 
     return render(request, 'step2.html')
 
+def _districts_url():
+    """The fingerprinted static map if it has been built, else the versioned endpoint."""
+    if asset_built():
+        return static(DISTRICTS_ASSET)
+    return f"{reverse('get_districts')}?v={DISTRICTS_VERSION}"
+
+# a ?v= URL names one version of the map, so it can be cached for good
+_DISTRICTS_MAX_AGE = 60 * 60 * 24 * 365
+_DISTRICTS_UNVERSIONED_MAX_AGE = 60 * 60
+
 @csrf_exempt
-def get_districts(request):
-    """AJAX endpoint to get districts based on selected state"""
+async def get_districts(request):
+    """
+    GET: the whole state -> districts map (precompressed when the client
+    accepts gzip), or {'districts': [...]} for ?state=. Cacheable, with
+    an ETag. POST {"state": ...} is still answered for older pages.
+    """
     if request.method == 'POST':
         data = json.loads(request.body)
         state = data.get('state')
         districts = STATES_DISTRICTS.get(state, [])
         return JsonResponse({'districts': districts})
-    return JsonResponse({'districts': []})
+    if request.method not in ('GET', 'HEAD'):
+        return JsonResponse({'districts': []})
+
+    etag = f'"{DISTRICTS_VERSION}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if 'state' in request.GET:
+            response = JsonResponse({'districts': STATES_DISTRICTS.get(request.GET['state'], [])})
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(DISTRICTS_GZIP, content_type='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(DISTRICTS_JSON, content_type='application/json')
+    response.headers['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if request.GET.get('v') == DISTRICTS_VERSION:
+        patch_cache_control(response, public=True, max_age=_DISTRICTS_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=_DISTRICTS_UNVERSIONED_MAX_AGE)
+    return response
+
+def _canonical_place(data: dict) -> dict:
+    """State / district as entered -> canonical names, in place (unknown names are kept)."""
+    if data.get('state'):
+        data['state'] = location_index.state(data['state']) or data['state']
+    if data.get('district'):
+        data['district'] = location_index.district(data['district'], data.get('state')) or data['district']
+    return data
+
+_LOCATION_LIMIT = 25
+
+@require_GET
+@cache_control(public=True, max_age=_DISTRICTS_UNVERSIONED_MAX_AGE)
+def location_search(request):
+    """
+    Autocomplete: /api/locations/?q=beng[&kind=state|district][&state=...][&limit=10]
+    -> {'results': [{'name', 'state', 'kind'}, ...]} with canonical names.
+    """
+    kind = request.GET.get('kind', 'district')
+    if kind not in ('state', 'district'):
+        return JsonResponse({'error': 'kind must be state or district.'}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), _LOCATION_LIMIT)
+    except ValueError:
+        limit = 10
+    results = location_index.search(request.GET.get('q', ''), kind=kind,
+                                    state=request.GET.get('state'), limit=limit)
+    return JsonResponse({'results': results})
 
 @csrf_exempt
-def resend_otp(request):
+async def resend_otp(request):
     """AJAX endpoint to resend OTP"""
     if request.method == 'POST':
         data = json.loads(request.body)
@@ -1044,10 +703,10 @@ def resend_otp(request):
         new_otp = '123456'
 
         if otp_type == 'mobile':
-            request.session['mobile_otp'] = new_otp
+            await request.session.aset('mobile_otp', new_otp)
             return JsonResponse({'success': True, 'message': 'Mobile OTP resent successfully', 'otp': new_otp})
         elif otp_type == 'email':
-            request.session['email_otp'] = new_otp
+            await request.session.aset('email_otp', new_otp)
             return JsonResponse({'success': True, 'message': 'Email OTP resent successfully', 'otp': new_otp})
 
     return JsonResponse({'success': False, 'message': 'Failed to resend OTP'})
@@ -1058,31 +717,6 @@ def registration_success(request):
 
 # -------------------- TRN / OTP / Dashboards --------------------
 
-VALID_TRNS = ["172200059541TRN"]
-CAPTCHA_CODE = "519741"
-
-def trn_page(request):
-    if request.method == "POST":
-        trn = (request.POST.get("trn") or "").strip()
-        captcha = (request.POST.get("captcha") or "").strip().lower()
-        if trn in VALID_TRNS:
-            if captcha == CAPTCHA_CODE.lower():
-                request.session['trn'] = trn
-                return redirect('verify_otp')
-            messages.error(request, "Invalid CAPTCHA. Please try again.")
-        else:
-            messages.error(request, "Invalid TRN. Please enter a valid Temporary Reference Number.")
-    return render(request, 'trn_login.html')
-
-def verify_otp(request):
-    if request.method == 'POST':
-        otp_entered = request.POST.get('otp')
-        if otp_entered == '123456':
-            messages.success(request, 'OTP verified successfully!')
-            return redirect('gst_ledger_dashboard')
-        messages.error(request, 'Invalid OTP. Please try again.')
-    return render(request, 'verify_otp.html')
-
 def otp_success(request):
     return render(request, 'otp_success.html')
 
@@ -1095,17 +729,10 @@ def NIL_Return_Filinglog(request):
             messages.error(request, 'Invalid CAPTCHA. Please try again.')
             return render(request, 'NIL_Return_Filinglog.html')
 
-        LOGIN_MAP = {
-            'JNINFOTECH@09': ('Icom@001', 2),
-            'VIJAY@51': ('Vjy@051', 3),
-            'EPLANET': ('Eplanet@20', 4),
-            'GAUTHAM11': ('Gautham@51', 5),
-            'NOVARO53': ('Novaro@35', 6),
-        }
-        entry = LOGIN_MAP.get(username.upper())
-        if entry:
-            expected_pwd, content_id = entry
-            if password == expected_pwd and CourseContent1.objects.filter(pk=content_id).exists():
+        account = practice_registry.account(PracticeAccount.PORTAL_TASK, username)
+        if account:
+            content_id = account.content_number
+            if password == account.password and content_id in content1_ids:
                 return redirect('trn_dashboard_with_id', content_id=content_id)
 
         messages.error(request, 'Invalid login credentials.')
@@ -1114,10 +741,10 @@ def NIL_Return_Filinglog(request):
     return render(request, 'NIL_Return_Filinglog.html')
 
 def trn_dashboard(request, content_id=None):
-    cid = _resolve_task_id(request, content_id)
-    request.session["last_content_id"] = cid
-    request.session.modified = True
-    company = _trade_name_for_task(cid)  # already UPPERCASE
+    tm = _load_task(request, content_id)
+    cid = tm.content.number
+    _remember_content(request, cid)
+    company = tm.trade_name  # already UPPERCASE
     return render(request, "trn_dashboard.html", {
         "content_id": cid,
         "company": company,
@@ -1125,11 +752,11 @@ def trn_dashboard(request, content_id=None):
     })
 
 def gst_ledger_dashboard(request, content_id=None):
-    cid = _resolve_task_id(request, content_id)
-    request.session["last_content_id"] = cid
-    request.session.modified = True
+    tm = _load_task(request, content_id)
+    cid = tm.content.number
+    _remember_content(request, cid)
 
-    company = _trade_name_for_task(cid)  # UPPERCASE
+    company = tm.trade_name  # UPPERCASE
     expected = f"/gst_ledger_dashboard/{cid}/"
     if request.path != expected:
         return redirect(expected)
@@ -1141,25 +768,19 @@ def gst_ledger_dashboard(request, content_id=None):
     })
 
 def file_returns(request, content_id=None):
-    cid = _resolve_task_id(request, content_id)
-    request.session["last_content_id"] = cid
-    request.session.modified = True
-
-    obj = get_object_or_404(CourseContent1, pk=cid)
-    meta = parse_task_info_para(obj.task_info or "")
+    tm = _load_task(request, content_id)
+    cid = tm.content.number
+    _remember_content(request, cid)
 
-    legal_name = _legal_name_for_task(cid)
-    trade_name = _trade_name_for_task(cid)  # UPPERCASE
+    legal_name = tm.legal_name or _LEGAL_NAME_DEFAULT
+    trade_name = tm.trade_name  # UPPERCASE
     company = trade_name
 
-    mon, yr = _return_period_to_month_year(meta.get("ReturnPeriod"), meta.get("FY"))
     gstr1_due_pretty = ""
     gstr3b_due_pretty = ""
-    if mon and yr:
-        g1d = _compute_due_date_for_gstr1(mon, yr)
-        g3d = _compute_due_date_for_gstr3b(mon, yr)
-        gstr1_due_pretty = f"Due Date - {_format_date_ind(g1d)}"
-        gstr3b_due_pretty = f"Due Date - {_format_date_ind(g3d)}"
+    if tm.gstr1_due_date and tm.gstr3b_due_date:
+        gstr1_due_pretty = f"Due Date - {_format_date_ind(tm.gstr1_due_date)}"
+        gstr3b_due_pretty = f"Due Date - {_format_date_ind(tm.gstr3b_due_date)}"
 
     expected = f"/file-returns/{cid}/"
     if request.path != expected:
@@ -1170,220 +791,130 @@ def file_returns(request, content_id=None):
         "company": company,
         "welcome_title": f"Welcome {company} to GST Common Portal",
         "legal_name": legal_name,
-        "gstin": meta.get("GSTIN") or "",
+        "gstin": tm.gstin,
         "trade_name": trade_name,   # UPPERCASE
-        "fy": meta.get("FY") or "",
-        "return_period": meta.get("ReturnPeriod") or "",
+        "fy": tm.fy,
+        "return_period": tm.return_period,
         "gstr1_due": gstr1_due_pretty,
         "gstr3b_due": gstr3b_due_pretty,
     })
 
-@require_GET
-def course_content_basic(request, pk: int):
-    obj = get_object_or_404(CourseContent1.objects.select_related("topic"), pk=pk)
-    company = _trade_name_for_task(obj.pk)  # UPPERCASE
-    return JsonResponse({
-        "id": obj.pk,
+def _basic_payload(tm: TaskMeta) -> dict:
+    company = tm.trade_name  # UPPERCASE
+    return {
+        "id": tm.content.number,
         "company": company,
         "welcome_title": f"Welcome {company} to GST Common Portal",
-    })
+    }
+
+@require_GET
+@cache_control(max_age=0, must_revalidate=True)
+async def course_content_basic(request, pk: int):
+    tm = await _aload_task_by_pk(request, pk)
+    return _task_json(request, tm, _basic_payload)
 
 # -------------------- GSTR-1 page + JSON --------------------
 
 def gstr1_summary(request, content_id=None):
-    cid = _resolve_task_id(request, content_id)
-    request.session["last_content_id"] = cid
-    request.session.modified = True
+    tm = _load_task(request, content_id)
+    cid = tm.content.number
+    _remember_content(request, cid)
 
-    obj = get_object_or_404(CourseContent1, pk=cid)
-    meta = parse_task_info_para(obj.task_info or "")
-
-    legal_name = _legal_name_for_task(cid)
-    trade_name = _trade_name_for_task(cid)  # UPPERCASE
+    legal_name = tm.legal_name or _LEGAL_NAME_DEFAULT
+    trade_name = tm.trade_name  # UPPERCASE
     company = trade_name
 
-    mon, yr = _return_period_to_month_year(meta.get("ReturnPeriod"), meta.get("FY"))
     due_pretty = ""
-    if mon and yr:
-        due_pretty = _format_date_ind(_compute_due_date_for_gstr1(mon, yr))
+    if tm.gstr1_due_date:
+        due_pretty = _format_date_ind(tm.gstr1_due_date)
 
     return render(request, 'gstr1_summary.html', {
         "content_id": cid,
         "company": company,
         "welcome_title": f"Welcome {company} to GST Common Portal",
-        "gstin": meta.get("GSTIN") or "",
+        "gstin": tm.gstin,
         "trade_name": trade_name,   # UPPERCASE
         "legal_name": legal_name,
-        "fy": meta.get("FY") or "",
-        "return_period": meta.get("ReturnPeriod") or "",
+        "fy": tm.fy,
+        "return_period": tm.return_period,
         "due_date": due_pretty,
     })
 
-def gstr1_task_meta(request, content_id=None):
-    cid = _resolve_task_id(request, content_id)
-    obj = get_object_or_404(CourseContent1, pk=cid)
-    meta = parse_task_info_para(obj.task_info or "")
-
-    mon, yr = _return_period_to_month_year(meta.get("ReturnPeriod"), meta.get("FY"))
-    due_iso = ""
-    due_pretty = ""
-    if mon and yr:
-        d = _compute_due_date_for_gstr1(mon, yr)
-        due_iso = d.isoformat()
-        due_pretty = _format_date_ind(d)
+def _due_pair(d):
+    return (d.isoformat(), _format_date_ind(d)) if d else ("", "")
 
-    payload = {
-        "id": obj.id,
+def _task_meta_payload(tm: TaskMeta) -> dict:
+    due_iso, due_pretty = _due_pair(tm.gstr1_due_date)
+    return {
+        "id": tm.content.number,
         "meta": {
-            "GSTIN": meta.get("GSTIN") or "",
-            "FY": meta.get("FY") or "",
-            "ReturnPeriod": meta.get("ReturnPeriod") or "",
-            "TradeName": _trade_name_for_task(cid),   # UPPERCASE
-            "LegalName": _legal_name_for_task(cid),   # falls back to AKHIL VASUDEV
+            "GSTIN": tm.gstin,
+            "FY": tm.fy,
+            "ReturnPeriod": tm.return_period,
+            "TradeName": tm.trade_name,   # UPPERCASE
+            "LegalName": tm.legal_name or _LEGAL_NAME_DEFAULT,   # falls back to AKHIL VASUDEV
             "DueDateISO": due_iso,
             "DueDatePretty": due_pretty,
         }
     }
-    return JsonResponse(payload)
-
 
+@require_GET
+@cache_control(max_age=0, must_revalidate=True)
+async def gstr1_task_meta(request, content_id=None):
+    tm = await _aload_task(request, content_id)
+    return _task_json(request, tm, _task_meta_payload)
 
+_TASK_META_BATCH_LIMIT = 200
 
-from django.shortcuts import render, redirect
-from django.contrib import messages
-from django.urls import reverse
-
-# ==== Hardcoded valid TRNs & mapping to question/content ids ====
-VALID_TRNS = [
-    "201600059591TRN",
-    "181020170061TRN",
-    "640000130164TRN",
-    "221020140057TRN",
-    "081120070046TRN",
-]
-
-# Map TRN → Question ID (already in your file)
-TRN_TO_QID = {
-    "201600059591TRN": 9,   # Case 1: Vijay Kumar
-    "181020170061TRN": 10,  # Case 2: Vetrimaaran
-    "640000130164TRN": 11,  # Case 3: John Durairaj
-    "221020140057TRN": 12,  # Case 4: Jeevanandham
-    "081120070046TRN": 13,  # Case 5: Guru Prasad
-}
-
-# ---------- CASE MASTER DATA (for auto-prefill on Business page) ----------
-CASE_DATA = {
-    9: {   # Vijay Kumar – Kumar Enterprise, Noida
-        "legal_name": "Kumar Enterprise",
-        "pan": "VJYXV0059M",
-        "state": "Uttar Pradesh",
-        "district": "Gautam Buddha Nagar",
-        "reason_default": "Voluntary Basis",
-        "commencement_date": "08-12-2021",
-    },
-    10: {  # Vetrimaaran – Vetri Enterprise, Noida
-        "legal_name": "Vetri Enterprise",
-        "pan": "VTMXV0061M",
-        "state": "Uttar Pradesh",
-        "district": "Gautam Buddha Nagar",
-        "reason_default": "Voluntary Basis",
-        "commencement_date": "11-10-2021",
-    },
-    11: {  # John Durairaj – Durairaj and Sons, Bengaluru
-        "legal_name": "Durairaj and Sons",
-        "pan": "VJYXD0064M",
-        "state": "Karnataka",
-        "district": "Bengaluru",
-        "reason_default": "Voluntary Basis",
-        "commencement_date": "13-01-2021",
-    },
-    12: {  # Jeevanandham – Jeeva Enterprise, Chennai
-        "legal_name": "Jeeva Enterprise",
-        "pan": "VJYXJ0057M",
-        "state": "Tamil Nadu",
-        "district": "Chennai",
-        "reason_default": "Voluntary Basis",
-        "commencement_date": "02-08-2021",
-    },
-    13: {  # Guru Prasad – ATM Enterprises, Howrah
-        "legal_name": "ATM Enterprises",
-        "pan": "GRUXG0046M",
-        "state": "West Bengal",
-        "district": "Howrah",
-        "reason_default": "Voluntary Basis",
-        "commencement_date": "08-11-2022",
-    },
-}
-
-
-# Simple demo CAPTCHA + OTP
-CAPTCHA_CODE = "519741"
-DEMO_OTP = "123456"
-
-def trn_page(request):
+@require_GET
+def tasks_meta_batch(request):
     """
-    TRN login page: validates TRN + CAPTCHA,
-    stores TRN + inferred question_id in session, then goes to verify_otp?qid=<id>.
-    Also respects optional ?qid= or ?content_id= coming into this view.
+    /api/returns/tasks/meta/?ids=2,3,4 -> JSON array of task meta (same shape
+    as gstr1_task_meta plus GSTR-3B due dates), in the order requested.
+    Unknown ids are skipped.
     """
-    # Allow optional qid/content_id to flow into hidden field (fallback if needed)
-    qid_from_query = request.GET.get("qid") or request.GET.get("content_id")
-
-    if request.method == "POST":
-        trn = (request.POST.get("trn") or "").strip()
-        captcha = (request.POST.get("captcha") or "").strip().lower()
-        qid_hidden = (request.POST.get("qid") or "").strip()  # hidden field
-
-        if trn in VALID_TRNS:
-            if captcha == CAPTCHA_CODE.lower():
-                # Prefer mapping from TRN → question id
-                question_id = TRN_TO_QID.get(trn)
-                # If for any reason mapping isn't present, fallback to hidden value
-                if not question_id and qid_hidden.isdigit():
-                    question_id = int(qid_hidden)
-
-                if not question_id:
-                    messages.error(request, "Could not determine the related question. Please try again.")
-                    return render(request, "trn_login.html", {"qid": qid_from_query})
-
-                # Persist in session for later steps
-                request.session["trn"] = trn
-                request.session["question_id"] = question_id
-
-                # Go to OTP with qid as query param (also usable without session)
-                otp_url = f"{reverse('verify_otp')}?qid={question_id}"
-                return redirect(otp_url)
-            else:
-                messages.error(request, "Invalid CAPTCHA. Please try again.")
-        else:
-            messages.error(request, "Invalid TRN. Please enter a valid Temporary Reference Number.")
-
-    return render(request, "trn_login.html", {"qid": qid_from_query})
-
+    ids = {}   # insertion-ordered, so duplicates are dropped in O(1)
+    for part in (request.GET.get("ids") or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        # plain ASCII digits only: int() would also take '٣', '1_0', '+3' and '-2'
+        if not (part.isascii() and part.isdigit()):
+            return JsonResponse({"error": f"Invalid id: {part}"}, status=400)
+        ids[int(part)] = None
+        if len(ids) > _TASK_META_BATCH_LIMIT:
+            return JsonResponse({"error": f"At most {_TASK_META_BATCH_LIMIT} ids per request."}, status=400)
+
+    contents = {
+        c.number: c for c in Content.objects.select_related("topic", "task_meta")
+        .filter(course__slug=GST_TASK_COURSE, number__in=list(ids))
+    }
 
-def verify_otp(request):
-    """
-    Very simple OTP step:
-    - GET: show form
-    - POST: check OTP, then redirect to trn_dashboard/<qid> 
-    """
-    # Prefer query param, fallback to session
-    qid_param = request.GET.get("qid") or request.POST.get("qid")
-    if not qid_param:
-        qid_param = str(request.session.get("question_id") or "")
+    def rows():
+        yield "["
+        first = True
+        for cid in ids:
+            obj = contents.get(cid)
+            if obj is None:
+                continue
+            try:
+                tm = obj.task_meta
+            except TaskMeta.DoesNotExist:
+                tm = TaskMeta.refresh(obj)
+            item = _task_meta_payload(tm)
+            item["meta"]["GSTR3BDueDateISO"], item["meta"]["GSTR3BDueDatePretty"] = _due_pair(tm.gstr3b_due_date)
+            yield ("" if first else ",") + json.dumps(item)
+            first = False
+        yield "]"
 
-    if request.method == "POST":
-        otp = (request.POST.get("otp") or "").strip()
-        if otp == DEMO_OTP and qid_param.isdigit():
-            # On success, redirect with the content_id
-            return redirect("trn_dashboard_with_id", content_id=int(qid_param))
-        else:
-            messages.error(request, "Invalid OTP. Please try again.")
+    return StreamingHttpResponse(rows(), content_type="application/json")
 
-    return render(request, "verify_otp.html", {"qid": qid_param, "demo_otp": DEMO_OTP})
 
 
 
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.urls import reverse
 
 def gst_dashboard(request):
     creation_date = datetime.now().date()
@@ -1405,52 +936,8 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 
-# ===================== TRN CONFIG =====================
-
-VALID_TRNS = [
-    "201600059591TRN",
-    "181020170061TRN",
-    "640000130164TRN",
-    "221020140057TRN",
-    "081120070046TRN",
-]
-
-# Map TRN → Question ID (1..5 or whatever you want)
-TRN_TO_QID = {
-    "201600059591TRN": 9,   # Vijay Kumar
-    "181020170061TRN": 10,
-    "640000130164TRN": 11,
-    "221020140057TRN": 12,
-    "081120070046TRN": 13,
-}
-
-CAPTCHA_CODE = "519741"
-DEMO_OTP = "123456"
-
 # ===================== WIZARD HELPERS =====================
 
-def _wizard_session_key(qid: int) -> str:
-    return f"reg_wizard_{qid}"
-
-def _wizard_get(request, qid: int) -> dict:
-    data = request.session.get(_wizard_session_key(qid), {})
-    data.setdefault("business", {})
-    data.setdefault("proprietor", {})
-    data.setdefault("authorized_signatory", {})
-    data.setdefault("authorized_rep", {})
-    data.setdefault("biz_address", {})
-    return data
-
-def _wizard_store(request, qid: int, patch: dict):
-    data = _wizard_get(request, qid)
-    for key, val in patch.items():
-        if isinstance(val, dict):
-            data[key].update(val)
-        else:
-            data[key] = val
-    request.session[_wizard_session_key(qid)] = data
-    request.session.modified = True
-
 def _nav_urls(qid: int):
     """For now all tabs point to Business step until you create others."""
     business_url = reverse("step_business_details", args=[qid])
@@ -1467,61 +954,6 @@ def _nav_urls(qid: int):
         "verify": business_url,
     }
 
-# ===================== TRN LOGIN & OTP =====================
-
-def trn_page(request):
-    """
-    TRN login: checks TRN + CAPTCHA, then sends user to OTP page with qid.
-    """
-    qid_from_query = request.GET.get("qid") or request.GET.get("content_id")
-
-    if request.method == "POST":
-        trn = (request.POST.get("trn") or "").strip()
-        captcha = (request.POST.get("captcha") or "").strip().lower()
-        qid_hidden = (request.POST.get("qid") or "").strip()
-
-        if trn in VALID_TRNS:
-            if captcha == CAPTCHA_CODE.lower():
-                question_id = TRN_TO_QID.get(trn)
-                if not question_id and qid_hidden.isdigit():
-                    question_id = int(qid_hidden)
-
-                if not question_id:
-                    messages.error(request, "Could not determine related question for this TRN.")
-                    return render(request, "trn_login.html", {"qid": qid_from_query})
-
-                request.session["trn"] = trn
-                request.session["question_id"] = question_id
-
-                otp_url = f"{reverse('verify_otp')}?qid={question_id}"
-                return redirect(otp_url)
-            else:
-                messages.error(request, "Invalid CAPTCHA. Please try again.")
-        else:
-            messages.error(request, "Invalid TRN. Please enter a valid Temporary Reference Number.")
-
-    return render(request, "trn_login.html", {"qid": qid_from_query})
-
-
-def verify_otp(request):
-    """
-    OTP page: after success, go directly to Step 1 (Business Details)
-    """
-    qid_param = request.GET.get("qid") or request.POST.get("qid")
-    if not qid_param:
-        qid_param = str(request.session.get("question_id") or "")
-
-    if request.method == "POST":
-        otp = (request.POST.get("otp") or "").strip()
-        if otp == DEMO_OTP and qid_param.isdigit():
-            return redirect("step_business_details", qid=int(qid_param))
-        else:
-            messages.error(request, "Invalid OTP. Please try again.")
-
-    return render(request, "verify_otp.html", {
-        "qid": qid_param,
-    })
-
 # ===================== STEP 1: BUSINESS DETAILS =====================
 
 def step_business_details(request, qid: int):
@@ -1676,7 +1108,7 @@ def step_principal_place(request, qid: int):
     """
     Step 5 – Principal Place of Business
     Captures full address + nature of premises + business activities at this place.
-    Data is stored in session via _wizard_store.
+    Data is stored via _wizard_store.
     """
     app = _wizard_get(request, qid)
     existing = app.get("principal_place", {})
@@ -2037,67 +1469,26 @@ from datetime import date, timedelta
 
 # ===================== TRN CONFIG =====================
 
-VALID_TRNS = [
-    "201600059591TRN",
-    "181020170061TRN",
-    "640000130164TRN",
-    "221020140057TRN",
-    "081120070046TRN",
-]
-
-# Map TRN → Question ID (1..5 or whatever you want)
-TRN_TO_QID = {
-    "201600059591TRN": 9,   # Vijay Kumar
-    "181020170061TRN": 10,
-    "640000130164TRN": 11,
-    "221020140057TRN": 12,
-    "081120070046TRN": 13,
-}
+# TRNs, their question ids and case data are TrnCase rows (practice.py)
 
 CAPTCHA_CODE = "519741"
 DEMO_OTP = "123456"
 
 # ===================== WIZARD HELPERS =====================
 
-def _wizard_session_key(qid: int) -> str:
-    return f"reg_wizard_{qid}"
-
 def _wizard_get(request, qid: int) -> dict:
     """
-    Returns the wizard data dict for this qid, always with default
-    sub-dicts present.
+    The wizard data dict for this qid (see wizard.py), always with every
+    section present. Loaded once per request.
     """
-    data = request.session.get(_wizard_session_key(qid), {})
-    data.setdefault("business", {})
-    data.setdefault("promoter", {})
-    data.setdefault("authorized_signatory", {})
-    data.setdefault("authorized_representative", {})
-    data.setdefault("principal_place", {})
-    data.setdefault("additional_places", [])
-    data.setdefault("goods_services", [])
-    data.setdefault("state_specific", {})
-    data.setdefault("aadhaar", {})
-    data.setdefault("verification", {})
-    request.session[_wizard_session_key(qid)] = data
-    request.session.modified = True
-    return data
+    return wizard.load(request, qid, _session_student_pk(request)).app
 
 def _wizard_store(request, qid: int, patch: dict):
     """
-    Merge patch into wizard data for this qid (dicts are updated, simple
-    values are overwritten).
+    Merge patch into the wizard data for this qid (dicts are updated, simple
+    values are overwritten) and save the sections it names.
     """
-    data = _wizard_get(request, qid)
-    for key, val in patch.items():
-        if isinstance(val, dict):
-            # ensure sub-dict exists
-            if key not in data or not isinstance(data[key], dict):
-                data[key] = {}
-            data[key].update(val)
-        else:
-            data[key] = val
-    request.session[_wizard_session_key(qid)] = data
-    request.session.modified = True
+    wizard.store(request, qid, patch, _session_student_pk(request))
 
 def _nav_urls(qid: int):
     """
@@ -2122,34 +1513,12 @@ def _header_context(request, qid: int, active_step: str) -> dict:
     - Checks 'is_completed' flag to color icons Blue.
     - Sets 'active' class for the current step.
     """
-    app = _wizard_get(request, qid)
-    
-    # The strict order of your pages
-    step_order = ["business", "promoter", "signatory", "rep", "ppob", "apob", "goods", "state", "aadhaar", "verify"]
-    
-    completed_flags = {}
-
-    # Check if each step has been marked as completed in the session
-    completed_flags["business"] = app.get("business", {}).get("is_completed", False)
-    completed_flags["promoter"] = app.get("promoter", {}).get("is_completed", False)
-    completed_flags["signatory"] = app.get("authorized_signatory", {}).get("is_completed", False)
-    completed_flags["rep"] = app.get("authorized_representative", {}).get("is_completed", False)
-    completed_flags["ppob"] = app.get("principal_place", {}).get("is_completed", False)
-    # For list pages, we check if they are marked complete OR if there is data
-    completed_flags["apob"] = bool(app.get("additional_places")) or app.get("apob_completed", False)
-    completed_flags["goods"] = bool(app.get("goods_services")) or app.get("goods_completed", False)
-    completed_flags["state"] = app.get("state_specific", {}).get("is_completed", False)
-    completed_flags["aadhaar"] = app.get("aadhaar", {}).get("is_completed", False)
-    completed_flags["verify"] = app.get("verification", {}).get("is_completed", False)
-
-    # Calculate Percentage (10% per step)
-    completed_count = sum(1 for v in completed_flags.values() if v)
-    profile_percent = completed_count * 10
-    if profile_percent > 100: profile_percent = 100
+    state = wizard.load(request, qid, _session_student_pk(request))
+    completed_flags = wizard.step_completion(state.app)
 
     # Assign CSS classes: 'active', 'completed', or 'pending'
     step_status = {}
-    for key in step_order:
+    for key in wizard.STEP_ORDER:
         if key == active_step:
             step_status[key] = "active"       # Blue Outline
         elif completed_flags.get(key):
@@ -2157,12 +1526,15 @@ def _header_context(request, qid: int, active_step: str) -> dict:
         else:
             step_status[key] = "pending"      # Grey
 
+    reg = state.registration
     today_date = date.today()
+    due_date = reg.due_date if reg and reg.due_date else today_date + timedelta(days=wizard.DUE_DAYS)
+    last_modified = reg.last_modified if reg and reg.last_modified else today_date
     return {
         "application_type": "New Registration",
-        "due_date": (today_date + timedelta(days=15)).strftime("%d/%m/%Y"),
-        "last_modified": today_date.strftime("%d/%m/%Y"),
-        "profile_percent": profile_percent,
+        "due_date": due_date.strftime("%d/%m/%Y"),
+        "last_modified": last_modified.strftime("%d/%m/%Y"),
+        "profile_percent": wizard.profile_percent(state.app),
         "step_status": step_status,
         "nav": _nav_urls(qid),
     }
@@ -2179,9 +1551,10 @@ def trn_page(request):
         captcha = (request.POST.get("captcha") or "").strip().lower()
         qid_hidden = (request.POST.get("qid") or "").strip()
 
-        if trn in VALID_TRNS:
+        case = practice_registry.trn_case(trn)
+        if case is not None:
             if captcha == CAPTCHA_CODE.lower():
-                question_id = TRN_TO_QID.get(trn)
+                question_id = case.qid
                 if not question_id and qid_hidden.isdigit():
                     question_id = int(qid_hidden)
 
@@ -2189,8 +1562,8 @@ def trn_page(request):
                     messages.error(request, "Could not determine related question for this TRN.")
                     return render(request, "trn_login.html", {"qid": qid_from_query})
 
-                request.session["trn"] = trn
-                request.session["question_id"] = question_id
+                request.practice_session["trn"] = trn
+                request.practice_session["question_id"] = question_id
 
                 otp_url = f"{reverse('verify_otp')}?qid={question_id}"
                 return redirect(otp_url)
@@ -2208,7 +1581,7 @@ def verify_otp(request):
     """
     qid_param = request.GET.get("qid") or request.POST.get("qid")
     if not qid_param:
-        qid_param = str(request.session.get("question_id") or "")
+        qid_param = str(request.practice_session.get("question_id") or "")
 
     if request.method == "POST":
         otp = (request.POST.get("otp") or "").strip()
@@ -2230,12 +1603,12 @@ from django.contrib import messages
 from django.shortcuts import render, redirect
 
 # assumes you already have:
-# CASE_DATA, _wizard_get, _wizard_store, _header_context
+# _wizard_get, _wizard_store, _header_context
 
 # 1. BUSINESS DETAILS
 def step_business_details(request, qid: int):
     app = _wizard_get(request, qid)
-    case_info = CASE_DATA.get(qid, {})
+    case_info = practice_registry.case_prefill(qid)
 
     if request.method == "POST":
         biz_block = {
@@ -2321,7 +1694,7 @@ def step_authorized_representative(request, qid: int):
 def step_principal_place(request, qid: int):
     app = _wizard_get(request, qid)
     if request.method == "POST":
-        data = request.POST.dict()
+        data = _canonical_place(request.POST.dict())
         data['business_activities'] = request.POST.getlist("business_activities")
         data['is_completed'] = True
         _wizard_store(request, qid, { "principal_place": data })
@@ -2481,29 +1854,21 @@ def step_verification(request, qid: int):
 
 from django.shortcuts import render, get_object_or_404
 # Make sure you import your model and helper functions
-# from .models import CourseContent1 
-# from .utils import _resolve_task_id, parse_task_info_para, _legal_name_for_task
+# from .models import Content 
+# from .utils import _load_task, _LEGAL_NAME_DEFAULT
 
 def file_gstr1(request, content_id=None):
-    # 1. Get the Task ID (e.g., 3)
-    cid = _resolve_task_id(request, content_id)
-    
-    # 2. Fetch the specific Question/Task from Database
-    obj = get_object_or_404(CourseContent1, pk=cid)
-    
-    # 3. Extract the data (FY: 2022-2023, Period: December, etc.)
-    meta = parse_task_info_para(obj.task_info or "")
-    
-    # 4. Get Legal Name
-    legal_name = _legal_name_for_task(cid)
+    # 1. Resolve + load the Task (e.g., 3) with its extracted data
+    #    (FY: 2022-2023, Period: December, etc.)
+    tm = _load_task(request, content_id)
 
-    # 5. Send this data to the template
+    # 2. Send this data to the template
     context = {
-        "content_id": cid,
-        "gstin": meta.get("GSTIN") or "33BACXM3031K1Z5", # Fallback if missing
-        "fy": meta.get("FY") or "2025-2026",
-        "period": meta.get("ReturnPeriod") or "June",
-        "legal_name": legal_name,
+        "content_id": tm.content.number,
+        "gstin": tm.gstin or "33BACXM3031K1Z5", # Fallback if missing
+        "fy": tm.fy or "2025-2026",
+        "period": tm.return_period or "June",
+        "legal_name": tm.legal_name or _LEGAL_NAME_DEFAULT,
     }
 
     return render(request, 'gstr1_file.html', context)
@@ -2519,22 +1884,19 @@ def _capitalize_period(p):
     return p[0].upper() + p[1:].lower()
 
 def gstr3b_return(request, content_id=None):
-    # 1. Resolve Task ID
-    cid = _resolve_task_id(request, content_id)
-    obj = get_object_or_404(CourseContent1, pk=cid)
-    
-    # 2. Get Basic Info from DB
-    meta_db = parse_task_info_para(obj.task_info or "")
-    legal_name = _legal_name_for_task(cid)
+    # 1. Resolve + load Task, 2. Basic Info from DB
+    tm = _load_task(request, content_id)
+    cid = tm.content.number
+    legal_name = tm.legal_name or _LEGAL_NAME_DEFAULT
     
     # 3. DETERMINE FY, PERIOD, DUE DATE
     # Priority: URL Params (User Selection) > Database (Task Info)
     
     # Financial Year
-    fy = request.GET.get('fy') or meta_db.get("FY") or ""
+    fy = request.GET.get('fy') or tm.fy
     
     # Return Period (e.g., "October")
-    raw_period = request.GET.get('period') or meta_db.get("ReturnPeriod") or ""
+    raw_period = request.GET.get('period') or tm.return_period
     return_period = _capitalize_period(raw_period)
 
     # Due Date logic
@@ -2561,14 +1923,22 @@ def gstr3b_return(request, content_id=None):
 
     context = {
         "content_id": cid,
-        "gstin": meta_db.get("GSTIN") or "",
+        "gstin": tm.gstin,
         "legal_name": legal_name,
-        "trade_name": _trade_name_for_task(cid),
+        "trade_name": tm.trade_name,
         "status": "Not Filed",
         "fy": fy,
         "return_period": return_period,
         "due_date": due_date_str,
     }
+    # totals are keyed like the invoices that feed them (gstinvoiceform sends
+    # no supplier GSTIN); NEXT hands the filing page the same _invoice_scope input
+    scope = {k: v for k, v in (("gstin", request.GET.get("gstin")), ("fy", fy), ("period", return_period)) if v}
+    context["next_url"] = f"{reverse('file_gstr3b')}?{urlencode(scope)}"
+    student_pk = _session_student_pk(request)
+    if student_pk is not None:
+        gstin, _fy, period = _invoice_scope(scope)
+        context["table_3_1"] = gstr3b_table_3_1(student_pk, gstin, period)
 
     return render(request, 'gstr3b_return.html', context)
 
@@ -2580,60 +1950,25 @@ def file_gstr3b_view(request):
     # You can pass context context here if you need dynamic data
     # (e.g., fetching the Authorised Signatory name from the database)
     context = {
-        'gstin': '33BACXM3031K1Z5',
+        'gstin': request.GET.get('gstin') or '33BACXM3031K1Z5',
         'signatory_name': 'Akhil Vasudev'
     }
+    student_pk = _session_student_pk(request)
+    if student_pk is not None:
+        gstin, _fy, period = _invoice_scope(request.GET)
+        if period:
+            context['table_3_1'] = gstr3b_table_3_1(student_pk, gstin, period)
     return render(request, 'gstr3b_filing.html', context)
 
 
 
 
 def course_overview2(request):
-    topics = list(CourseTopic2.objects.order_by('order'))
-    selected_topic = topics[0] if topics else None
-    content = CourseContent2.objects.filter(topic=selected_topic).first() if selected_topic else None
-
-    previous_topic = None
-    next_topic = None
-
-    if selected_topic:
-        current_index = topics.index(selected_topic)
-        if current_index > 0:
-            previous_topic = topics[current_index - 1]
-        if current_index < len(topics) - 1:
-            next_topic = topics[current_index + 1]
-
-    return render(request, 'course_overview2.html', {
-        'topics': topics,
-        'selected_topic': selected_topic,
-        'content': content,
-        'previous_topic': previous_topic,
-        'next_topic': next_topic,
-    })
+    return course_page(request, 'gstr1-filing')
 
 
 def course_topic_detail2(request, topic_id):
-    topics = list(CourseTopic2.objects.order_by('order'))
-    selected_topic = get_object_or_404(CourseTopic2, pk=topic_id)
-    content = CourseContent2.objects.filter(topic=selected_topic).first()
-
-    previous_topic = None
-    next_topic = None
-
-    if selected_topic in topics:
-        current_index = topics.index(selected_topic)
-        if current_index > 0:
-            previous_topic = topics[current_index - 1]
-        if current_index < len(topics) - 1:
-            next_topic = topics[current_index + 1]
-
-    return render(request, 'course_overview2.html', {
-        'topics': topics,
-        'selected_topic': selected_topic,
-        'content': content,
-        'previous_topic': previous_topic,
-        'next_topic': next_topic,
-    })
+    return course_page(request, 'gstr1-filing', topic_id)
 
 
 def gov2(request):
@@ -2644,34 +1979,6 @@ def gov2(request):
 
 def NIL_Return_Filinglog1(request, content_id=None):
 
-    USERS = {
-        "KKR007": {
-            "password": "Icom@123",
-            "company": "KKR Pvt. Ltd.",
-            "month": "October 2023",
-        },
-        "JHN2255": {
-            "password": "Johnshonda@2255",
-            "company": "Johns Honda",
-            "month": "February 2023",
-        },
-        "Lghome": {
-            "password": "Lgkar@123",
-            "company": "LG Home Appliances",
-            "month": "August 2024",
-        },
-        "VENUSDIGI456": {
-            "password": "Wd@135",
-            "company": "Venus Digital Arcade",
-            "month": "July 2022",
-        },
-        "PRAGATHACOM": {
-            "password": "Pragatha@2018",
-            "company": "Pragatha Group",
-            "month": "December 2022",
-        }
-    }
-
     CORRECT_CAPTCHA = "519741"   # dummy captcha
 
     if request.method == 'POST':
@@ -2679,15 +1986,16 @@ def NIL_Return_Filinglog1(request, content_id=None):
         password = request.POST.get('password')
         captcha = request.POST.get('captcha')
 
+        account = practice_registry.account(PracticeAccount.PORTAL_DEMO, username)
         if (
-            username in USERS and
-            USERS[username]["password"] == password and
-            captcha.lower() == CORRECT_CAPTCHA.lower()
+            account is not None and
+            account.password == password and
+            (captcha or '').lower() == CORRECT_CAPTCHA.lower()
         ):
             # Save session
             request.session['trn_user'] = username
-            request.session['company'] = USERS[username]['company']
-            request.session['month'] = USERS[username]['month']
+            request.session['company'] = account.company
+            request.session['month'] = account.month
 
             # 🔁 REDIRECT LOGIC
             if content_id:
@@ -2723,6 +2031,10 @@ def gstr1_summary1(request):
         'quarter': quarter,
         'period': period,
     }
+    student_pk = _session_student_pk(request)
+    if student_pk is not None:
+        gstin, _fy, period_code = _invoice_scope(request.GET)
+        context['summary'] = build_gstr1_summary(student_pk, gstin, [period_code])[period_code]
     return render(request, 'gstr1_summary1.html', context)
 
 
@@ -2732,9 +2044,228 @@ def gstr_b2b_invoices(request):
 
 
 
+# -------------------- Practice invoices (GSTR-1 B2B) --------------------
+
+# Taxpayer profile shown on the GSTR-1 practice pages
+_INVOICE_GSTIN_DEFAULT = "32BACXM3031K1Z5"
+_INVOICE_FY_DEFAULT = "2021-2022"
+_INVOICE_PERIOD_DEFAULT = "September"
+
+_INVOICE_PAGE_SIZE = 50
+_INVOICE_PAGE_MAX = 200
+
+def _session_student_pk(request):
+    """pk of the logged-in student, or None. Older sessions only carry the email."""
+    if request.session.get('user_type') != 'student':
+        return None
+    pk = request.session.get('student_pk')
+    if pk is None:
+        email = request.session.get('email')
+        pk = Student.objects.filter(email=email).values_list('pk', flat=True).first() if email else None
+        if pk is not None:
+            request.session['student_pk'] = pk
+    return pk
+
+def _invoice_scope(params):
+    """(supplier gstin, fy, MMYYYY period) of the return the invoices belong to."""
+    gstin = (params.get('gstin') or _INVOICE_GSTIN_DEFAULT).strip().upper()
+    fy = (params.get('fy') or _INVOICE_FY_DEFAULT).strip()
+    period = (params.get('period') or _INVOICE_PERIOD_DEFAULT).strip()
+    if not (period.isdigit() and len(period) == 6):
+        period = _return_period_code(period, fy)
+    return gstin, fy, period
+
+def _decimal(value, field):
+    try:
+        return Decimal(str(value if value is not None else "").strip() or "0").quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount for {field}.")
+
+def _invoice_payload(inv: Invoice) -> dict:
+    return {
+        "id": inv.id,
+        "gstin": inv.gstin,
+        "fy": inv.fy,
+        "period": inv.period,
+        "recipient-gstin": inv.recipient_gstin,
+        "recipient-name": inv.recipient_name,
+        "invoice-no": inv.invoice_no,
+        "invoice-date": inv.invoice_date.isoformat(),
+        "total-value": str(inv.total_value),
+        "pos": inv.pos,
+        "supplyType": inv.supply_type,
+        "status": inv.status,
+        "itemDetails": [
+            {
+                "hsn": it.hsn_code,
+                "rate": str(it.rate),
+                "taxableValue": str(it.taxable_value),
+                "integratedTax": str(it.integrated_tax),
+                "centralTax": str(it.central_tax),
+                "stateTax": str(it.state_tax),
+                "cess": str(it.cess),
+            }
+            for it in inv.items.all()
+        ],
+    }
+
+def _create_invoice(student_pk, data) -> Invoice:
+    """Validate the gstinvoiceform payload and store it. Raises ValueError with a user message."""
+    gstin, fy, period = _invoice_scope(data)
+    if not period:
+        raise ValueError("Invalid return period.")
+
+    # a blank recipient GSTIN is an unregistered (B2C) recipient
+    required = ['recipient-name', 'invoice-no', 'invoice-date', 'total-value']
+    missing = [f for f in required if not str(data.get(f) or '').strip()]
+    if missing:
+        raise ValueError("Please fill in all required fields: " + ", ".join(missing))
+
+    invoice_date = parse_date(str(data['invoice-date']).strip())
+    if invoice_date is None:
+        raise ValueError("Invalid invoice date.")
+    irn_date = parse_date(str(data.get('irnDate') or '').strip()) if data.get('irnDate') else None
+
+    rows = data.get('itemDetails')
+    rows = [] if rows is None else rows
+    flags = data.get('checkboxes')
+    flags = {} if flags is None else flags
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError("itemDetails must be a list of items.")
+    if not isinstance(flags, dict):
+        raise ValueError("checkboxes must be an object.")
+
+    items = []
+    for row in rows:
+        items.append(InvoiceItem(
+            hsn_code=str(row.get('hsn') or '').strip(),
+            rate=_decimal(str(row.get('rate', '0')).rstrip('%'), 'rate'),
+            taxable_value=_decimal(row.get('taxableValue'), 'taxable value'),
+            integrated_tax=_decimal(row.get('integratedTax'), 'integrated tax'),
+            central_tax=_decimal(row.get('centralTax'), 'central tax'),
+            state_tax=_decimal(row.get('stateTax'), 'state tax'),
+            cess=_decimal(row.get('cess1'), 'cess') + _decimal(row.get('cess2'), 'cess'),
+        ))
+
+    invoice = Invoice(
+        student_id=student_pk, gstin=gstin, fy=fy, period=period,
+        recipient_gstin=str(data.get('recipient-gstin') or '').strip().upper(),
+        recipient_name=str(data['recipient-name']).strip(),
+        invoice_no=str(data['invoice-no']).strip(),
+        invoice_date=invoice_date,
+        total_value=_decimal(data['total-value'], 'total value'),
+        pos=str(data.get('pos') or ''),
+        supply_type=str(data.get('supplyType') or ''),
+        source=str(data.get('source') or ''),
+        irn=str(data.get('irn') or ''),
+        irn_date=irn_date,
+        deemed_exports=bool(flags.get('deemedExports')),
+        sez_with_payment=bool(flags.get('sezPayment')),
+        sez_without_payment=bool(flags.get('sezWithoutPayment')),
+        reverse_charge=bool(flags.get('supplyAttract')),
+        intra_state_igst=bool(flags.get('intraState')),
+        differential_tax=bool(flags.get('differentialTax')),
+    )
+    with transaction.atomic():
+        invoice.save()
+        for item in items:
+            item.invoice = invoice
+        InvoiceItem.objects.bulk_create(items)
+        add_invoice_items(invoice, items)
+    return invoice
+
+@require_http_methods(["GET", "POST"])
+def invoices_api(request):
+    """
+    GET  /api/returns/invoices/?fy=&period=&after=<id>&limit= -> newest first,
+         keyset-paged on id ({"results": [...], "next": <id or null>}).
+    POST /api/returns/invoices/ with the gstinvoiceform JSON -> 201 {"id": ...}.
+    """
+    student_pk = _session_student_pk(request)
+    if student_pk is None:
+        return JsonResponse({"error": "You must be logged in as a student."}, status=403)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Invalid JSON."}, status=400)
+        try:
+            invoice = _create_invoice(student_pk, data)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except IntegrityError:
+            return JsonResponse({"error": "Duplicate invoice: an invoice with the same GSTIN and invoice number already exists."}, status=409)
+        return JsonResponse({"id": invoice.id}, status=201)
+
+    gstin, fy, period = _invoice_scope(request.GET)
+    after = request.GET.get('after') or ''
+    limit = request.GET.get('limit') or ''
+    if (after and not after.isdigit()) or (limit and not limit.isdigit()):
+        return JsonResponse({"error": "after and limit must be integers."}, status=400)
+    limit = min(int(limit or _INVOICE_PAGE_SIZE), _INVOICE_PAGE_MAX) or _INVOICE_PAGE_SIZE
+
+    qs = Invoice.objects.filter(student_id=student_pk, gstin=gstin, period=period)
+    if after:
+        qs = qs.filter(id__lt=int(after))
+    page = list(qs.order_by('-id').prefetch_related('items')[:limit + 1])
+    more = len(page) > limit
+    page = page[:limit]
+    return JsonResponse({
+        "results": [_invoice_payload(inv) for inv in page],
+        "next": page[-1].id if more else None,
+    })
+
+def _json_amounts(row: dict) -> dict:
+    return {k: (str(v) if isinstance(v, Decimal) else v) for k, v in row.items()}
+
+@require_GET
+def gstr1_summary_api(request):
+    """
+    /api/returns/gstr1/summary/?fy=&period= -> B2B / B2CL / B2CS / HSN totals
+    of the logged-in student's invoices for that return period.
+    """
+    student_pk = _session_student_pk(request)
+    if student_pk is None:
+        return JsonResponse({"error": "You must be logged in as a student."}, status=403)
+    gstin, fy, period = _invoice_scope(request.GET)
+    if not period:
+        return JsonResponse({"error": "Invalid return period."}, status=400)
+
+    summary = build_gstr1_summary(student_pk, gstin, [period])[period]
+    payload = {name: _json_amounts(summary[name]) for name in GSTR1_SECTIONS}
+    payload["HSN"] = [_json_amounts(row) for row in summary["HSN"]]
+    payload["total"] = _json_amounts(summary["total"])
+    return JsonResponse({"gstin": gstin, "fy": fy, "period": period, "summary": payload})
+
 def gstinvoiceform(request):
     return render(request, 'gstinvoiceform.html')
 
 
 def invoice_listing(request):
-    return render(request, 'invoice-listing.html')
\ No newline at end of file
+    """Recipient-wise invoice counts for the return, from one grouped query."""
+    student_pk = _session_student_pk(request)
+    if student_pk is None:
+        messages.error(request, "You must be logged in as a student.")
+        return redirect('log')
+
+    gstin, fy, period = _invoice_scope(request.GET)
+    recipients = (
+        Invoice.objects
+        .filter(student_id=student_pk, gstin=gstin, period=period)
+        .values('recipient_gstin')
+        .annotate(
+            recipient_name=Max('recipient_name'),
+            processed=Count('id', filter=Q(status='Processed')),
+            pending=Count('id', filter=~Q(status='Processed')),
+        )
+        .order_by('recipient_gstin')
+    )
+    return render(request, 'invoice-listing.html', {
+        'recipients': recipients,
+        'gstin': gstin,
+        'fy': fy,
+        'return_period': request.GET.get('period') or _INVOICE_PERIOD_DEFAULT,
+    })
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+State of the GST registration wizard (the ten step_* views), stored in
+Registration and its child tables instead of a reg_wizard_<qid> session
+blob.
+
+A Registration is loaded once per request (with its places and goods)
+and cached on the request, so the step view and _header_context share
+one WizardState. store() compares the patch with what is loaded and
+writes only the sections that changed, with save(update_fields=...);
+child tables are touched only when their list changed. GETs never
+write, neither here nor to the session.
+"""
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .models import Registration, RegistrationGoods, RegistrationPlace
+
+# sections stored as-posted in Registration JSON columns
+JSON_SECTIONS = (
+    "promoter", "authorized_signatory", "authorized_representative",
+    "principal_place", "state_specific", "aadhaar", "verification",
+)
+FLAGS = ("apob_completed", "goods_completed")
+# posted with every step form, never part of the application
+NOT_STORED = {"csrfmiddlewaretoken"}
+
+# business section key -> typed Registration column
+BUSINESS_TEXT = {
+    "legal_name": "legal_name",
+    "pan": "pan",
+    "state": "state",
+    "district": "district",
+    "trade_name": "trade_name",
+    "constitution": "constitution",
+    "reason": "reason_to_register",
+    "existing_reg_type": "existing_type",
+    "existing_reg_no": "existing_reg_no",
+}
+BUSINESS_YES_NO = {"casual_taxable": "is_casual", "composition_opt": "is_composition"}
+BUSINESS_DATES = {
+    "comm_date": "commencement_date",
+    "liability_date": "liability_date",
+    "existing_reg_date": "existing_reg_date",
+}
+
+# list section -> (child model, related name, typed columns)
+LISTS = {
+    "additional_places": (RegistrationPlace, "additional_places", ("city", "pincode")),
+    "goods_services": (RegistrationGoods, "goods_services", ("description", "hsn_sac")),
+}
+
+# an application is due this many days after it is started
+DUE_DAYS = 15
+
+STEP_ORDER = ["business", "promoter", "signatory", "rep", "ppob", "apob", "goods", "state", "aadhaar", "verify"]
+
+
+def _date(value):
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+def _clip(model, column, value):
+    return str(value or "")[:model._meta.get_field(column).max_length]
+
+
+def _business_dict(reg):
+    data = {key: getattr(reg, column) for key, column in BUSINESS_TEXT.items()}
+    data.update({key: "Yes" if getattr(reg, column) else "No" for key, column in BUSINESS_YES_NO.items()})
+    data.update({key: getattr(reg, column).isoformat() if getattr(reg, column) else ""
+                 for key, column in BUSINESS_DATES.items()})
+    data["is_completed"] = True
+    return data
+
+
+def _set_business(reg, values):
+    """Copy a business section into the typed columns; returns the columns that changed."""
+    changed = []
+    for key, value in values.items():
+        if key in BUSINESS_TEXT:
+            column = BUSINESS_TEXT[key]
+            value = _clip(Registration, column, value)
+        elif key in BUSINESS_YES_NO:
+            column = BUSINESS_YES_NO[key]
+            value = value == "Yes"
+        elif key in BUSINESS_DATES:
+            column = BUSINESS_DATES[key]
+            value = _date(value)
+        elif key == "is_completed":
+            column = "business_completed"
+            value = bool(value)
+        else:
+            continue
+        if getattr(reg, column) != value:
+            setattr(reg, column, value)
+            changed.append(column)
+    return changed
+
+
+def _row_dict(row, typed):
+    return {**row.details, **{column: getattr(row, column) for column in typed}}
+
+
+def _child(model, reg, position, item, typed):
+    return model(
+        registration=reg, position=position,
+        details={k: v for k, v in item.items() if k not in typed},
+        **{column: _clip(model, column, item.get(column)) for column in typed},
+    )
+
+
+def step_completion(app) -> dict:
+    """Step key (as used by the progress bar) -> completed?"""
+    return {
+        "business": app["business"].get("is_completed", False),
+        "promoter": app["promoter"].get("is_completed", False),
+        "signatory": app["authorized_signatory"].get("is_completed", False),
+        "rep": app["authorized_representative"].get("is_completed", False),
+        "ppob": app["principal_place"].get("is_completed", False),
+        # list pages count as done once marked complete or given any rows
+        "apob": bool(app["additional_places"]) or app["apob_completed"],
+        "goods": bool(app["goods_services"]) or app["goods_completed"],
+        "state": app["state_specific"].get("is_completed", False),
+        "aadhaar": app["aadhaar"].get("is_completed", False),
+        "verify": app["verification"].get("is_completed", False),
+    }
+
+
+def profile_percent(app) -> int:
+    return min(sum(1 for done in step_completion(app).values() if done) * 10, 100)
+
+
+class WizardState:
+    """One wizard's Registration (None until the first save) and its app dict."""
+
+    def __init__(self, registration):
+        self.registration = registration
+        self.app = {"business": {}, **{name: {} for name in JSON_SECTIONS}, **{flag: False for flag in FLAGS}}
+        self.saved_lists = {}
+        for name, (model, related, typed) in LISTS.items():
+            rows = getattr(registration, related).all() if registration else ()
+            self.saved_lists[name] = [_row_dict(row, typed) for row in rows]
+            self.app[name] = [dict(item) for item in self.saved_lists[name]]
+        if registration is not None:
+            if registration.business_completed:
+                self.app["business"] = _business_dict(registration)
+            for name in JSON_SECTIONS:
+                self.app[name] = dict(getattr(registration, name))
+            for flag in FLAGS:
+                self.app[flag] = getattr(registration, flag)
+
+
+def _owner(request, student_pk):
+    """Lookup kwargs for the requester's Registration rows, or None (no session yet)."""
+    if student_pk:
+        return {"student_id": student_pk}
+    if request.session.session_key:
+        return {"student": None, "session_key": request.session.session_key}
+    return None
+
+
+def load(request, qid, student_pk=None) -> WizardState:
+    states = request.__dict__.setdefault("_registration_wizards", {})
+    state = states.get(qid)
+    if state is None:
+        owner = _owner(request, student_pk)
+        registration = None
+        if owner is not None:
+            registration = (Registration.objects.filter(qid=qid, **owner)
+                            .prefetch_related("additional_places", "goods_services").first())
+        state = states[qid] = WizardState(registration)
+    return state
+
+
+def _replace_list(reg, name, old, new):
+    model, related, typed = LISTS[name]
+    if new[:len(old)] == old:
+        # appended: insert only the new rows
+        model.objects.bulk_create([_child(model, reg, i, item, typed)
+                                   for i, item in enumerate(new[len(old):], start=len(old))])
+    else:
+        model.objects.filter(registration=reg).delete()
+        model.objects.bulk_create([_child(model, reg, i, item, typed) for i, item in enumerate(new)])
+
+
+def store(request, qid, patch, student_pk=None):
+    """
+    Merge ``patch`` into the wizard (dict sections are updated, everything
+    else replaced) and write the sections that actually changed.
+    """
+    state = load(request, qid, student_pk)
+    app = state.app
+    reg = state.registration
+    with transaction.atomic():
+        if reg is None:
+            if not student_pk and not request.session.session_key:
+                request.session.save()
+            reg, _ = Registration.objects.get_or_create(
+                qid=qid, **_owner(request, student_pk),
+                defaults={"trn": request.practice_session.get("trn", ""),
+                          "due_date": date.today() + timedelta(days=DUE_DAYS)},
+            )
+            state.registration = reg
+
+        changed = set()
+        for key, value in patch.items():
+            if key == "business":
+                app["business"].update(value)
+                changed.update(_set_business(reg, value))
+            elif key in JSON_SECTIONS:
+                merged = {**app[key], **{k: v for k, v in value.items() if k not in NOT_STORED}}
+                if merged != app[key]:
+                    app[key] = merged
+                    setattr(reg, key, merged)
+                    changed.add(key)
+            elif key in FLAGS:
+                if bool(value) != app[key]:
+                    app[key] = bool(value)
+                    setattr(reg, key, app[key])
+                    changed.add(key)
+            elif key in LISTS:
+                new = [{k: v for k, v in item.items() if k not in NOT_STORED} for item in value]
+                if new != state.saved_lists[key]:
+                    _replace_list(reg, key, state.saved_lists[key], new)
+                    state.saved_lists[key] = new
+                    changed.add(key)
+                app[key] = [dict(item) for item in new]
+
+        # re-posting a step unchanged writes nothing
+        if not changed:
+            return
+        reg.profile_percent = profile_percent(app)
+        reg.last_modified = date.today()
+        reg.save(update_fields=[*(changed - set(LISTS)), "profile_percent", "last_modified", "updated_at"])
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'icmsapp.middleware.PracticeSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -74,12 +77,90 @@ WSGI_APPLICATION = 'icmspro.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# ICMS_DB_ENGINE=postgres uses PostgreSQL (needs psycopg) with the
+# ICMS_DB_NAME / _USER / _PASSWORD / _HOST / _PORT settings. Connections
+# are kept for ICMS_DB_CONN_MAX_AGE seconds and health-checked before
+# reuse; ICMS_DB_POOL=1 switches to psycopg's connection pool instead
+# (needs psycopg[pool]; Django requires CONN_MAX_AGE=0 with it).
+#
+# Otherwise SQLite, tuned for one box with concurrent writers: WAL (readers
+# don't block the writer), synchronous=NORMAL (safe with WAL, no fsync per
+# commit), IMMEDIATE transactions (take the write lock up front instead of
+# deadlocking on a read->write upgrade) and a busy timeout of
+# ICMS_SQLITE_TIMEOUT seconds. ICMS_SQLITE_TUNED=0 keeps SQLite's defaults.
+
+ICMS_DB_ENGINE = os.environ.get('ICMS_DB_ENGINE', 'sqlite')
+
+if ICMS_DB_ENGINE == 'postgres':
+    ICMS_DB_POOL = os.environ.get('ICMS_DB_POOL') == '1'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('ICMS_DB_NAME', 'icms'),
+            'USER': os.environ.get('ICMS_DB_USER', 'icms'),
+            'PASSWORD': os.environ.get('ICMS_DB_PASSWORD', ''),
+            'HOST': os.environ.get('ICMS_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('ICMS_DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if ICMS_DB_POOL else int(os.environ.get('ICMS_DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('ICMS_DB_POOL_MIN', '2')),
+                    'max_size': int(os.environ.get('ICMS_DB_POOL_MAX', '20')),
+                    'timeout': 10,
+                },
+            } if ICMS_DB_POOL else {},
+        }
+    }
+elif ICMS_DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('ICMS_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
     }
-}
+    if os.environ.get('ICMS_SQLITE_TUNED', '1') != '0':
+        DATABASES['default']['OPTIONS'] = {
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': float(os.environ.get('ICMS_SQLITE_TIMEOUT', '20')),
+        }
+else:
+    raise ImproperlyConfigured(f'Unknown ICMS_DB_ENGINE: {ICMS_DB_ENGINE}')
+
+
+# Cache (login rows, admin stats, sessions with the cache engines).
+# Default: per-process local memory. ICMS_CACHE_URL=redis://host:6379/0
+# uses Redis (needs the redis package); ICMS_CACHE_DIR=/path a file-based
+# cache shared by the worker processes of one host, as a stand-in for it.
+
+ICMS_CACHE_URL = os.environ.get('ICMS_CACHE_URL', '')
+ICMS_CACHE_DIR = os.environ.get('ICMS_CACHE_DIR', '')
+if ICMS_CACHE_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': ICMS_CACHE_URL}}
+elif ICMS_CACHE_DIR:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': ICMS_CACHE_DIR}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'icms'}}
+
+
+# Sessions. ICMS_SESSION_ENGINE is one of db (default), cached_db, cache,
+# file or signed_cookies. "cache" keeps sessions only in the cache above:
+# with local memory that means one process, so pair it with Redis or the
+# file cache. The practice flows (TRN login, OTP, NIL-return portal, task
+# pages) use their own signed cookie regardless (icmsapp/middleware.py).
+
+ICMS_SESSION_ENGINE = os.environ.get('ICMS_SESSION_ENGINE', 'db')
+if ICMS_SESSION_ENGINE not in ('db', 'cached_db', 'cache', 'file', 'signed_cookies'):
+    raise ImproperlyConfigured(f'Unknown ICMS_SESSION_ENGINE: {ICMS_SESSION_ENGINE}')
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + ICMS_SESSION_ENGINE
+PRACTICE_SESSION_COOKIE_NAME = 'icms_practice'
+# ICMS_PRACTICE_COOKIE=0 puts the practice flows back on the regular session
+ICMS_PRACTICE_COOKIE = os.environ.get('ICMS_PRACTICE_COOKIE', '1') != '0'
+# registration step1 accepts only the practice identities listed in this CSV
+ICMS_TEST_CREDENTIALS_FILE = os.environ.get(
+    'ICMS_TEST_CREDENTIALS_FILE', os.path.join(BASE_DIR, 'icmsapp', 'data', 'test_credentials.csv'))
 
 
 # Password validation
@@ -101,6 +182,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Student / institution password hashing. The first hasher is used for new
+# hashes; the rest only verify existing ones. ICMS_PASSWORD_HASHER=argon2
+# switches new hashes to Argon2 (needs the argon2-cffi package).
+
+ICMS_PBKDF2_ITERATIONS = int(os.environ.get('ICMS_PBKDF2_ITERATIONS', '1000000'))
+# bulk-imported passwords start at this cost; after each import chunk commits
+# a background thread wraps them at full cost in pbkdf2_wrapped_sha256 (no
+# plaintext needed). `manage.py hash_passwords` redoes anything interrupted.
+ICMS_IMPORT_PBKDF2_ITERATIONS = int(os.environ.get('ICMS_IMPORT_PBKDF2_ITERATIONS', '1000'))
+
+PASSWORD_HASHERS = [
+    'icmsapp.hashers.TunablePBKDF2PasswordHasher',   # also verifies plain pbkdf2_sha256 hashes
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+]
+if os.environ.get('ICMS_PASSWORD_HASHER') == 'argon2':
+    PASSWORD_HASHERS.reverse()
+# verify-only: hardened import-cost hashes
+PASSWORD_HASHERS.append('icmsapp.hashers.WrappedImportPBKDF2PasswordHasher')
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 